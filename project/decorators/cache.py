@@ -5,13 +5,78 @@ Functions
 ---------
 get_hash(arg)
 
-cache_results(cache_size)"""
+make_key(args, kwargs, typed)
 
-from functools import wraps
-from typing import Callable, Any
-from collections import OrderedDict
+cache_results(cache_size, typed, thread_safe, ttl, max_weight, weigh, policy,
+              on_evict, disk, shared)
+
+Classes
+-------
+CacheInfo"""
+
+from functools import partial, wraps
+from typing import (
+    Callable,
+    Any,
+    Dict,
+    Hashable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+import asyncio
+import contextlib
+import inspect
+from concurrent.futures import Future
+import threading
 import hashlib
 import json
+import math
+import pickle
+import sys
+import time
+from project.decorators.disk_cache import DiskCache
+from project.decorators.policies import ARCCache, LFUCache, LRUCache
+from project.decorators.shared_cache import SharedCache
+
+POLICIES = {"lru": LRUCache, "lfu": LFUCache, "arc": ARCCache}
+
+
+# separates positional arguments from keyword arguments in key
+class _KwargsMark:
+    """Separator that is pickled by reference, so keys with it
+    have the same digest in all processes.
+    """
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        return "_KWARGS_MARK_OBJECT"
+
+
+_KWARGS_MARK_OBJECT = _KwargsMark()
+_KWARGS_MARK = (_KWARGS_MARK_OBJECT,)
+
+
+class _FrozenMark:
+    """Tag of hashable replacement of unhashable argument. Arguments
+    can't contain it, so replacements don't collide with them.
+    """
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        return "_FROZEN"
+
+
+_FROZEN = _FrozenMark()
+
+# types which values can be keys themselves
+_FAST_TYPES = {int, str}
+# result that isn't cached
+_MISSING = object()
 
 
 def get_hash(arg: Any) -> str:
@@ -20,38 +85,584 @@ def get_hash(arg: Any) -> str:
     return hashlib.sha256(json_str).hexdigest()
 
 
-def cache_results(cache_size: int = 0):
+def make_key(args: Tuple, kwargs: Dict[str, Any], typed: bool = True) -> Hashable:
+    """Return key of cache for function arguments.
+
+    Key is tuple of arguments, so it is as fast as key of functools.lru_cache.
+    Unhashable lists, dicts, sets and bytearrays are replaced with
+    tagged hashable equivalents, other unhashable values are pickled.
+
+    Parameters
+    ----------
+    args : Tuple
+        Positional arguments
+    kwargs : Dict[str, Any]
+        Keyword arguments; their order doesn't matter
+    typed : bool
+        If True then arguments of different types are
+        different, e.g. 1 and 1.0
+
+    Raises
+    ------
+    TypeError
+        If some argument is unhashable and can't be pickled
+    """
+    return _hashable(_make_key(args, kwargs, typed))
+
+
+def _make_key(args: Tuple, kwargs: Dict[str, Any], typed: bool) -> Any:
+    """Return key of cache for function arguments that may be unhashable.
+    Caller hashes it once and replaces it with _freeze(key) if it fails.
+    """
+    if kwargs:
+        # order of keyword arguments doesn't matter, names are unique
+        items = tuple(sorted(kwargs.items()) if len(kwargs) > 1 else kwargs.items())
+        key = args + _KWARGS_MARK + items
+        if typed:
+            values = kwargs.values() if len(kwargs) == 1 else [v for _, v in items]
+            key += _types(args + tuple(values))
+        return key
+    if not typed:
+        return args
+    if len(args) == 1:
+        arg = args[0]
+        if type(arg) in _FAST_TYPES:
+            # type of such argument is known from its value
+            return arg
+        return arg, type(arg)
+    return args + _types(args)
+
+
+def _types(values: Tuple) -> Tuple:
+    """Return tuple of types of values."""
+    # map() costs more than building tuple for few values
+    if len(values) == 2:
+        return type(values[0]), type(values[1])
+    if len(values) == 1:
+        return (type(values[0]),)
+    return tuple(map(type, values))
+
+
+def _hashable(key: Any) -> Hashable:
+    """Return key or its hashable replacement if it is unhashable."""
+    try:
+        hash(key)
+    except TypeError:
+        return _freeze(key)
+    return key
+
+
+def _lookup(cache: "_ResultCache", key: Any) -> Tuple[Hashable, Any]:
+    """Return hashable key and its result as in _ResultCache.lookup()."""
+    try:
+        return key, cache.lookup(key)
+    except TypeError:
+        key = _freeze(key)
+        return key, cache.lookup(key)
+
+
+def _freeze(value: Any) -> Hashable:
+    """Return hashable value that is equal for equal values."""
+    if isinstance(value, tuple):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, list):
+        return _FROZEN, list, tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return _FROZEN, dict, frozenset((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, set):
+        return _FROZEN, set, frozenset(value)
+    if isinstance(value, bytearray):
+        return _FROZEN, bytearray, bytes(value)
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        # stable representation of unhashable object
+        return _FROZEN, type(value), pickle.dumps(value)
+
+
+def cache_results(
+    cache_size: int = 0,
+    typed: bool = True,
+    thread_safe: bool = False,
+    ttl: Optional[float] = None,
+    max_weight: Optional[float] = None,
+    weigh: Optional[Callable[[Any], float]] = None,
+    policy: str = "lru",
+    on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+    disk: Union[str, DiskCache, None] = None,
+    shared: Optional[SharedCache] = None,
+):
     """Decorator for caching function results.
     Keep finite number of last input arguments and corresponding results.
 
     Parameters
     ----------
     cache_size : int
-        Number of last results to keep.
+        Number of last results to keep. If it is 0 and max_weight
+        isn't given then results aren't cached and keys aren't computed.
+    typed : bool
+        If True then arguments of different types are cached
+        separately, e.g. f(1) and f(1.0)
+    thread_safe : bool
+        If True then function can be called from several threads.
+        Cache is changed under lock, function itself is called
+        without it. If several threads miss the same key then only
+        the first of them calls function, others wait for its result
+        or exception.
+    ttl : float, optional
+        Number of seconds during which result is valid. Expired result
+        is removed when it is requested.
+    max_weight : float, optional
+        Maximum total weight of kept results
+    weigh : Callable[[Any], float], optional
+        Function returning weight of result, e.g. its size in bytes;
+        sys.getsizeof by default if max_weight is given
+    policy : str
+        Eviction policy, one of POLICIES: "lru" evicts least recently used
+        result, "lfu" least frequently used one, "arc" adapts between
+        recency and frequency and needs cache_size
+    on_evict : Callable[[Hashable, Any], None], optional
+        Function called with key and result that is evicted
+        or has expired
+    disk : str or DiskCache, optional
+        Persistent second tier: path to file or DiskCache. Results
+        that aren't in memory are looked up there before function
+        is called; new results are written to both tiers. Results
+        and arguments must be picklable.
+    shared : SharedCache, optional
+        Second tier in shared memory used by all processes the cache
+        is passed to; used the same way as disk
+
+    Keys of second tier are built from arguments only, so one file
+    or SharedCache should be used by one function.
+
+    Results of coroutine functions are cached after they are awaited.
+    Concurrent calls with the same arguments share one task, so function
+    is called once; if task raises or is cancelled then result isn't
+    cached. Cancelling one caller doesn't cancel task for other callers.
+
+    Raises
+    ------
+    ValueError
+        If policy is unknown
+    ValueError
+        If ttl or max_weight isn't positive
+    ValueError
+        If both disk and shared are given
 
     Returns
     -------
     Function
+        Decorated function has methods cache_info() returning CacheInfo,
+        cache_clear() removing all results and resetting statistics and
+        cache_peek(*args, **kwargs) returning cached result of call with
+        given arguments or raising KeyError.
     """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown eviction policy {policy}")
+    if ttl is not None and ttl <= 0:
+        raise ValueError("TTL should be positive")
+    if max_weight is not None and max_weight <= 0:
+        raise ValueError("Cache weight should be positive")
+    if disk is not None and shared is not None:
+        raise ValueError("Only one second tier of cache can be used")
+    if max_weight is not None and weigh is None:
+        weigh = sys.getsizeof
 
     def decorator(func: Callable):
-        cache: OrderedDict[str, str] = OrderedDict()
+        tier: Union[DiskCache, SharedCache, None] = (
+            DiskCache(disk) if isinstance(disk, str) else disk
+        )
+        if shared is not None:
+            tier = shared
+        if cache_size <= 0 and max_weight is None and tier is None:
+            # only calls are counted
+            counter = _ResultCache(None, None, None, None, False, None)
+
+            if inspect.iscoroutinefunction(func):
+
+                @wraps(func)
+                async def calling_async(*args, **kwargs):
+                    counter.misses += 1
+                    return await func(*args, **kwargs)
+
+                return _attach(calling_async, counter, typed)
+
+            @wraps(func)
+            def calling(*args, **kwargs):
+                counter.misses += 1
+                return func(*args, **kwargs)
+
+            return _attach(calling, counter, typed)
+
+        store = None
+        if cache_size > 0 or max_weight is not None:
+            store = POLICIES[policy](cache_size if cache_size > 0 else None, max_weight)
+        cache = _ResultCache(store, ttl, weigh, on_evict, thread_safe, tier)
+        if inspect.iscoroutinefunction(func):
+            return _attach(_async_caching(func, cache, typed), cache, typed)
+        if thread_safe:
+            return _attach(_locked_caching(func, cache, typed), cache, typed)
+
+        get = None if store is None else store.get
 
         @wraps(func)
         def caching(*args, **kwargs):
-            key = get_hash(args), get_hash(kwargs)
-            if key in cache:
-                cache.move_to_end(key)
-                return cache[key]
+            key = _make_key(args, kwargs, typed)
+            if get is None:
+                key = _hashable(key)
+            else:
+                # hit is returned without calling cache.lookup(); key is
+                # hashed once here, tuples don't keep their hash
+                try:
+                    entry = get(key)
+                except TypeError:
+                    key = _freeze(key)
+                    entry = get(key)
+                if entry is not None:
+                    if ttl is None or entry[1] > time.monotonic():
+                        cache.hits += 1
+                        cache.time_saved += entry[2]
+                        return entry[0]
+                    # expired result is removed
+                    cache.lookup(key)
+            cache.notify()
+            result = cache.load(key)
+            if result is not _MISSING:
+                return result
 
+            cache.misses += 1
+            start = time.perf_counter()
             result = func(*args, **kwargs)
-            if cache_size > 0:
-                if len(cache) >= cache_size:
-                    oldest_key = next(iter(cache))
-                    del cache[oldest_key]
-                cache[key] = result
+            cost = time.perf_counter() - start
+            cache.add(key, result, cache.measure(result), cost)
+            cache.notify()
+            cache.save(key, result)
             return result
 
-        return caching
+        return _attach(caching, cache, typed)
 
     return decorator
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of cache of function decorated with cache_results."""
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    weight: float
+    # sum of execution times of function that cache hits have saved
+    time_saved: float
+
+
+class _ResultCache:
+    """Results of function kept in store with their expiration times
+    and times of calculation.
+
+    Attributes
+    ----------
+    store : LRUCache, optional
+        Cache with eviction policy; nothing is cached if not given
+    ttl : float, optional
+        Number of seconds during which result is valid
+    weigh : Callable[[Any], float], optional
+        Function returning weight of result; every result weighs 1 if not given
+    on_evict : Callable[[Hashable, Any], None], optional
+        Function called with key and result removed from cache
+    lock : threading.Lock or contextlib.nullcontext
+        Lock for cache in thread-safe mode. Functions weigh and on_evict
+        are called without it, so they can use cache.
+    evicted : List[Tuple[Hashable, Any]]
+        Removed entries not yet passed to on_evict
+    tier : DiskCache or SharedCache, optional
+        Second tier of cache
+    hits, misses, evictions : int
+        Counters of cache statistics
+    time_saved : float
+        Sum of calculation times of results returned from cache
+    """
+
+    __slots__ = (
+        "store",
+        "ttl",
+        "weigh",
+        "on_evict",
+        "lock",
+        "hits",
+        "misses",
+        "evictions",
+        "time_saved",
+        "tier",
+        "evicted",
+    )
+
+    def __init__(
+        self,
+        store: Optional[LRUCache],
+        ttl: Optional[float],
+        weigh: Optional[Callable[[Any], float]],
+        on_evict: Optional[Callable[[Hashable, Any], None]],
+        thread_safe: bool,
+        tier: Union[DiskCache, SharedCache, None],
+    ):
+        self.store = store
+        self.tier = tier
+        self.ttl = ttl
+        self.weigh = weigh
+        self.on_evict = on_evict
+        self.lock: Any = threading.Lock() if thread_safe else contextlib.nullcontext()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.time_saved = 0.0
+        self.evicted: List[Tuple[Hashable, Any]] = []
+
+    def lookup(self, key: Hashable) -> Any:
+        """Return result of key or _MISSING if it isn't kept or has expired.
+        Hit is counted. Expired result is removed; notify() should be
+        called after lock is released if result isn't returned.
+
+        Raises
+        ------
+        TypeError
+            If key is unhashable
+        """
+        store = self.store
+        if store is None:
+            hash(key)
+            return _MISSING
+        entry = store.get(key)
+        if entry is None:
+            return _MISSING
+        if self.ttl is not None and entry[1] <= time.monotonic():
+            store.pop(key)
+            self._evicted([(key, entry)])
+            return _MISSING
+        self.hits += 1
+        self.time_saved += entry[2]
+        return entry[0]
+
+    def load(self, key: Hashable) -> Any:
+        """Return result of key from second tier and keep it in memory
+        or return _MISSING. Hit is counted. Must be called without lock.
+        """
+        if self.tier is None:
+            return _MISSING
+        entry = self.tier.lookup(key)
+        if entry is None:
+            return _MISSING
+        result, expires = entry
+        weight = self.measure(result)
+        with self.lock:
+            self.hits += 1
+            if not math.isinf(expires):
+                expires = time.monotonic() + expires - time.time()
+            self.add(key, result, weight, 0.0, expires)
+        self.notify()
+        return result
+
+    def measure(self, result: Any) -> float:
+        """Return weight of result. Must be called without lock."""
+        return 1 if self.weigh is None else self.weigh(result)
+
+    def add(
+        self,
+        key: Hashable,
+        result: Any,
+        weight: float,
+        cost: float,
+        expires: Optional[float] = None,
+    ):
+        """Keep result of key of given weight calculated in cost seconds
+        in memory until expires as in time.monotonic(); ttl is used
+        if not given. notify() should be called after lock is released.
+        """
+        if self.store is None:
+            return
+        if expires is None:
+            expires = math.inf if self.ttl is None else time.monotonic() + self.ttl
+        evicted = self.store.put(key, (result, expires, cost), weight)
+        if evicted:
+            self._evicted(evicted)
+
+    def save(self, key: Hashable, result: Any):
+        """Write result of key to second tier. Must be called without lock."""
+        if self.tier is not None:
+            self.tier.put(key, result, self.ttl)
+
+    def info(self) -> CacheInfo:
+        """Return statistics of cache."""
+        with self.lock:
+            return CacheInfo(
+                self.hits,
+                self.misses,
+                self.evictions,
+                0 if self.store is None else len(self.store),
+                0 if self.store is None else self.store.weight,
+                self.time_saved,
+            )
+
+    def clear(self):
+        """Remove all results from both tiers and reset statistics."""
+        with self.lock:
+            if self.store is not None:
+                self.store.clear()
+            self.hits = self.misses = self.evictions = 0
+            self.time_saved = 0.0
+        if self.tier is not None:
+            self.tier.clear()
+
+    def peek(self, key: Hashable) -> Any:
+        """Return result of key without marking it as used.
+
+        Raises
+        ------
+        KeyError
+            If result isn't kept or has expired
+        """
+        with self.lock:
+            entry = None if self.store is None else self.store.peek(key)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+        tier_entry = None if self.tier is None else self.tier.lookup(key)
+        if tier_entry is None:
+            raise KeyError(key)
+        return tier_entry[0]
+
+    def notify(self):
+        """Pass removed entries to on_evict. Must be called without lock."""
+        if not self.evicted:
+            return
+        with self.lock:
+            evicted, self.evicted = self.evicted, []
+        assert self.on_evict is not None
+        for key, result in evicted:
+            self.on_evict(key, result)
+
+    def _evicted(self, entries: List[Tuple[Hashable, Any]]):
+        """Count removed entries and keep them for on_evict."""
+        self.evictions += len(entries)
+        if self.on_evict is not None:
+            self.evicted.extend((key, entry[0]) for key, entry in entries)
+
+
+def _attach(wrapper: Callable, cache: _ResultCache, typed: bool) -> Callable:
+    """Add functions for cache introspection to wrapper:
+    cache_info(), cache_clear() and cache_peek(*args, **kwargs).
+    """
+
+    def cache_peek(*args, **kwargs):
+        """Return cached result of call with given arguments without
+        marking it as used. Raise KeyError if it isn't cached.
+        """
+        return cache.peek(make_key(args, kwargs, typed))
+
+    wrapper.cache_info = cache.info  # type: ignore[attr-defined]
+    wrapper.cache_clear = cache.clear  # type: ignore[attr-defined]
+    wrapper.cache_peek = cache_peek  # type: ignore[attr-defined]
+    return wrapper
+
+
+def _async_caching(func: Callable, cache: _ResultCache, typed: bool) -> Callable:
+    """Return caching wrapper of coroutine function func. Concurrent
+    calls with the same arguments await one task; only results
+    of tasks that weren't cancelled and didn't raise are cached.
+    """
+    # tasks of results that are being calculated
+    in_flight: Dict[Hashable, asyncio.Task] = {}
+
+    def done(key: Hashable, start: float, task: asyncio.Task):
+        if in_flight.get(key) is task:
+            del in_flight[key]
+        # exception is retrieved even if no caller awaits task anymore
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        weight = cache.measure(result)
+        with cache.lock:
+            cache.add(key, result, weight, time.perf_counter() - start)
+        cache.notify()
+        cache.save(key, result)
+
+    @wraps(func)
+    async def caching(*args, **kwargs):
+        with cache.lock:
+            key, result = _lookup(cache, _make_key(args, kwargs, typed))
+            if result is not _MISSING:
+                return result
+            task = in_flight.get(key)
+            loop = asyncio.get_running_loop()
+            if task is not None and task.get_loop() is loop:
+                # result of call in progress is counted as hit
+                cache.hits += 1
+            else:
+                task = None
+        cache.notify()
+        if task is None:
+            result = cache.load(key)
+            if result is not _MISSING:
+                return result
+            with cache.lock:
+                cache.misses += 1
+                task = in_flight[key] = loop.create_task(func(*args, **kwargs))
+                task.add_done_callback(partial(done, key, time.perf_counter()))
+        # cancelling one caller doesn't cancel task awaited by others
+        return await asyncio.shield(task)
+
+    return caching
+
+
+def _locked_caching(func: Callable, cache: _ResultCache, typed: bool) -> Callable:
+    """Return thread-safe caching wrapper of func with single flight
+    of concurrent calls with the same arguments.
+    """
+    lock = cache.lock
+    # futures of results that are being calculated
+    in_flight: Dict[Hashable, Future] = {}
+
+    @wraps(func)
+    def caching(*args, **kwargs):
+        with lock:
+            key, result = _lookup(cache, _make_key(args, kwargs, typed))
+            if result is not _MISSING:
+                return result
+            future = in_flight.get(key)
+            if future is None:
+                future = in_flight[key] = Future()
+                is_owner = True
+            else:
+                # result of call in progress is counted as hit
+                cache.hits += 1
+                is_owner = False
+        cache.notify()
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            result = cache.load(key)
+            if result is _MISSING:
+                with lock:
+                    cache.misses += 1
+                start = time.perf_counter()
+                result = func(*args, **kwargs)
+                cost = time.perf_counter() - start
+                weight = cache.measure(result)
+                with lock:
+                    cache.add(key, result, weight, cost)
+                cache.notify()
+                cache.save(key, result)
+        except BaseException as exc:
+            with lock:
+                del in_flight[key]
+            future.set_exception(exc)
+            raise
+        with lock:
+            del in_flight[key]
+        future.set_result(result)
+        return result
+
+    return caching
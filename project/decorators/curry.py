@@ -9,13 +9,39 @@ uncurry_explicit(func, arity)
 """
 
 from functools import wraps
-from typing import Callable, Any, List
+from typing import Callable, Any, Tuple
+
+
+class _Curried:
+    """Curried function with first arguments applied.
+    Immutable, so it can be called any number of times from any thread.
+    """
+
+    __slots__ = ("func", "arity", "args")
+
+    def __init__(self, func: Callable, arity: int, args: Tuple[Any, ...]):
+        self.func = func
+        self.arity = arity
+        self.args = args
+
+    def __call__(self, arg):
+        args = self.args + (arg,)
+        if len(args) == self.arity:
+            return self.func(*args)
+        return _Curried(self.func, self.arity, args)
+
+    def __repr__(self) -> str:
+        return f"<curried {self.func!r} with arguments {self.args!r}>"
 
 
 def curry_explicit(func: Callable, arity: int):
     """Decorator for currying given function.
     Do not support keword arguments.
 
+    Every application of one argument returns new object,
+    so curried function and its partial applications can be
+    reused and called from several threads.
+
     Parameters
     ----------
     func : Callable
@@ -36,21 +62,27 @@ def curry_explicit(func: Callable, arity: int):
     if arity < 0:
         raise ValueError("Arity cannot be negative")
 
-    args: List[Any] = []
+    if arity == 0:
 
-    @wraps(func)
-    def curry_func(arg=None):
-        if arity == 0 and not (arg is None):
-            raise TypeError("Arity is 0 but argument was given")
-        if arity == 0:
+        @wraps(func)
+        def call_func(*args):
+            if args:
+                raise TypeError("Arity is 0 but argument was given")
             return func()
-        if len(args) > arity:
-            raise TypeError("Inappropriate number of arguments")
-        args.append(arg)
-        if len(args) == arity:
-            return func(*args)
-        else:
-            return curry_func
+
+        return call_func
+
+    if arity == 1:
+
+        @wraps(func)
+        def apply_func(arg):
+            return func(arg)
+
+        return apply_func
+
+    @wraps(func)
+    def curry_func(arg):
+        return _Curried(func, arity, (arg,))
 
     return curry_func
 
@@ -0,0 +1,318 @@
+"""This module provides persistent cache stored in file, used as second
+tier of cache_results.
+
+File starts with magic bytes and contains append-only log of records:
+digest of key, expiration time, length and checksum of value followed by
+value encoded with codec. The latest record of key wins. Every process
+keeps index of records in memory and reads values from memory-mapped
+file; records added by other processes are indexed when key isn't found.
+Appends and compaction are serialized between processes with lock file,
+readers don't take it: incomplete records are detected by checksum.
+
+Classes
+-------
+DiskCache
+"""
+
+import hashlib
+import io
+import math
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # without file locks only one process may write to cache
+    fcntl = None  # type: ignore[assignment]
+
+MAGIC = b"PYCACHE1"
+# digest of key, expiration time, length of value, checksum of value
+RECORD = struct.Struct("<16sdII")
+
+
+class DiskCache:
+    """Cache of picklable values stored in file.
+
+    Size of file is bounded by max_bytes: when it is exceeded, file is
+    compacted to half of max_bytes keeping only latest records of newest
+    keys. Compacted file replaces old one atomically, other processes
+    reopen it when they notice it.
+
+    Attributes
+    ----------
+    path : str
+        Path to file with cache
+    max_bytes : int, optional
+        Maximum size of file
+    codec : Any
+        Object with dumps(value) -> bytes and loads(bytes) -> value;
+        pickle by default
+
+    Methods
+    -------
+    get(key, default)
+        Return value of key
+    lookup(key)
+        Return value of key with its expiration time
+    put(key, value, ttl)
+        Append value of key
+    compact(limit)
+        Rewrite file keeping only latest records
+    clear()
+        Remove all values
+    close()
+        Close file
+    """
+
+    def __init__(self, path: str, max_bytes: Optional[int] = None, codec: Any = pickle):
+        """Open or create file with cache.
+
+        Raises
+        ------
+        ValueError
+            If max_bytes is too small for any record
+        ValueError
+            If file isn't cache file
+        """
+        if max_bytes is not None and max_bytes <= 2 * (len(MAGIC) + RECORD.size):
+            raise ValueError("Maximum size of cache file is too small")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.codec = codec
+        self._lock = threading.RLock()
+        self._lock_fd = os.open(path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        self._fd = -1
+        self._map: Optional[mmap.mmap] = None
+        # digest -> offset of value, its length and expiration time
+        self._index: Dict[bytes, Tuple[int, int, float]] = {}
+        self._scanned = 0
+        try:
+            with self._locked():
+                if not os.path.exists(path) or os.path.getsize(path) == 0:
+                    self._write_file(path, b"")
+                self._open()
+        except BaseException:
+            self.close()
+            raise
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return value of key or default if it isn't found or has expired."""
+        entry = self.lookup(key)
+        return default if entry is None else entry[0]
+
+    def lookup(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        """Return value of key and its expiration time as in time.time()
+        or None if it isn't found or has expired.
+        """
+        digest = _digest(key)
+        with self._lock:
+            # values of replaced file may be removed or stale
+            self._reopen_if_replaced()
+            location = self._index.get(digest)
+            if location is None:
+                self._refresh()
+                location = self._index.get(digest)
+            if location is None:
+                return None
+            offset, length, expires = location
+            if expires <= time.time():
+                return None
+            assert self._map is not None
+            data = self._map[offset : offset + length]
+        return self.codec.loads(data), expires
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Append value of key valid for ttl seconds; value doesn't expire
+        if ttl isn't given. File is compacted if it becomes too large.
+        """
+        data = self.codec.dumps(value)
+        expires = math.inf if ttl is None else time.time() + ttl
+        record = RECORD.pack(_digest(key), expires, len(data), zlib.crc32(data))
+        with self._lock, self._locked():
+            self._refresh()
+            if os.fstat(self._fd).st_size > self._scanned:
+                # incomplete record of killed writer would stop indexing
+                # of records appended after it; file is replaced rather
+                # than truncated as readers don't take lock
+                self._compact(None)
+            self._write(record + data)
+            self._refresh()
+            size = os.fstat(self._fd).st_size
+            if self.max_bytes is not None and size > self.max_bytes:
+                self._compact(self.max_bytes // 2)
+
+    def compact(self, limit: Optional[int] = None):
+        """Rewrite file keeping only latest unexpired records.
+
+        Parameters
+        ----------
+        limit : int, optional
+            Maximum size of new file; records of keys added
+            earlier are dropped first
+        """
+        with self._lock, self._locked():
+            self._compact(limit)
+
+    def clear(self):
+        """Remove all values."""
+        with self._lock, self._locked():
+            self._write_file(self.path + ".tmp", b"")
+            os.replace(self.path + ".tmp", self.path)
+            self._open()
+
+    def close(self):
+        """Close file. Cache can't be used after that."""
+        with self._lock:
+            self._close_file()
+            if self._lock_fd >= 0:
+                os.close(self._lock_fd)
+                self._lock_fd = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _compact(self, limit: Optional[int]):
+        """Rewrite file under lock keeping only latest unexpired records."""
+        self._refresh()
+        now = time.time()
+        size = len(MAGIC)
+        kept = []
+        # newest records first
+        for digest, (offset, length, expires) in sorted(
+            self._index.items(), key=lambda item: -item[1][0]
+        ):
+            if expires <= now:
+                continue
+            size += RECORD.size + length
+            if limit is not None and size > limit:
+                break
+            assert self._map is not None
+            kept.append(self._map[offset - RECORD.size : offset + length])
+        kept.reverse()
+        self._write_file(self.path + ".tmp", b"".join(kept))
+        os.replace(self.path + ".tmp", self.path)
+        self._open()
+
+    def _write(self, data: bytes):
+        """Append data to file under lock; write may be short."""
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view) :]
+
+    def _open(self):
+        """Open file at path and index its records."""
+        self._close_file()
+        self._fd = os.open(self.path, os.O_RDWR | os.O_APPEND)
+        with open(self.path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                os.close(self._fd)
+                self._fd = -1
+                raise ValueError(f"File {self.path} isn't cache file")
+        self._index = {}
+        self._scanned = len(MAGIC)
+        self._refresh()
+
+    def _close_file(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _reopen_if_replaced(self):
+        """Open file at path if it was replaced by compaction in other process."""
+        if os.stat(self.path).st_ino != os.fstat(self._fd).st_ino:
+            self._open()
+
+    def _refresh(self):
+        """Index records added since last call. Incomplete record
+        at the end of file is left for next call.
+        """
+        self._reopen_if_replaced()
+        size = os.fstat(self._fd).st_size
+        if size <= self._scanned:
+            return
+        if self._map is None or len(self._map) < size:
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._fd, size, access=mmap.ACCESS_READ)
+        data = self._map
+        offset = self._scanned
+        while offset + RECORD.size <= size:
+            digest, expires, length, checksum = RECORD.unpack_from(data, offset)
+            start = offset + RECORD.size
+            if start + length > size or zlib.crc32(data[start : start + length]) != (
+                checksum
+            ):
+                break
+            self._index[digest] = (start, length, expires)
+            offset = start + length
+        self._scanned = offset
+
+    def _locked(self):
+        """Return context manager holding lock file."""
+        return _FileLock(self._lock_fd)
+
+    @staticmethod
+    def _write_file(path: str, records: bytes):
+        with open(path, "wb") as file:
+            file.write(MAGIC + records)
+            file.flush()
+            os.fsync(file.fileno())
+
+
+class _FileLock:
+    """Exclusive lock of file shared between processes."""
+
+    def __init__(self, fd: int):
+        self.fd = fd
+
+    def __enter__(self):
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+
+def _canonical(obj: Any) -> bytes:
+    """Return pickle of obj that doesn't depend on hash seed and identity
+    of objects, so it is the same in all processes.
+    """
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, protocol=4)
+    # equal objects aren't replaced with references; keys aren't recursive
+    pickler.fast = True
+    pickler.dump(_sort_sets(obj))
+    return buffer.getvalue()
+
+
+def _sort_sets(obj: Any) -> Any:
+    """Replace sets in tuples with sorted pickles of their elements,
+    order of elements of set depends on hash seed.
+    """
+    if type(obj) is tuple:
+        return tuple(_sort_sets(item) for item in obj)
+    if type(obj) is frozenset or type(obj) is set:
+        return type(obj), tuple(sorted(_canonical(item) for item in obj))
+    return obj
+
+
+def _digest(key: Hashable) -> bytes:
+    """Return digest of key that is the same in all processes."""
+    return hashlib.blake2b(_canonical(key), digest_size=16).digest()
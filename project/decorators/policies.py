@@ -0,0 +1,331 @@
+"""This module provides bounded caches with different eviction policies
+used by cache_results.
+
+Size of cache is bounded by number of entries, total weight of entries
+or both. Weight of entry is given when it is added, e.g. its size in bytes.
+
+Classes
+-------
+LRUCache
+
+LFUCache
+
+ARCCache
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# key and value of evicted entry
+Evicted = Tuple[Hashable, Any]
+
+
+class LRUCache:
+    """Cache that evicts least recently used entry.
+
+    Attributes
+    ----------
+    max_size : int, optional
+        Maximum number of entries
+    max_weight : float, optional
+        Maximum total weight of entries
+    weight : float
+        Total weight of entries
+
+    Methods
+    -------
+    get(key, default)
+        Return value and mark it as used
+    peek(key, default)
+        Return value without marking it as used
+    put(key, value, weight)
+        Add entry and evict entries that don't fit
+    pop(key, default)
+        Remove entry and return its value
+    clear()
+        Remove all entries
+    """
+
+    def __init__(
+        self, max_size: Optional[int] = None, max_weight: Optional[float] = None
+    ):
+        """Set bounds of cache.
+
+        Raises
+        ------
+        ValueError
+            If max_size or max_weight isn't positive
+        """
+        if max_size is not None and max_size <= 0:
+            raise ValueError("Cache size should be positive")
+        if max_weight is not None and max_weight <= 0:
+            raise ValueError("Cache weight should be positive")
+        self.max_size = max_size
+        self.max_weight = max_weight
+        self.weight: float = 0
+        self._data: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return value of key or default if there is no such key.
+        Entry is marked as used.
+        """
+        try:
+            value, _ = self._data[key]
+        except KeyError:
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Return value of key or default without marking entry as used."""
+        entry = self._data.get(key)
+        return default if entry is None else entry[0]
+
+    def put(self, key: Hashable, value: Any, weight: float = 1) -> List[Evicted]:
+        """Add entry replacing previous value of key and evict entries
+        to keep cache in bounds.
+
+        Returns
+        -------
+        List[Evicted]
+            Keys and values of evicted entries. Entry heavier than
+            max_weight isn't added and is returned itself.
+        """
+        if key in self:
+            self.pop(key)
+        if self.max_weight is not None and weight > self.max_weight:
+            return [(key, value)]
+        self._prepare(key)
+        evicted = []
+        while len(self) > 0 and self._is_full(weight):
+            evicted.append(self._evict())
+        self._insert(key, value, weight)
+        self.weight += weight
+        return evicted
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove entry and return its value or default if there is no such key."""
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return default
+        self.weight -= entry[1]
+        return entry[0]
+
+    def clear(self):
+        """Remove all entries."""
+        self._data.clear()
+        self.weight = 0
+
+    def _is_full(self, weight: float) -> bool:
+        """Return True if entry of given weight doesn't fit in cache."""
+        return (self.max_size is not None and len(self) >= self.max_size) or (
+            self.max_weight is not None and self.weight + weight > self.max_weight
+        )
+
+    def _prepare(self, key: Hashable):
+        """Update state of policy before entries are evicted for new key."""
+        pass
+
+    def _insert(self, key: Hashable, value: Any, weight: float):
+        """Add new entry without checking bounds."""
+        self._data[key] = (value, weight)
+
+    def _evict(self) -> Evicted:
+        """Remove one entry to free place for new entry and return it."""
+        key, (value, weight) = self._data.popitem(last=False)
+        self.weight -= weight
+        return key, value
+
+
+class LFUCache(LRUCache):
+    """Cache that evicts least frequently used entry;
+    least recently used one of entries with the same frequency.
+
+    Entries are kept in buckets by frequency, so all operations are O(1).
+    Other attributes and methods are the same as in LRUCache.
+    """
+
+    def __init__(
+        self, max_size: Optional[int] = None, max_weight: Optional[float] = None
+    ):
+        super().__init__(max_size, max_weight)
+        self._frequency: Dict[Hashable, int] = {}
+        self._buckets: Dict[int, "OrderedDict[Hashable, None]"] = {}
+        self._min_frequency = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            value, _ = self._data[key]
+        except KeyError:
+            return default
+        self._touch(key)
+        return value
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return default
+        self.weight -= entry[1]
+        self._unlink(key, self._frequency.pop(key))
+        return entry[0]
+
+    def clear(self):
+        super().clear()
+        self._frequency.clear()
+        self._buckets.clear()
+        self._min_frequency = 0
+
+    def _touch(self, key: Hashable):
+        """Increase frequency of key."""
+        frequency = self._frequency[key]
+        self._unlink(key, frequency)
+        self._link(key, frequency + 1)
+        if self._min_frequency == frequency and frequency not in self._buckets:
+            self._min_frequency = frequency + 1
+
+    def _link(self, key: Hashable, frequency: int):
+        self._frequency[key] = frequency
+        self._buckets.setdefault(frequency, OrderedDict())[key] = None
+
+    def _unlink(self, key: Hashable, frequency: int):
+        bucket = self._buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[frequency]
+
+    def _insert(self, key: Hashable, value: Any, weight: float):
+        self._data[key] = (value, weight)
+        self._link(key, 1)
+        self._min_frequency = 1
+
+    def _evict(self) -> Evicted:
+        while self._min_frequency not in self._buckets:
+            self._min_frequency += 1
+        key = next(iter(self._buckets[self._min_frequency]))
+        return key, self.pop(key)
+
+
+class ARCCache(LRUCache):
+    """Cache with adaptive replacement policy (ARC).
+
+    Entries used once are kept in recency list T1, entries used at
+    least twice in frequency list T2. Keys evicted from them are
+    remembered in ghost lists B1 and B2; miss on key from ghost list
+    moves target size p of T1 toward list that would have kept it,
+    so cache adapts to scan-heavy and reuse-heavy workloads.
+
+    Number of entries must be bounded. Other attributes and methods
+    are the same as in LRUCache.
+    """
+
+    def __init__(
+        self, max_size: Optional[int] = None, max_weight: Optional[float] = None
+    ):
+        """Set bounds of cache.
+
+        Raises
+        ------
+        ValueError
+            If max_size isn't given or max_size or max_weight isn't positive
+        """
+        if max_size is None:
+            raise ValueError("ARC cache needs maximum number of entries")
+        super().__init__(max_size, max_weight)
+        self.p: float = 0
+        # T1 is kept in _data, T2 in _frequent
+        self._frequent: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._ghost_recent: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._ghost_frequent: "OrderedDict[Hashable, None]" = OrderedDict()
+        # ghost list where incoming key was found: "recent", "frequent" or None
+        self._ghost_hit: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._data) + len(self._frequent)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data or key in self._frequent
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            # second use moves entry to T2
+            self._frequent[key] = entry
+            return entry[0]
+        try:
+            value, _ = self._frequent[key]
+        except KeyError:
+            return default
+        self._frequent.move_to_end(key)
+        return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key) or self._frequent.get(key)
+        return default if entry is None else entry[0]
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, None) or self._frequent.pop(key, None)
+        if entry is None:
+            return default
+        self.weight -= entry[1]
+        return entry[0]
+
+    def clear(self):
+        super().clear()
+        self._frequent.clear()
+        self._ghost_recent.clear()
+        self._ghost_frequent.clear()
+        self.p = 0
+
+    def _prepare(self, key: Hashable):
+        """Adapt target size of T1 if key is in ghost list."""
+        assert self.max_size is not None
+        recent, frequent = len(self._ghost_recent), len(self._ghost_frequent)
+        if key in self._ghost_recent:
+            self._ghost_hit = "recent"
+            self.p = min(self.p + max(frequent / recent, 1), self.max_size)
+            del self._ghost_recent[key]
+        elif key in self._ghost_frequent:
+            self._ghost_hit = "frequent"
+            self.p = max(self.p - max(recent / frequent, 1), 0)
+            del self._ghost_frequent[key]
+        else:
+            self._ghost_hit = None
+
+    def _insert(self, key: Hashable, value: Any, weight: float):
+        assert self.max_size is not None
+        if self._ghost_hit is not None:
+            # key was used before it was evicted
+            self._frequent[key] = (value, weight)
+        else:
+            self._data[key] = (value, weight)
+        # ghost lists remember at most max_size keys together with T1
+        # and 2 * max_size keys together with all lists
+        while self._ghost_recent and (
+            len(self._data) + len(self._ghost_recent) > self.max_size
+        ):
+            self._ghost_recent.popitem(last=False)
+        while self._ghost_frequent and (
+            len(self) + len(self._ghost_recent) + len(self._ghost_frequent)
+            > 2 * self.max_size
+        ):
+            self._ghost_frequent.popitem(last=False)
+
+    def _evict(self) -> Evicted:
+        if self._data and (
+            len(self._data) > self.p
+            or not self._frequent
+            or (self._ghost_hit == "frequent" and len(self._data) == self.p)
+        ):
+            key, (value, weight) = self._data.popitem(last=False)
+            self._ghost_recent[key] = None
+        else:
+            key, (value, weight) = self._frequent.popitem(last=False)
+            self._ghost_frequent[key] = None
+        self.weight -= weight
+        return key, value
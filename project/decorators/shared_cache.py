@@ -0,0 +1,384 @@
+"""This module provides cache stored in shared memory, used as second
+tier of cache_results shared by worker processes.
+
+Segment of shared memory starts with header followed by open addressing
+hash table of fixed number of slots and data area. Slot keeps digest
+of key, expiration time, sequence number, offset and length of value.
+Values are appended to data area; when it or table is full, cache is
+compacted in place keeping newest values. Bytes values are stored as
+is and can be read without copying, other values are encoded with codec.
+Table is changed and read under lock file, so cache works without
+manager process.
+
+Classes
+-------
+SharedCache
+"""
+
+import contextlib
+import math
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Any, Hashable, Iterator, List, Optional, Tuple
+from project.decorators.disk_cache import _digest, _FileLock
+
+MAGIC = b"PYSHARE1"
+# magic, number of slots, number of used slots, size of data area,
+# end of data, last sequence number
+HEADER = struct.Struct("<8sIIQQQ")
+# digest of key, expiration time, sequence number, offset, length, flags
+SLOT = struct.Struct("<16sdQQII")
+# maximum share of used slots
+MAX_LOAD = 0.75
+
+_USED = 1
+_RAW = 2
+
+
+class SharedCache:
+    """Cache of picklable values in shared memory of given size.
+
+    Cache created in one process is used in others when it is inherited
+    by fork or passed to them as argument: it is pickled by name of
+    segment. Segment is removed when creating process closes cache.
+
+    Attributes
+    ----------
+    name : str
+        Name of shared memory segment
+    size : int
+        Size of segment in bytes
+    codec : Any
+        Object with dumps(value) -> bytes and loads(bytes) -> value;
+        pickle by default
+
+    Methods
+    -------
+    get(key, default)
+        Return value of key
+    lookup(key)
+        Return value of key with its expiration time
+    view(key)
+        Return context manager with bytes value of key without copying
+    put(key, value, ttl)
+        Add value of key
+    compact(limit)
+        Remove expired and oldest values
+    clear()
+        Remove all values
+    close()
+        Detach from segment
+    """
+
+    def __init__(
+        self,
+        size: int = 1 << 24,
+        slots: Optional[int] = None,
+        name: Optional[str] = None,
+        codec: Any = pickle,
+    ):
+        """Create segment of given size or attach to existing one by name.
+
+        Parameters
+        ----------
+        size : int
+            Size of new segment in bytes including table
+        slots : int, optional
+            Number of slots of table in new segment; one per KiB of size
+            by default. At most MAX_LOAD of them are used.
+        name : str, optional
+            Name of existing segment; size and slots are ignored if given
+        codec : Any
+            Codec of values that aren't bytes
+
+        Raises
+        ------
+        ValueError
+            If size is too small for given number of slots
+        ValueError
+            If segment isn't shared cache
+        """
+        self.codec = codec
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._owner = None if name is not None else os.getpid()
+        if name is None:
+            if slots is None:
+                slots = max(size // 1024, 16)
+            capacity = size - HEADER.size - slots * SLOT.size
+            if slots <= 0 or capacity <= 0:
+                raise ValueError("Size of shared cache is too small")
+            shm = shared_memory.SharedMemory(create=True, size=size)
+            buf: Any = shm.buf
+            HEADER.pack_into(buf, 0, MAGIC, slots, 0, capacity, 0, 0)
+        else:
+            shm = _attach(name)
+            buf = shm.buf
+            if bytes(buf[: len(MAGIC)]) != MAGIC:
+                shm.close()
+                raise ValueError(f"Segment {name} isn't shared cache")
+        self._shm = shm
+        self.name = shm.name
+        self.size = shm.size
+        _, self._slots, _, capacity, _, _ = HEADER.unpack_from(buf)
+        table_end = HEADER.size + self._slots * SLOT.size
+        self._head = buf[: HEADER.size]
+        self._table = buf[HEADER.size : table_end]
+        self._data = buf[table_end : table_end + capacity]
+        self._lock_path = os.path.join(
+            tempfile.gettempdir(), self.name.lstrip("/") + ".lock"
+        )
+        self._open_lock()
+
+    def __reduce__(self):
+        codec = None if self.codec is pickle else self.codec
+        return _attach_cache, (self.name, codec)
+
+    def __len__(self) -> int:
+        with self._locked():
+            return self._header()[2]
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return value of key or default if it isn't found or has expired."""
+        entry = self.lookup(key)
+        return default if entry is None else entry[0]
+
+    def lookup(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        """Return value of key and its expiration time as in time.time()
+        or None if it isn't found or has expired.
+        """
+        with self._locked():
+            slot = self._find(_digest(key))
+            if slot is None:
+                return None
+            _, expires, _, offset, length, flags = slot
+            data = bytes(self._data[offset : offset + length])
+        if flags & _RAW:
+            return data, expires
+        return self.codec.loads(data), expires
+
+    @contextlib.contextmanager
+    def view(self, key: Hashable) -> Iterator[Optional[memoryview]]:
+        """Return context manager giving read-only view of bytes value
+        of key in shared memory or None if it isn't found, has expired
+        or isn't bytes.
+
+        Cache is locked for all processes until block is exited, so value
+        isn't moved while it is read. View is released on exit.
+
+        Raises
+        ------
+        ValueError
+            If cache is changed by this thread inside block
+        """
+        with self._locked():
+            slot = self._find(_digest(key))
+            if slot is None or not slot[5] & _RAW:
+                yield None
+                return
+            offset, length = slot[3], slot[4]
+            view = self._data[offset : offset + length].toreadonly()
+            self._viewing += 1
+            try:
+                yield view
+            finally:
+                self._viewing -= 1
+                view.release()
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Add value of key valid for ttl seconds; value doesn't expire
+        if ttl isn't given. Cache is compacted to half of its capacity
+        if value doesn't fit. Value larger than half of data area
+        isn't stored.
+        """
+        raw = type(value) is bytes
+        data = value if raw else self.codec.dumps(value)
+        expires = math.inf if ttl is None else time.time() + ttl
+        digest = _digest(key)
+        with self._locked(change=True):
+            _, slots, used, capacity, end, seq = self._header()
+            if len(data) > capacity // 2:
+                return
+            index, found = self._probe(digest)
+            if end + len(data) > capacity or (
+                not found and used + 1 > slots * MAX_LOAD
+            ):
+                self._compact(capacity // 2)
+                _, _, used, _, end, _ = self._header()
+                index, found = self._probe(digest)
+            self._data[end : end + len(data)] = data
+            flags = _USED | (_RAW if raw else 0)
+            SLOT.pack_into(
+                self._table,
+                index * SLOT.size,
+                digest,
+                expires,
+                seq + 1,
+                end,
+                len(data),
+                flags,
+            )
+            self._set_header(used + (not found), end + len(data), seq + 1)
+
+    def compact(self, limit: Optional[int] = None):
+        """Remove expired values and move others to start of data area.
+
+        Parameters
+        ----------
+        limit : int, optional
+            Maximum total size of kept values; values of keys
+            added earlier are dropped first
+        """
+        with self._locked(change=True):
+            self._compact(limit)
+
+    def clear(self):
+        """Remove all values."""
+        with self._locked(change=True):
+            self._table[:] = bytes(len(self._table))
+            self._set_header(0, 0, self._header()[5])
+
+    def close(self):
+        """Detach from segment; segment is removed if this process
+        created it. Cache can't be used after that.
+        """
+        if self._shm is None:
+            return
+        self._head.release()
+        self._table.release()
+        self._data.release()
+        self._shm.close()
+        if self._owner == os.getpid():
+            self._shm.unlink()
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self._lock_path)
+        os.close(self._lock_fd)
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        # views of segment must be released before it is closed
+        self.close()
+
+    def _header(self) -> Tuple[bytes, int, int, int, int, int]:
+        return HEADER.unpack_from(self._head)
+
+    def _set_header(self, used: int, end: int, seq: int):
+        _, slots, _, capacity, _, _ = self._header()
+        HEADER.pack_into(self._head, 0, MAGIC, slots, used, capacity, end, seq)
+
+    def _probe(self, digest: bytes) -> Tuple[int, bool]:
+        """Return index of slot of digest and whether it is used by digest;
+        index of first free slot is returned if digest isn't found.
+        """
+        index = int.from_bytes(digest[:8], "little") % self._slots
+        while True:
+            slot = SLOT.unpack_from(self._table, index * SLOT.size)
+            if not slot[5] & _USED:
+                return index, False
+            if slot[0] == digest:
+                return index, True
+            index = (index + 1) % self._slots
+
+    def _find(self, digest: bytes) -> Optional[tuple]:
+        """Return unexpired slot of digest or None."""
+        index, found = self._probe(digest)
+        if not found:
+            return None
+        slot = SLOT.unpack_from(self._table, index * SLOT.size)
+        return slot if slot[1] > time.time() else None
+
+    def _compact(self, limit: Optional[int]):
+        """Rewrite table and data area keeping newest unexpired values
+        of at most limit bytes and half of maximum number of slots.
+        """
+        _, slots, _, _, _, seq = self._header()
+        now = time.time()
+        live = [
+            slot
+            for slot in SLOT.iter_unpack(self._table)
+            if slot[5] & _USED and slot[1] > now
+        ]
+        live.sort(key=lambda slot: -slot[2])
+        kept: List[Tuple[tuple, bytes]] = []
+        size = 0
+        for slot in live[: int(slots * MAX_LOAD) // 2]:
+            size += slot[4]
+            if limit is not None and size > limit:
+                break
+            kept.append((slot, bytes(self._data[slot[3] : slot[3] + slot[4]])))
+        self._table[:] = bytes(len(self._table))
+        end = 0
+        for (digest, expires, slot_seq, _, length, flags), data in reversed(kept):
+            index, _ = self._probe(digest)
+            self._data[end : end + length] = data
+            SLOT.pack_into(
+                self._table,
+                index * SLOT.size,
+                digest,
+                expires,
+                slot_seq,
+                end,
+                length,
+                flags,
+            )
+            end += length
+        self._set_header(len(kept), end, seq)
+
+    def _open_lock(self):
+        self._pid = os.getpid()
+        self._lock = threading.RLock()
+        # depth of _locked and number of open views in this process
+        self._depth = 0
+        self._viewing = 0
+        self._lock_fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+
+    @contextlib.contextmanager
+    def _locked(self, change: bool = False) -> Iterator[None]:
+        """Hold lock of cache in this thread and process; cache is
+        going to be changed if change is true.
+        """
+        if self._shm is None:
+            raise ValueError("Shared cache is closed")
+        if self._pid != os.getpid():
+            # forked child shares open lock file with parent,
+            # so its lock wouldn't exclude parent
+            os.close(self._lock_fd)
+            self._open_lock()
+        with self._lock:
+            if change and self._viewing:
+                raise ValueError("Shared cache can't be changed while it is viewed")
+            if self._depth:
+                # file lock is held by this thread, it isn't reentrant
+                yield
+                return
+            self._depth += 1
+            try:
+                with _FileLock(self._lock_fd):
+                    yield
+            finally:
+                self._depth -= 1
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Return existing segment without removing it at exit of this process."""
+    try:
+        return shared_memory.SharedMemory(name, track=False)  # type: ignore
+    except TypeError:
+        # before Python 3.13 segment is registered in resource tracker,
+        # which is shared by processes started with multiprocessing
+        # and removes segment at their exit only if creator hasn't
+        return shared_memory.SharedMemory(name)
+
+
+def _attach_cache(name: str, codec: Any) -> SharedCache:
+    return SharedCache(name=name, codec=pickle if codec is None else codec)
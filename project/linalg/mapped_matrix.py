@@ -0,0 +1,347 @@
+"""This module provides access to matrices stored in memory-mapped files
+
+File consists of header (magic bytes, number of rows and columns)
+followed by elements of matrix in row-major order as float64
+in native byte order.
+
+Classes
+-------
+MappedMatrix
+"""
+
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import weakref
+from array import array
+from itertools import repeat
+from operator import add, mul
+from typing import List, Optional, cast
+from project.linalg.matrix import Matrix, _check_alias, _check_out, _check_type
+from project.linalg.vector import _assign
+
+MAGIC = b"PYMATF64"
+HEADER = struct.Struct("<8sQQ")
+ITEM_SIZE = 8
+DEFAULT_BLOCK_SIZE = 256
+
+
+class MappedMatrix(Matrix):
+    """Class implements matrix stored in memory-mapped file.
+
+    Only pages of file that are used by operation are kept in memory,
+    so matrix can be larger than RAM. Adding and multiplying by number
+    are done row by row, transposing and multiplying by square blocks,
+    so working set of operations is bounded by block size.
+
+    Operations of Matrix that aren't overridden (lu, det, solve, ...)
+    work too, but they copy matrix to memory.
+
+    Attributes
+    ----------
+    path : str
+        Path to file with matrix
+    rows : int
+        Number of rows
+    cols : int
+        Number of columns
+    block_size : int
+        Size of square blocks for blocked operations
+    elements : List[memoryview]
+        Rows of matrix; views of mapped file
+
+    Methods
+    -------
+    load(path)
+        Open matrix stored in file
+    from_matrix(matrix, path)
+        Copy matrix to file
+    save(path)
+        Write matrix to disk
+    close()
+        Unmap file
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        rows: Optional[int] = None,
+        cols: Optional[int] = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ):
+        """Map file with matrix.
+
+        If rows and cols are given then new file filled with zeros is created,
+        otherwise existing file is opened; only its header is read.
+
+        Parameters
+        ----------
+        path : str, optional
+            Path to file. If not given then matrix is stored in temporary
+            file which is deleted with the object and its rows.
+        rows : int, optional
+            Number of rows of new matrix
+        cols : int, optional
+            Number of columns of new matrix
+        block_size : int
+            Size of square blocks for blocked operations
+
+        Raises
+        ------
+        ValueError
+            If size of new matrix or block size isn't positive
+        ValueError
+            If only one of rows and cols is given
+        ValueError
+            If path isn't given for existing matrix
+        ValueError
+            If file doesn't contain matrix
+        """
+        if block_size <= 0:
+            raise ValueError("Block size should be positive")
+        if (rows is None) != (cols is None):
+            raise ValueError("Both rows and cols should be given")
+        temporary = False
+
+        if rows is not None and cols is not None:
+            if rows <= 0 or cols <= 0:
+                raise ValueError("Matrix is empty")
+            if path is None:
+                fd, path = tempfile.mkstemp(suffix=".mat")
+                os.close(fd)
+                temporary = True
+            with open(path, "wb") as file:
+                file.write(HEADER.pack(MAGIC, rows, cols))
+                file.truncate(HEADER.size + rows * cols * ITEM_SIZE)
+        elif path is None:
+            raise ValueError("Path to matrix isn't given")
+
+        with open(path, "r+b") as file:
+            magic, rows, cols = HEADER.unpack(file.read(HEADER.size))
+            if (
+                magic != MAGIC
+                or rows == 0
+                or cols == 0
+                or os.fstat(file.fileno()).st_size
+                != HEADER.size + rows * cols * ITEM_SIZE
+            ):
+                raise ValueError(f"File {path} doesn't contain matrix")
+            self._mmap = mmap.mmap(file.fileno(), 0)
+
+        self.path = path
+        self.rows: int = rows
+        self.cols: int = cols
+        self.block_size = block_size
+        data = memoryview(self._mmap)[HEADER.size :].cast("d")
+        views = [data[i * cols : (i + 1) * cols] for i in range(rows)]
+        # row views support indexing, slicing and iteration like lists,
+        # so operations of Matrix can read them
+        self.elements = cast(List[List[float]], views)
+        self._views = [data] + views
+        # views keep mapping alive, so temporary file is deleted when
+        # matrix and all its rows used outside of it are collected
+        self._finalizer = weakref.finalize(
+            self._mmap, _remove, path if temporary else None
+        )
+
+    @classmethod
+    def load(cls, path: str, block_size: int = DEFAULT_BLOCK_SIZE) -> "MappedMatrix":
+        """Return matrix stored in file path without reading its elements.
+
+        Raises
+        ------
+        ValueError
+            If file doesn't contain matrix
+        """
+        return cls(path, block_size=block_size)
+
+    @classmethod
+    def from_matrix(
+        cls,
+        matrix: Matrix,
+        path: Optional[str] = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ) -> "MappedMatrix":
+        """Return copy of matrix stored in file path.
+
+        Raises
+        ------
+        TypeError
+            If type of matrix isn't Matrix
+        """
+        _check_type(matrix)
+        result = cls(path, len(matrix.elements), len(matrix.elements[0]), block_size)
+        for src, dst in zip(matrix.elements, result.elements):
+            _assign(dst, src)
+        return result
+
+    def save(self, path: Optional[str] = None):
+        """Write changes of matrix to disk.
+
+        Parameters
+        ----------
+        path : str, optional
+            If given then file with matrix is copied to path,
+            so it can be opened with load(path).
+        """
+        self._mmap.flush()
+        if path is not None and os.path.abspath(path) != os.path.abspath(self.path):
+            shutil.copyfile(self.path, path)
+
+    def close(self):
+        """Unmap file. Matrix can't be used after that.
+        Temporary file is deleted.
+        """
+        views, self._views = self._views, []
+        self.elements = []
+        if _release(views, self._mmap):
+            self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, matrix: Matrix, out: Optional[Matrix] = None):
+        """Add matrices row by row.
+
+        Parameters
+        ----------
+        matrix : Matrix
+        out : Matrix, optional
+            Matrix of the same size to write result to. If not given
+            then result is stored in new temporary MappedMatrix.
+
+        Raises
+        ------
+        TypeError
+            If type of matrix or out isn't Matrix
+        IndexError
+            If matrices aren't same size
+        """
+        _check_type(matrix)
+        if self.rows != len(matrix.elements) or self.cols != len(matrix.elements[0]):
+            raise IndexError("Different size of matrices")
+        if out is None:
+            out = self._new(self.rows, self.cols)
+        return super().add(matrix, out=out)
+
+    def matmul(self, matrix: Matrix, out: Optional[Matrix] = None):
+        """Multiply matrices by square tiles of size block_size.
+
+        Only three tiles are kept in memory at the same time.
+
+        Parameters
+        ----------
+        matrix : Matrix
+        out : Matrix, optional
+            Matrix of size of product to write result to. It can't
+            share rows with operands. If not given then result is stored in
+            new temporary MappedMatrix.
+
+        Raises
+        ------
+        TypeError
+            If type of matrix or out isn't Matrix
+        IndexError
+            If matrices aren't appropriate size
+        ValueError
+            If out shares rows with one of the operands
+        """
+        _check_type(matrix)
+        if self.cols != len(matrix.elements):
+            raise IndexError("Matrices can't be multiplied")
+        cols = len(matrix.elements[0])
+        if out is None:
+            out = self._new(self.rows, cols)
+        _check_out(out, self.rows, cols)
+        _check_alias(out, self, matrix)
+
+        a = self.elements
+        b = matrix.elements
+        size = self.block_size
+        for i0 in range(0, self.rows, size):
+            i1 = min(i0 + size, self.rows)
+            for j0 in range(0, cols, size):
+                j1 = min(j0 + size, cols)
+                acc = [[0.0] * (j1 - j0) for _ in range(i0, i1)]
+                for k0 in range(0, self.cols, size):
+                    k1 = min(k0 + size, self.cols)
+                    b_tile = [list(b[k][j0:j1]) for k in range(k0, k1)]
+                    for i, acc_row in zip(range(i0, i1), acc):
+                        for aik, b_row in zip(a[i][k0:k1], b_tile):
+                            if aik != 0.0:
+                                acc_row[:] = map(
+                                    add, acc_row, map(mul, repeat(aik), b_row)
+                                )
+                for i, acc_row in zip(range(i0, i1), acc):
+                    _set_slice(out.elements[i], j0, acc_row)
+        return out
+
+    def transpos(self, out: Optional[Matrix] = None):
+        """Return transposed matrix copied by square blocks of size block_size.
+
+        Parameters
+        ----------
+        out : Matrix, optional
+            Matrix of transposed size to write result to. It can't
+            share rows with this matrix. If not given then result is stored in new
+            temporary MappedMatrix.
+
+        Raises
+        ------
+        TypeError
+            If type of out isn't Matrix
+        IndexError
+            If out has inappropriate size
+        ValueError
+            If out shares rows with this matrix
+        """
+        if out is None:
+            out = self._new(self.cols, self.rows)
+        _check_out(out, self.cols, self.rows)
+        _check_alias(out, self)
+
+        size = self.block_size
+        for i0 in range(0, self.rows, size):
+            i1 = min(i0 + size, self.rows)
+            for j0 in range(0, self.cols, size):
+                j1 = min(j0 + size, self.cols)
+                block = [self.elements[i][j0:j1] for i in range(i0, i1)]
+                for j, col in zip(range(j0, j1), zip(*block)):
+                    _set_slice(out.elements[j], i0, col)
+        return out
+
+    def _new(self, rows: int, cols: int) -> "MappedMatrix":
+        """Return new temporary matrix of zeros for result of operation."""
+        return MappedMatrix(rows=rows, cols=cols, block_size=self.block_size)
+
+
+def _set_slice(row: List[float], start: int, values):
+    """Write values to row of matrix starting from index start."""
+    if type(row) is list:
+        row[start : start + len(values)] = values
+    else:
+        row[start : start + len(values)] = array("d", values)
+
+
+def _release(views: list, mapped: mmap.mmap) -> bool:
+    """Release views of file and unmap it. Return False if file
+    is still used by views outside of matrix.
+    """
+    for view in reversed(views):
+        view.release()
+    try:
+        mapped.close()
+    except BufferError:
+        return False
+    return True
+
+
+def _remove(path: Optional[str]):
+    """Delete temporary file if path is given."""
+    if path is not None and os.path.exists(path):
+        os.remove(path)
@@ -9,7 +9,11 @@ Functions
 is_matrix(args)
 """
 
-from typing import List
+from math import sqrt
+from itertools import repeat
+from operator import add, mul
+from typing import List, Optional, Tuple, Union
+from project.linalg.vector import Vector, _assign
 
 
 class Matrix:
@@ -24,10 +28,32 @@ class Matrix:
     -------
     __add__(matrix)
         Operator for matrices adding
+    __iadd__(matrix)
+        Operator for adding matrix in place
     __mul__(matrix)
         Operator for matrices multiplying
-    transpos()
+    __imul__(scalar)
+        Operator for multiplying matrix by number in place
+    add(matrix, out)
+        Add matrices
+    axpy(alpha, matrix, out)
+        Add matrix multiplied by number
+    matmul(matrix, out)
+        Multiply matrices
+    transpos(out)
         Transpose matrix
+    lu()
+        LU decomposition with partial pivoting
+    qr()
+        QR decomposition
+    det()
+        Calculate determinant of matrix
+    inverse()
+        Calculate inverse matrix
+    solve(b)
+        Solve linear system with matrix of coefficients
+    power(n)
+        Raise matrix to integer power
     """
 
     def __init__(self, args: List[List[float]]):
@@ -67,58 +93,484 @@ class Matrix:
         IndexError
             If matrices aren't same size
         """
-        if type(matrix) != Matrix:
-            raise TypeError(f"Incorrect type: {type(matrix)}, " "expected: Matrix.")
+        return self.add(matrix)
+
+    def __iadd__(self, matrix: "Matrix"):
+        """Add matrix to this matrix in place
+
+        Parameters
+        ----------
+        matrix : Matrix
+
+        Raises
+        ------
+        TypeError
+            If type of parameter isn't Matrix
+        IndexError
+            If matrices aren't same size
+        """
+        return self.add(matrix, out=self)
+
+    def __mul__(self, matrix: "Matrix"):
+        """Multiply matrices and return new matrix
+
+        Parameters
+        ----------
+        matrix : Matrix
+
+        Raises
+        ------
+        TypeError
+            If type of parameter isn't Matrix
+        IndexError
+            If matrices aren't appropriate size
+        """
+        return self.matmul(matrix)
+
+    def __imul__(self, scalar: float):  # type: ignore[misc]
+        """Multiply matrix by number in place
+
+        Parameters
+        ----------
+        scalar : float
+
+        Raises
+        ------
+        TypeError
+            If scalar isn't number
+        """
+        if not isinstance(scalar, (int, float)):
+            raise TypeError(f"Incorrect type: {type(scalar)}, " "expected: number.")
+        for row in self.elements:
+            _assign(row, map(mul, row, repeat(scalar)))
+        return self
+
+    def add(self, matrix: "Matrix", out: Optional["Matrix"] = None):
+        """Add matrices.
+
+        Parameters
+        ----------
+        matrix : Matrix
+        out : Matrix, optional
+            Matrix of the same size to write result to. It may be one of
+            the operands. If not given then new matrix is returned.
+
+        Raises
+        ------
+        TypeError
+            If type of matrix or out isn't Matrix
+        IndexError
+            If matrices aren't same size
+        """
+        _check_type(matrix)
         rows = len(self.elements)
         col = len(self.elements[0])
         if rows != len(matrix.elements) or col != len(matrix.elements[0]):
             raise IndexError("Different size of matrices")
-        new_elements = []
-        for i in range(rows):
-            new_row = []
-            for j in range(col):
-                new_row.append(self.elements[i][j] + matrix.elements[i][j])
-            new_elements.append(new_row)
-        return Matrix(new_elements)
+        if out is None:
+            return Matrix._from_rows(
+                [list(map(add, a, b)) for a, b in zip(self.elements, matrix.elements)]
+            )
+        _check_out(out, rows, col)
+        for a, b, row in zip(self.elements, matrix.elements, out.elements):
+            _assign(row, map(add, a, b))
+        return out
 
-    def __mul__(self, matrix: "Matrix"):
-        """Multiply matrices and return new matrix
+    def axpy(self, alpha: float, matrix: "Matrix", out: Optional["Matrix"] = None):
+        """Calculate alpha * matrix + self.
+        Result is written to this matrix unless out is given.
 
         Parameters
         ----------
+        alpha : float
+            Number to multiply matrix by
         matrix : Matrix
+        out : Matrix, optional
+            Matrix of the same size to write result to.
 
         Raises
         ------
         TypeError
-            If type of parameter isn't Matrix
+            If alpha isn't number or type of matrix or out isn't Matrix
+        IndexError
+            If matrices aren't same size
+        """
+        if not isinstance(alpha, (int, float)):
+            raise TypeError(f"Incorrect type: {type(alpha)}, " "expected: number.")
+        _check_type(matrix)
+        rows = len(self.elements)
+        col = len(self.elements[0])
+        if rows != len(matrix.elements) or col != len(matrix.elements[0]):
+            raise IndexError("Different size of matrices")
+        if out is None:
+            out = self
+        _check_out(out, rows, col)
+        for a, b, row in zip(self.elements, matrix.elements, out.elements):
+            _assign(row, map(add, a, map(mul, repeat(alpha), b)))
+        return out
+
+    def matmul(self, matrix: "Matrix", out: Optional["Matrix"] = None):
+        """Multiply matrices.
+
+        Parameters
+        ----------
+        matrix : Matrix
+        out : Matrix, optional
+            Matrix of size of product to write result to. It can't
+            share rows with operands. If not given then new matrix
+            is returned.
+
+        Raises
+        ------
+        TypeError
+            If type of matrix or out isn't Matrix
         IndexError
             If matrices aren't appropriate size
+        ValueError
+            If out shares rows with one of the operands
         """
-        if type(matrix) != Matrix:
-            raise TypeError(f"Incorrect type: {type(matrix)}, " "expected: Matrix.")
+        _check_type(matrix)
         rows = len(self.elements)
         col = len(self.elements[0])
         if col != len(matrix.elements):
             raise IndexError("Matrices can't be multiplied")
-        new_elements = []
-        for i in range(rows):
-            new_row = [0.0] * len(matrix.elements[0])
-            for j in range(len(matrix.elements[0])):
-                for k in range(col):
-                    new_row[j] += self.elements[i][k] * matrix.elements[k][j]
-            new_elements.append(new_row)
-        return Matrix(new_elements)
-
-    def transpos(self):
-        """Return transposed matrix"""
-        new_el = []
-        for j in range(len(self.elements[0])):
-            new_row = []
-            for i in range(len(self.elements)):
-                new_row.append(self.elements[i][j])
-            new_el.append(new_row)
-        return Matrix(new_el)
+        if out is None:
+            return Matrix._from_rows(_matmul(self.elements, matrix.elements))
+        _check_out(out, rows, len(matrix.elements[0]))
+        _check_alias(out, self, matrix)
+        # each row of result is accumulated from rows of second matrix,
+        # so no temporary columns are created
+        for a, row in zip(self.elements, out.elements):
+            acc = row if type(row) is list else [0.0] * len(row)
+            _assign(acc, map(mul, repeat(a[0]), matrix.elements[0]))
+            for k in range(1, col):
+                _assign(acc, map(add, acc, map(mul, repeat(a[k]), matrix.elements[k])))
+            if acc is not row:
+                _assign(row, acc)
+        return out
+
+    def transpos(self, out: Optional["Matrix"] = None):
+        """Return transposed matrix
+
+        Parameters
+        ----------
+        out : Matrix, optional
+            Matrix of transposed size to write result to. It can't
+            share rows with this matrix. If not given then new matrix
+            is returned.
+
+        Raises
+        ------
+        TypeError
+            If type of out isn't Matrix
+        IndexError
+            If out has inappropriate size
+        ValueError
+            If out shares rows with this matrix
+        """
+        if out is None:
+            return Matrix._from_rows([list(col) for col in zip(*self.elements)])
+        _check_out(out, len(self.elements[0]), len(self.elements))
+        _check_alias(out, self)
+        for col, row in zip(zip(*self.elements), out.elements):
+            _assign(row, col)
+        return out
+
+    def lu(self) -> Tuple["Matrix", "Matrix", "Matrix"]:
+        """Return LU decomposition with partial pivoting.
+
+        Result is tuple (P, L, U) such that P * A = L * U,
+        where P is permutation matrix, L is lower triangular matrix
+        with unit diagonal and U is upper triangular matrix.
+
+        Raises
+        ------
+        IndexError
+            If matrix isn't square
+        """
+        lu, perm, _ = self._lu_factor()
+        n = len(lu)
+        p = [[0.0] * n for _ in range(n)]
+        l = [[0.0] * n for _ in range(n)]
+        u = [[0.0] * n for _ in range(n)]
+        for i in range(n):
+            p[i][perm[i]] = 1.0
+            l[i][:i] = lu[i][:i]
+            l[i][i] = 1.0
+            u[i][i:] = lu[i][i:]
+        return Matrix._from_rows(p), Matrix._from_rows(l), Matrix._from_rows(u)
+
+    def qr(self) -> Tuple["Matrix", "Matrix"]:
+        """Return QR decomposition computed by Householder reflections.
+
+        Result is tuple (Q, R) such that A = Q * R,
+        where Q is orthogonal matrix and R is upper triangular matrix
+        of the same size as A.
+        """
+        rows = len(self.elements)
+        col = len(self.elements[0])
+        r = [[float(x) for x in row] for row in self.elements]
+        q = _identity(rows)
+
+        for k in range(min(rows - 1, col)):
+            norm = sqrt(sum(r[i][k] ** 2 for i in range(k, rows)))
+            if norm == 0.0:
+                continue
+            alpha = -norm if r[k][k] >= 0 else norm
+            # reflector H = I - scale * v * v^T maps column k to alpha * e_k
+            v = [r[i][k] for i in range(k, rows)]
+            v[0] -= alpha
+            scale = 2.0 / sum(x * x for x in v)
+
+            # R = H * R, only rows and columns starting from k are changed
+            w = [0.0] * (col - k)
+            for vi, i in zip(v, range(k, rows)):
+                if vi != 0.0:
+                    w = [a + vi * b for a, b in zip(w, r[i][k:])]
+            for vi, i in zip(v, range(k, rows)):
+                c = scale * vi
+                if c != 0.0:
+                    r[i][k:] = [a - c * b for a, b in zip(r[i][k:], w)]
+                r[i][k] = 0.0
+            r[k][k] = alpha
+
+            # Q = Q * H, only columns starting from k are changed
+            for row in q:
+                c = scale * sum(map(mul, row[k:], v))
+                if c != 0.0:
+                    row[k:] = [a - c * b for a, b in zip(row[k:], v)]
+
+        return Matrix._from_rows(q), Matrix._from_rows(r)
+
+    def det(self) -> float:
+        """Return determinant of matrix.
+
+        Raises
+        ------
+        IndexError
+            If matrix isn't square
+        """
+        lu, _, sign = self._lu_factor()
+        det = float(sign)
+        for i in range(len(lu)):
+            det *= lu[i][i]
+        return det
+
+    def inverse(self) -> "Matrix":
+        """Return inverse matrix.
+
+        Raises
+        ------
+        IndexError
+            If matrix isn't square
+        ValueError
+            If matrix is singular
+        """
+        lu, perm, _ = self._lu_factor()
+        return Matrix._from_rows(_lu_solve(lu, perm, _identity(len(lu))))
+
+    def solve(self, b: Union[Vector, "Matrix"]) -> Union[Vector, "Matrix"]:
+        """Return solution x of linear system A * x = b.
+
+        Parameters
+        ----------
+        b : Vector or Matrix
+            Right side of system. If b is Matrix then system is solved
+            for every column of b.
+
+        Raises
+        ------
+        TypeError
+            If type of b isn't Vector or Matrix
+        IndexError
+            If matrix isn't square or size of b doesn't match matrix
+        ValueError
+            If matrix is singular
+        """
+        if not isinstance(b, (Vector, Matrix)):
+            raise TypeError(
+                f"Incorrect type: {type(b)}, " "expected: Vector or Matrix."
+            )
+        lu, perm, _ = self._lu_factor()
+        if isinstance(b, Vector):
+            if b.dim() != len(lu):
+                raise IndexError("Vector and matrix have different size")
+            x = _lu_solve(lu, perm, [[el] for el in b.coord])
+            return Vector([row[0] for row in x])
+        if len(b.elements) != len(lu):
+            raise IndexError("Matrices have different number of rows")
+        return Matrix._from_rows(_lu_solve(lu, perm, b.elements))
+
+    def power(self, n: int) -> "Matrix":
+        """Return matrix raised to power n.
+        Power is calculated by repeated squaring.
+
+        Parameters
+        ----------
+        n : int
+            Power. If n is negative then inverse matrix is raised to power -n.
+
+        Raises
+        ------
+        TypeError
+            If n isn't integer
+        IndexError
+            If matrix isn't square
+        ValueError
+            If n is negative and matrix is singular
+        """
+        if type(n) != int:
+            raise TypeError(f"Incorrect type: {type(n)}, " "expected: int.")
+        if len(self.elements) != len(self.elements[0]):
+            raise IndexError("Matrix isn't square")
+        if n < 0:
+            return self.inverse().power(-n)
+
+        result = None
+        base = self.elements
+        while n > 0:
+            if n & 1:
+                result = base if result is None else _matmul(result, base)
+            n >>= 1
+            if n > 0:
+                base = _matmul(base, base)
+        if result is None:
+            return Matrix._from_rows(_identity(len(self.elements)))
+        if result is self.elements:
+            result = [list(row) for row in result]
+        return Matrix._from_rows(result)
+
+    def _lu_factor(self) -> Tuple[List[List[float]], List[int], int]:
+        """Return LU decomposition of matrix packed in one list of rows,
+        permutation of rows and sign of permutation.
+
+        Elements of L below diagonal and elements of U are stored together,
+        unit diagonal of L isn't stored.
+
+        Raises
+        ------
+        IndexError
+            If matrix isn't square
+        """
+        n = len(self.elements)
+        if n != len(self.elements[0]):
+            raise IndexError("Matrix isn't square")
+        lu = [[float(x) for x in row] for row in self.elements]
+        perm = list(range(n))
+        sign = 1
+
+        for k in range(n):
+            pivot = max(range(k, n), key=lambda i: abs(lu[i][k]))
+            if lu[pivot][k] == 0.0:
+                # column is already eliminated, matrix is singular
+                continue
+            if pivot != k:
+                lu[k], lu[pivot] = lu[pivot], lu[k]
+                perm[k], perm[pivot] = perm[pivot], perm[k]
+                sign = -sign
+            pivot_tail = lu[k][k + 1 :]
+            inv_pivot = 1.0 / lu[k][k]
+            for i in range(k + 1, n):
+                row = lu[i]
+                factor = row[k] * inv_pivot
+                row[k] = factor
+                if factor != 0.0:
+                    row[k + 1 :] = [
+                        a - factor * b for a, b in zip(row[k + 1 :], pivot_tail)
+                    ]
+        return lu, perm, sign
+
+    @staticmethod
+    def _from_rows(rows: List[List[float]]) -> "Matrix":
+        """Return matrix with given rows without checking and copying them.
+        Used for results of operations that are matrices by construction.
+        """
+        matrix = Matrix.__new__(Matrix)
+        matrix.elements = rows
+        return matrix
+
+
+def _check_type(matrix: Matrix):
+    """Raise TypeError if matrix isn't Matrix."""
+    if not isinstance(matrix, Matrix):
+        raise TypeError(f"Incorrect type: {type(matrix)}, " "expected: Matrix.")
+
+
+def _check_out(out: Matrix, rows: int, col: int):
+    """Raise error if out can't hold result of size rows x col.
+
+    Raises
+    ------
+    TypeError
+        If type of out isn't Matrix
+    IndexError
+        If out has different size
+    """
+    _check_type(out)
+    if rows != len(out.elements) or col != len(out.elements[0]):
+        raise IndexError("Output matrix has inappropriate size")
+
+
+def _check_alias(out: Matrix, *operands: Matrix):
+    """Raise ValueError if out shares rows with one of operands,
+    matrices don't copy rows they are created from.
+    """
+    rows = {id(row) for row in out.elements}
+    for operand in operands:
+        if any(id(row) in rows for row in operand.elements):
+            raise ValueError("Result can't be written to operand")
+
+
+def _identity(n: int) -> List[List[float]]:
+    """Return rows of identity matrix of size n."""
+    rows = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        rows[i][i] = 1.0
+    return rows
+
+
+def _matmul(a: List[List[float]], b: List[List[float]]) -> List[List[float]]:
+    """Return product of matrices given by rows."""
+    columns = list(zip(*b))
+    return [[sum(map(mul, row, column)) for column in columns] for row in a]
+
+
+def _lu_solve(
+    lu: List[List[float]], perm: List[int], rhs: List[List[float]]
+) -> List[List[float]]:
+    """Return solution X of A * X = rhs where A is given by packed LU
+    decomposition and permutation of rows.
+
+    Raises
+    ------
+    ValueError
+        If matrix is singular
+    """
+    n = len(lu)
+    if any(lu[i][i] == 0.0 for i in range(n)):
+        raise ValueError("Matrix is singular")
+    x = [[float(el) for el in rhs[p]] for p in perm]
+
+    # forward substitution with L
+    for i in range(1, n):
+        row = lu[i]
+        xi = x[i]
+        for k in range(i):
+            factor = row[k]
+            if factor != 0.0:
+                xi[:] = [a - factor * b for a, b in zip(xi, x[k])]
+
+    # back substitution with U
+    for i in range(n - 1, -1, -1):
+        row = lu[i]
+        xi = x[i]
+        for k in range(i + 1, n):
+            factor = row[k]
+            if factor != 0.0:
+                xi[:] = [a - factor * b for a, b in zip(xi, x[k])]
+        inv_diag = 1.0 / row[i]
+        xi[:] = [a * inv_diag for a in xi]
+    return x
 
 
 def is_matrix(args: List[List[float]]):
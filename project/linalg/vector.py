@@ -5,8 +5,14 @@ Classes
 Vector
 """
 
+from array import array
+from itertools import islice, repeat
 from math import acos
-from typing import List
+from operator import add, mul
+from typing import Iterable, List, Optional, Union
+
+# number of values written at once by in-place operations
+CHUNK_SIZE = 1024
 
 
 class Vector:
@@ -27,6 +33,16 @@ class Vector:
         Calculate scalar product of vectors
     angle(vect)
         Calculate angle between vectors
+    __add__(vect)
+        Operator for vectors adding
+    __iadd__(vect)
+        Operator for adding vector in place
+    __imul__(scalar)
+        Operator for multiplying vector by number in place
+    add(vect, out)
+        Add vectors
+    axpy(alpha, vect, out)
+        Add vector multiplied by number
     """
 
     def __init__(self, args: List[float]):
@@ -106,3 +122,134 @@ class Vector:
             raise ZeroDivisionError("Division by zero")
         cos = self.scalar_product(vect) / (self.length() * vect.length())
         return acos(cos)
+
+    def __add__(self, vect: "Vector"):
+        """Add vectors and return new vector.
+
+        Parameters
+        ----------
+        vect : Vector
+
+        Raises
+        ------
+        TypeError
+            If type of parameter isn't Vector
+        IndexError
+            If vectors have different dimensions
+        """
+        return self.add(vect)
+
+    def __iadd__(self, vect: "Vector"):
+        """Add vector to this vector in place.
+
+        Parameters
+        ----------
+        vect : Vector
+
+        Raises
+        ------
+        TypeError
+            If type of parameter isn't Vector
+        IndexError
+            If vectors have different dimensions
+        """
+        return self.add(vect, out=self)
+
+    def __imul__(self, scalar: float):
+        """Multiply vector by number in place.
+
+        Parameters
+        ----------
+        scalar : float
+
+        Raises
+        ------
+        TypeError
+            If scalar isn't number
+        """
+        if not isinstance(scalar, (int, float)):
+            raise TypeError(f"Incorrect type: {type(scalar)}, " "expected: number.")
+        _assign(self.coord, map(mul, self.coord, repeat(scalar)))
+        return self
+
+    def add(self, vect: "Vector", out: Optional["Vector"] = None):
+        """Add vectors.
+
+        Parameters
+        ----------
+        vect : Vector
+        out : Vector, optional
+            Vector of the same dimension to write result to. It may be one of
+            the operands. If not given then new vector is returned.
+
+        Raises
+        ------
+        TypeError
+            If type of vect or out isn't Vector
+        IndexError
+            If vectors have different dimensions
+        """
+        self._check_operand(vect)
+        if out is None:
+            return Vector(list(map(add, self.coord, vect.coord)))
+        self._check_operand(out)
+        _assign(out.coord, map(add, self.coord, vect.coord))
+        return out
+
+    def axpy(self, alpha: float, vect: "Vector", out: Optional["Vector"] = None):
+        """Calculate alpha * vect + self.
+        Result is written to this vector unless out is given.
+
+        Parameters
+        ----------
+        alpha : float
+            Number to multiply vect by
+        vect : Vector
+        out : Vector, optional
+            Vector of the same dimension to write result to.
+
+        Raises
+        ------
+        TypeError
+            If alpha isn't number or type of vect or out isn't Vector
+        IndexError
+            If vectors have different dimensions
+        """
+        if not isinstance(alpha, (int, float)):
+            raise TypeError(f"Incorrect type: {type(alpha)}, " "expected: number.")
+        self._check_operand(vect)
+        if out is None:
+            out = self
+        self._check_operand(out)
+        _assign(out.coord, map(add, self.coord, map(mul, repeat(alpha), vect.coord)))
+        return out
+
+    def _check_operand(self, vect: "Vector"):
+        """Raise error if vect can't be operand of element-wise operation.
+
+        Raises
+        ------
+        TypeError
+            If type of vect isn't Vector
+        IndexError
+            If vectors have different dimensions
+        """
+        if type(vect) != Vector:
+            raise TypeError(f"Incorrect type: {type(vect)}, " "expected: Vector.")
+        if self.dim() != vect.dim():
+            raise IndexError("Different dimensions of vectors")
+
+
+def _assign(seq: Union[List[float], memoryview], values: Iterable[float]):
+    """Write values to list or memoryview of float64 in place.
+    Values are written by chunks of CHUNK_SIZE, so temporary memory
+    doesn't grow with length of seq. Values may be computed from seq:
+    each value is computed before it is overwritten.
+    """
+    values = iter(values)
+    if type(seq) is list:
+        for start in range(0, len(seq), CHUNK_SIZE):
+            seq[start : start + CHUNK_SIZE] = islice(values, CHUNK_SIZE)
+    else:
+        for start in range(0, len(seq), CHUNK_SIZE):
+            seq[start : start + CHUNK_SIZE] = array("d", islice(values, CHUNK_SIZE))
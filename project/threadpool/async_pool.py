@@ -0,0 +1,152 @@
+"""This module provides access to thread pool from asyncio code.
+
+Classes
+-------
+PoolExecutor
+
+AsyncSubmitter
+"""
+
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from project.threadpool.threadpool import ThreadPool
+
+
+class PoolExecutor(ThreadPoolExecutor):
+    """Adapter that lets ThreadPool serve as executor.
+
+    It can be passed to loop.run_in_executor() or set as default executor
+    of event loop with loop.set_default_executor(). It is subclass of
+    ThreadPoolExecutor only because asyncio accepts only such default
+    executors; threads of ThreadPoolExecutor are never started, all tasks
+    are executed by pool.
+
+    Attributes
+    ----------
+    pool : ThreadPool
+        Thread pool that executes tasks
+
+    Methods
+    -------
+    submit(fn, *args, **kwargs)
+        Add new task to pool
+    shutdown(wait, cancel_futures)
+        Shut down pool
+    """
+
+    def __init__(self, pool: ThreadPool):
+        super().__init__(max_workers=1)
+        self.pool = pool
+
+    def submit(self, fn, /, *args, **kwargs):
+        """Add new task to pool and return its future."""
+        return self.pool.enqueue(fn, *args, **kwargs)
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        """Shut down pool. Tasks that aren't started are cancelled
+        if cancel_futures is set, otherwise they are executed.
+        """
+        self.pool.dispose(wait=wait, cancel_pending=cancel_futures)
+
+
+class AsyncSubmitter:
+    """Class implements submitting tasks to thread pool from coroutines
+    with backpressure.
+
+    Not more than max_pending tasks submitted through it are waiting
+    or executed at the same time; submit() waits for free place,
+    so producers are slowed down instead of filling memory with tasks.
+
+    Attributes
+    ----------
+    pool : ThreadPool
+        Thread pool that executes tasks
+    max_pending : int
+        Maximum number of tasks that aren't done
+
+    Methods
+    -------
+    submit(task, *args, **kwargs)
+        Wait for free place and add task
+    run(task, *args, **kwargs)
+        Add task and wait for its result
+    """
+
+    def __init__(self, pool: ThreadPool, max_pending: int):
+        """Set attributes.
+
+        Parameters
+        ----------
+        pool : ThreadPool
+            Thread pool that executes tasks
+        max_pending : int
+            Maximum number of tasks that aren't done
+
+        Raises
+        ------
+        ValueError
+            If max_pending isn't positive
+        """
+        if max_pending <= 0:
+            raise ValueError("Inappropriate number of pending tasks")
+        self.pool = pool
+        self.max_pending = max_pending
+        self._pending = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of submitted tasks that aren't done."""
+        return self._pending
+
+    async def submit(self, task: Callable, *args: Any, **kwargs: Any) -> asyncio.Future:
+        """Wait until number of pending tasks is less than max_pending
+        and add task to pool.
+
+        Parameters
+        ----------
+        task : Callable
+            Function to execute in thread
+        args : Any
+            Positional arguments of task function
+        kwargs : Any
+            Keyword arguments of task function
+
+        Returns
+        -------
+        asyncio.Future
+            Future of event loop with result of task
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+        await self._semaphore.acquire()
+        try:
+            future = self.pool.enqueue(task, *args, **kwargs)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        self._pending += 1
+        loop = asyncio.get_running_loop()
+
+        def done(_: Future):
+            # semaphore is released in thread of event loop
+            try:
+                loop.call_soon_threadsafe(self._release)
+            except RuntimeError:
+                # event loop is already closed
+                pass
+
+        future.add_done_callback(done)
+        return asyncio.wrap_future(future)
+
+    async def run(self, task: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Add task to pool when there is free place and return its result.
+        Parameters are the same as in submit().
+        """
+        return await (await self.submit(task, *args, **kwargs))
+
+    def _release(self):
+        self._pending -= 1
+        if self._semaphore is not None:
+            self._semaphore.release()
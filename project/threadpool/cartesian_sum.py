@@ -4,11 +4,22 @@ Functions
 ---------
 product_sum(product)
 
-cartesian_product_sum(num)
+cartesian_product_sum(num, repeat)
+
+parallel_product_reduce(func, reducer, *iterables, repeat, chunk_size, executor)
 """
+
+import functools
 import itertools
-from typing import List
-from concurrent.futures import ProcessPoolExecutor
+import math
+import os
+from concurrent.futures import Executor
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+from project.threadpool.executors import get_executor
+
+# number of chunks given to every worker by default, so that
+# workers that are done earlier take chunks of slower ones
+CHUNKS_PER_WORKER = 4
 
 
 def product_sum(product: List[int]) -> int:
@@ -16,25 +27,133 @@ def product_sum(product: List[int]) -> int:
     return sum(product)
 
 
-def cartesian_product_sum(num: List[int]) -> int:
-    """Return sum of Cartesian product of num
+def cartesian_product_sum(num: List[int], repeat: int = 2) -> int:
+    """Return sum of Cartesian product of num repeated repeat times
+
+    Every element of num is found in every of repeat positions
+    of n^(repeat-1) tuples of product, where n is length of num,
+    so the sum is repeat * n^(repeat-1) * sum(num) and it is
+    calculated in O(n) without building the product.
 
     Parameters
     ----------
     num : List[int]
         List of integers to compute Cartesian product
+    repeat : int
+        Number of repetitions of num in product
 
     Raises
     ------
     ValueError
         If num is empty
+    ValueError
+        If repeat isn't positive
     """
     if len(num) == 0:
         raise ValueError("num is empty.")
+    if repeat <= 0:
+        raise ValueError("repeat should be positive.")
+
+    return repeat * len(num) ** (repeat - 1) * sum(num)
 
-    product = itertools.product(num, repeat=2)
 
-    with ProcessPoolExecutor() as executor:
-        partial_sum = list(executor.map(product_sum, product))
+def parallel_product_reduce(
+    func: Callable,
+    reducer: Callable[[Any, Any], Any],
+    *iterables: Iterable,
+    repeat: int = 1,
+    chunk_size: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> Any:
+    """Return reduce(reducer, (func(*item) for item in product(*iterables)))
+    calculated in parallel.
+
+    Index space of product is split into contiguous chunks. Only
+    iterables and bounds of chunk are sent to worker, which regenerates
+    its part of product, applies func and reduces results, so only one
+    partial result per chunk is sent back. Partial results are reduced
+    in order of chunks, so reducer should be associative.
+
+    Parameters
+    ----------
+    func : Callable
+        Function called with elements of every tuple of product
+    reducer : Callable[[Any, Any], Any]
+        Associative function of two arguments combining results
+    iterables : Iterable
+        Finite iterables to compute Cartesian product of
+    repeat : int
+        Number of repetitions of iterables in product
+    chunk_size : int, optional
+        Number of tuples of product in chunk; by default product
+        is split into CHUNKS_PER_WORKER chunks per CPU
+    executor : Executor, optional
+        Executor to run chunks in; shared process pool
+        from project.threadpool.executors by default.
+        With process pool func and reducer must be picklable.
+
+    Raises
+    ------
+    ValueError
+        If product is empty
+    ValueError
+        If repeat or chunk_size isn't positive
+    """
+    if repeat <= 0:
+        raise ValueError("repeat should be positive.")
+    if chunk_size is not None and chunk_size <= 0:
+        raise ValueError("chunk_size should be positive.")
+    pools = [tuple(iterable) for iterable in iterables] * repeat
+    total = math.prod(len(pool) for pool in pools)
+    if len(pools) == 0 or total == 0:
+        raise ValueError("Product is empty.")
+
+    if chunk_size is None:
+        chunk_size = -(-total // (CHUNKS_PER_WORKER * (os.cpu_count() or 1)))
+    if executor is None:
+        executor = get_executor("process")
+    futures = [
+        executor.submit(
+            _reduce_chunk, func, reducer, pools, start, min(start + chunk_size, total)
+        )
+        for start in range(0, total, chunk_size)
+    ]
+    return functools.reduce(reducer, (future.result() for future in futures))
+
+
+def _reduce_chunk(
+    func: Callable,
+    reducer: Callable[[Any, Any], Any],
+    pools: Sequence[Tuple],
+    start: int,
+    stop: int,
+) -> Any:
+    """Return reduced results of func for tuples of product
+    of pools with indices from start to stop.
+    """
+    # last pools form suffix which product isn't longer than chunk,
+    # tuples with the same prefix are generated by itertools.product
+    split = len(pools) - 1
+    block = len(pools[-1])
+    while split > 0 and block * len(pools[split - 1]) <= stop - start:
+        split -= 1
+        block *= len(pools[split])
+    prefix_pools = pools[:split]
+    suffix_pools = pools[split:]
+
+    def items():
+        for position in range(start // block, (stop - 1) // block + 1):
+            prefix = []
+            index = position
+            for pool in reversed(prefix_pools):
+                index, digit = divmod(index, len(pool))
+                prefix.append((pool[digit],))
+            prefix.reverse()
+            offset = position * block
+            yield from itertools.islice(
+                itertools.product(*prefix, *suffix_pools),
+                max(start - offset, 0),
+                min(stop - offset, block),
+            )
 
-    return sum(partial_sum)
+    return functools.reduce(reducer, itertools.starmap(func, items()))
@@ -0,0 +1,152 @@
+"""This module provides executors shared by functions of project.threadpool.
+
+Executors are created on first use and kept until exit, so repeated
+calls pay cost of starting processes or threads once.
+
+Functions
+---------
+configure_executor(kind, max_workers, start_method)
+
+get_executor(kind)
+
+warm_up(kind)
+
+shutdown_executors(wait)
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Optional
+from project.threadpool.async_pool import PoolExecutor
+from project.threadpool.threadpool import ThreadPool
+
+EXECUTOR_KINDS = ("process", "thread")
+
+_lock = threading.Lock()
+_executors: Dict[str, Executor] = {}
+_settings: Dict[str, dict] = {kind: {} for kind in EXECUTOR_KINDS}
+
+
+def configure_executor(
+    kind: str = "process",
+    max_workers: Optional[int] = None,
+    start_method: Optional[str] = None,
+):
+    """Set parameters of shared executor. Executor of this kind that
+    is already created is shut down after its tasks are executed,
+    new one is created with these parameters on next use.
+
+    Parameters
+    ----------
+    kind : str
+        "process" or "thread"
+    max_workers : int, optional
+        Number of workers; number of CPUs by default
+    start_method : str, optional
+        Start method of processes: "fork", "forkserver" or "spawn";
+        default method of platform if not given. Only used for processes.
+
+    Raises
+    ------
+    ValueError
+        If kind or start method is unknown
+    ValueError
+        If max_workers isn't positive
+    ValueError
+        If start method is given for threads
+    """
+    _check_kind(kind)
+    if max_workers is not None and max_workers <= 0:
+        raise ValueError("Inappropriate number of workers")
+    if start_method is not None:
+        if kind != "process":
+            raise ValueError("Start method is used only for processes")
+        if start_method not in multiprocessing.get_all_start_methods():
+            raise ValueError(f"Unknown start method {start_method}")
+
+    with _lock:
+        _settings[kind] = {"max_workers": max_workers, "start_method": start_method}
+        executor = _executors.pop(kind, None)
+    if executor is not None:
+        executor.shutdown()
+
+
+def get_executor(kind: str = "process") -> Executor:
+    """Return shared executor of given kind, create it on first call.
+
+    Raises
+    ------
+    ValueError
+        If kind is unknown
+    """
+    _check_kind(kind)
+    with _lock:
+        executor = _executors.get(kind)
+        if executor is None:
+            executor = _executors[kind] = _create(kind, **_settings[kind])
+        return executor
+
+
+def warm_up(kind: str = "process") -> Executor:
+    """Start all workers of shared executor now instead of on first tasks
+    and return executor.
+
+    Raises
+    ------
+    ValueError
+        If kind is unknown
+    """
+    executor = get_executor(kind)
+    if kind == "process":
+        # processes are started when tasks are added and no process is idle
+        workers = _settings[kind].get("max_workers") or os.cpu_count() or 1
+        for future in [executor.submit(os.getpid) for _ in range(workers)]:
+            future.result()
+    return executor
+
+
+def shutdown_executors(wait: bool = True):
+    """Shut down all shared executors. They are created again on next use.
+    Called at exit.
+    """
+    with _lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
+
+
+def _create(
+    kind: str, max_workers: Optional[int] = None, start_method: Optional[str] = None
+) -> Executor:
+    """Return new executor of given kind."""
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if kind == "thread":
+        return PoolExecutor(ThreadPool(max_workers))
+    context = multiprocessing.get_context(start_method)
+    return ProcessPoolExecutor(max_workers, mp_context=context)
+
+
+def _check_kind(kind: str):
+    if kind not in EXECUTOR_KINDS:
+        raise ValueError(f"Unknown executor kind {kind}")
+
+
+def _forget_executors():
+    """Drop executors of parent in forked child process, their workers
+    belong to parent.
+    """
+    global _lock
+    _lock = threading.Lock()
+    _executors.clear()
+
+
+# workers of thread pool aren't daemons, so executors should be shut down
+# before interpreter joins threads, that is before atexit handlers are called
+getattr(threading, "_register_atexit", atexit.register)(shutdown_executors)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_executors)
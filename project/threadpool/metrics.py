@@ -0,0 +1,148 @@
+"""This module provides metrics collected by thread pool.
+
+Classes
+-------
+Histogram
+
+WorkerStats
+"""
+
+import time
+from typing import Dict, List, Optional
+
+HISTOGRAM_BUCKETS = 40
+
+
+class Histogram:
+    """Histogram of durations.
+
+    Bucket i contains durations of at least 2^(i-1) and less than
+    2^i microseconds, bucket 0 contains durations shorter than
+    1 microsecond, so adding value costs one integer conversion.
+
+    Attributes
+    ----------
+    counts : List[int]
+        Number of durations in every bucket
+    count : int
+        Number of added durations
+    total : float
+        Sum of added durations in seconds
+    max : float
+        Longest added duration in seconds
+
+    Methods
+    -------
+    add(seconds)
+        Add duration
+    merge(other)
+        Add all durations of other histogram
+    percentile(q)
+        Return upper bound of q-th percentile
+    snapshot()
+        Return summary of histogram
+    """
+
+    def __init__(self):
+        self.counts: List[int] = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        """Add duration given in seconds."""
+        index = int(seconds * 1e6).bit_length() if seconds > 0 else 0
+        self.counts[min(index, HISTOGRAM_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: "Histogram"):
+        """Add all durations of other histogram to this one."""
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> float:
+        """Return upper bound in seconds of bucket with q-th percentile
+        of durations, 0 <= q <= 100; 0 if histogram is empty.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if count > 0 and seen >= rank:
+                return min((1 << i) / 1e6, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return number of durations, mean, maximum
+        and 50th, 90th and 99th percentiles in seconds.
+        """
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+        }
+
+
+class WorkerStats:
+    """Metrics of one worker.
+
+    Only worker itself updates its metrics, so they aren't locked;
+    readers can see values of slightly different moments.
+
+    Attributes
+    ----------
+    name : str
+        Name of worker thread
+    started : float
+        Time when worker was started
+    stopped : float, optional
+        Time when worker was stopped
+    tasks : int
+        Number of executed tasks
+    busy_time : float
+        Number of seconds spent in tasks
+    queue_wait : Histogram
+        Time between adding tasks and starting them
+    run_time : Histogram
+        Time of executing tasks
+
+    Methods
+    -------
+    record(wait, run)
+        Count executed task
+    busy_ratio(now)
+        Return part of lifetime spent in tasks
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.monotonic()
+        self.stopped: Optional[float] = None
+        self.tasks = 0
+        self.busy_time = 0.0
+        self.queue_wait = Histogram()
+        self.run_time = Histogram()
+
+    def record(self, wait: float, run: float):
+        """Count task that waited wait seconds in queue and ran run seconds."""
+        self.tasks += 1
+        self.busy_time += run
+        self.queue_wait.add(wait)
+        self.run_time.add(run)
+
+    def busy_ratio(self, now: float) -> float:
+        """Return part of lifetime of worker until now spent in tasks."""
+        end = self.stopped if self.stopped is not None else now
+        lifetime = end - self.started
+        return min(self.busy_time / lifetime, 1.0) if lifetime > 0 else 0.0
@@ -0,0 +1,457 @@
+"""This module provides access to process pool with the same interface
+as thread pool.
+
+Classes
+-------
+ProcessPool
+"""
+
+import itertools
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import wait
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+from project.threadpool.threadpool import RejectedError, _results
+
+# identifier of task, function, args, kwargs
+Task = Tuple[int, Callable, Tuple, dict]
+
+
+class _SharedArg:
+    """Reference to argument stored in shared memory block.
+
+    Attributes
+    ----------
+    name : str
+        Name of shared memory block
+    size : int
+        Number of bytes of argument
+    """
+
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = size
+
+    def load(self) -> bytes:
+        """Return copy of argument from shared memory."""
+        block = shared_memory.SharedMemory(self.name)
+        try:
+            assert block.buf is not None
+            return bytes(block.buf[: self.size])
+        finally:
+            block.close()
+
+
+def _process_worker(tasks, results):
+    """Execute batches of tasks from tasks queue in worker process
+    and put batches of results to results queue until None is received.
+    """
+    while True:
+        batch = tasks.get()
+        if batch is None:
+            return
+        done = []
+        for task_id, task, args, kwargs in batch:
+            try:
+                args = tuple(
+                    arg.load() if isinstance(arg, _SharedArg) else arg for arg in args
+                )
+                done.append((task_id, True, task(*args, **kwargs)))
+            except BaseException as exc:
+                done.append((task_id, False, exc))
+        try:
+            results.put(done)
+        except Exception:
+            # some result or exception can't be pickled, send them one by one
+            for item in done:
+                try:
+                    results.put([item])
+                except Exception as exc:
+                    results.put([(item[0], False, RuntimeError(repr(exc)))])
+
+
+class ProcessPool:
+    """Class implements pool of persistent worker processes.
+
+    Interface is the same as of ThreadPool: enqueue() returns future
+    with result of task, dispose() waits until added tasks are executed.
+    Tasks, their arguments and results must be picklable.
+
+    Tasks are sent to processes in batches: dispatcher thread takes
+    all tasks that are waiting, but not more than batch_size, so
+    pickling and sending cost is shared by tasks under load. At most
+    two batches per process are sent ahead, other tasks wait in queue
+    and can be cancelled.
+    Bytes-like arguments not smaller than share_threshold are passed
+    through shared memory instead of pipe; task gets them as bytes.
+
+    If worker process dies, e.g. it is killed or task calls os._exit(),
+    pool becomes broken: other processes are terminated, futures of
+    tasks that aren't finished get BrokenProcessPool and new tasks
+    aren't accepted. Process that died may hold lock of task queue,
+    so pool can't continue with other processes.
+
+    Attributes
+    ----------
+    num_process : int
+        Number of worker processes
+    batch_size : int
+        Maximum number of tasks sent to process at once
+    share_threshold : int, optional
+        Minimum size of bytes-like argument to pass through shared memory
+    processes : List[multiprocessing.Process]
+        List of worker processes
+    tasks : Deque[Tuple[Future, Callable, Tuple, dict]]
+        Queue of tasks which aren't sent to processes
+    is_finished : bool
+        Flag that is raised if tasks are no longer accepted
+    is_broken : bool
+        Flag that is raised if some worker process has died
+    shutdown_time : float, optional
+        Number of seconds spent in last dispose() call
+
+    Methods
+    -------
+    enqueue(task, *args, **kwargs)
+        Add new task
+    map(func, *iterables, timeout)
+        Execute function for every set of arguments
+    dispose(wait, cancel_pending, timeout)
+        Shut down process pool
+    """
+
+    def __init__(
+        self,
+        num_process: int,
+        batch_size: int = 64,
+        share_threshold: Optional[int] = None,
+        context: Optional[Any] = None,
+    ):
+        """Set attributes and start worker processes.
+
+        Parameters
+        ----------
+        num_process : int
+            Number of worker processes
+        batch_size : int
+            Maximum number of tasks sent to process at once
+        share_threshold : int, optional
+            Minimum size of bytes-like argument to pass through
+            shared memory; arguments aren't shared if not given
+        context : multiprocessing context, optional
+            Context used to start processes, default context if not given
+
+        Raises
+        ------
+        ValueError
+            If num_process or batch_size isn't positive
+        """
+        if num_process <= 0:
+            raise ValueError("Inappropriate number of processes")
+        if batch_size <= 0:
+            raise ValueError("Batch size should be positive")
+
+        self.num_process = num_process
+        self.batch_size = batch_size
+        self.share_threshold = share_threshold
+        self.tasks: Deque[Tuple[Future, Callable, Tuple, dict]] = deque()
+        self.is_finished = False
+        self.is_broken = False
+        self.shutdown_time: Optional[float] = None
+        self._condition = threading.Condition()
+        self._futures: Dict[int, Future] = {}
+        self._counter = itertools.count()
+
+        if share_threshold is not None:
+            # processes should share resource tracker of this process,
+            # otherwise their own trackers delete shared memory at exit
+            resource_tracker.ensure_running()
+        context = context if context is not None else multiprocessing.get_context()
+        self._task_queue = context.SimpleQueue()
+        self._result_queue = context.SimpleQueue()
+        self.processes: List[multiprocessing.Process] = [
+            context.Process(
+                target=_process_worker,
+                args=(self._task_queue, self._result_queue),
+                daemon=True,
+            )
+            for _ in range(num_process)
+        ]
+        for process in self.processes:
+            process.start()
+
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._dispatcher.start()
+        self._collector.start()
+
+    def enqueue(self, task: Callable, *args: Any, **kwargs: Any) -> Future:
+        """Add new task to be executed if dispose() isn't called.
+
+        Parameters
+        ----------
+        task : Callable
+            Picklable function to execute in process
+        args : Any
+            Positional arguments of task function
+        kwargs : Any
+            Keyword arguments of task function
+
+        Returns
+        -------
+        Future
+            Future with result of task
+
+        Raises
+        ------
+        RejectedError
+            If dispose() is called
+        BrokenProcessPool
+            If some worker process has died
+        """
+        future: Future = Future()
+        with self._condition:
+            if self.is_broken:
+                raise BrokenProcessPool("Worker process has died")
+            if self.is_finished:
+                raise RejectedError("Process pool is disposed")
+            self.tasks.append((future, task, args, kwargs))
+            self._condition.notify()
+        return future
+
+    def map(
+        self, func: Callable, *iterables: Iterable, timeout: Optional[float] = None
+    ) -> Iterator:
+        """Execute func for every set of arguments taken from iterables
+        like built-in map(). All tasks are added at once.
+
+        Parameters
+        ----------
+        func : Callable
+            Picklable function to execute in processes
+        iterables : Iterable
+            Iterables with positional arguments of func
+        timeout : float, optional
+            Number of seconds to wait for all results
+
+        Returns
+        -------
+        Iterator
+            Iterator over results in order of arguments. It raises
+            exception raised by task or TimeoutError if results
+            aren't ready in time.
+        """
+        end_time = None if timeout is None else time.monotonic() + timeout
+        futures = [self.enqueue(func, *args) for args in zip(*iterables)]
+        return _results(futures, end_time)
+
+    def dispose(
+        self,
+        wait: bool = True,
+        cancel_pending: bool = False,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """Finish work of process pool: new tasks aren't accepted,
+        processes stop after added tasks are executed.
+
+        Parameters
+        ----------
+        wait : bool
+            Wait until processes and helper threads are stopped
+        cancel_pending : bool
+            Cancel futures of tasks that aren't sent to processes
+            instead of executing them
+        timeout : float, optional
+            Maximum number of seconds to wait for processes
+
+        Returns
+        -------
+        bool
+            True if all processes and helper threads are stopped.
+            Time spent in dispose() is kept in shutdown_time.
+        """
+        start = time.monotonic()
+        with self._condition:
+            self.is_finished = True
+            pending = list(self.tasks) if cancel_pending else []
+            if cancel_pending:
+                self.tasks.clear()
+            self._condition.notify()
+
+        for future, *_ in pending:
+            future.cancel()
+
+        workers: List[Any] = [self._dispatcher, *self.processes, self._collector]
+        if wait:
+            end_time = None if timeout is None else start + timeout
+            for worker in workers:
+                if end_time is None:
+                    worker.join()
+                else:
+                    worker.join(max(end_time - time.monotonic(), 0))
+
+        self.shutdown_time = time.monotonic() - start
+        return not any(worker.is_alive() for worker in workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.dispose()
+
+    def _dispatch(self):
+        """Send batches of tasks to processes until dispose() is called
+        and all tasks are sent, then stop processes.
+        """
+        while True:
+            limit = 2 * self.num_process * self.batch_size
+            with self._condition:
+                while not (
+                    (self.tasks and len(self._futures) < limit)
+                    or (not self.tasks and self.is_finished)
+                ):
+                    self._condition.wait()
+                if len(self.tasks) == 0:
+                    break
+                # split waiting tasks between processes
+                size = -(-len(self.tasks) // self.num_process)
+                size = min(size, self.batch_size)
+                taken = [self.tasks.popleft() for _ in range(size)]
+
+            batch = []
+            for future, task, args, kwargs in taken:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                batch.append((next(self._counter), future, task, args, kwargs))
+            with self._condition:
+                # futures are failed by collector if pool is broken
+                if self.is_broken:
+                    for _, future, *_ in batch:
+                        future.set_exception(
+                            BrokenProcessPool("Worker process has died")
+                        )
+                    continue
+                for task_id, future, *_ in batch:
+                    self._futures[task_id] = future
+            batch = [
+                (task_id, task, self._share(future, args), kwargs)
+                for task_id, future, task, args, kwargs in batch
+            ]
+            if len(batch) == 0:
+                continue
+            try:
+                self._task_queue.put(batch)
+            except Exception:
+                # batch can't be pickled, send tasks one by one
+                for item in batch:
+                    try:
+                        self._task_queue.put([item])
+                    except Exception as exc:
+                        self._futures.pop(item[0]).set_exception(exc)
+
+        for _ in self.processes:
+            self._task_queue.put(None)
+
+    def _collect(self):
+        """Set results received from processes to futures until all
+        processes exit. Break pool if some process dies.
+        """
+        reader = self._result_queue._reader  # type: ignore[attr-defined]
+        sentinels = {process.sentinel: process for process in self.processes}
+        while sentinels:
+            ready = wait([reader, *sentinels])
+            if reader in ready:
+                self._set_results(self._result_queue.get())
+                continue
+            for sentinel in ready:
+                process = sentinels.pop(sentinel)  # type: ignore[call-overload]
+                # exit code may be unknown for a moment after sentinel is ready
+                process.join()
+                # processes exit normally only after dispose() is called
+                if process.exitcode != 0 or not self.is_finished:
+                    self._break(process)
+                    return
+        # results are written before processes exit
+        while not self._result_queue.empty():
+            self._set_results(self._result_queue.get())
+        # process that exited with code 0 from task didn't send results
+        self._fail_futures()
+
+    def _set_results(self, results: List[Tuple[int, bool, Any]]):
+        """Set results or exceptions received from process to futures."""
+        with self._condition:
+            futures = [self._futures.pop(task_id) for task_id, _, _ in results]
+            # dispatcher may send more tasks
+            self._condition.notify()
+        for future, (_, is_ok, value) in zip(futures, results):
+            if is_ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def _break(self, process: multiprocessing.Process):
+        """Stop accepting tasks, terminate processes and fail futures
+        of tasks that aren't finished.
+        """
+        with self._condition:
+            self.is_broken = True
+            self.is_finished = True
+            pending = list(self.tasks)
+            self.tasks.clear()
+            self._condition.notify()
+        for other in self.processes:
+            if other.is_alive():
+                other.terminate()
+        for future, *_ in pending:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(
+                    BrokenProcessPool(f"Worker process {process.pid} has died")
+                )
+        self._fail_futures(process)
+
+    def _fail_futures(self, process: Optional[multiprocessing.Process] = None):
+        """Set BrokenProcessPool to futures of sent tasks."""
+        with self._condition:
+            futures = list(self._futures.values())
+            self._futures.clear()
+        name = "" if process is None else f" {process.pid}"
+        for future in futures:
+            future.set_exception(BrokenProcessPool(f"Worker process{name} has died"))
+
+    def _share(self, future: Future, args: Tuple) -> Tuple:
+        """Return args where large bytes-like arguments are replaced
+        with references to shared memory. Shared memory is freed
+        when future is done.
+        """
+        if self.share_threshold is None:
+            return args
+        shared = []
+        blocks = []
+        for arg in args:
+            if (
+                isinstance(arg, (bytes, bytearray, memoryview))
+                and len(arg) >= self.share_threshold
+            ):
+                data = memoryview(arg).cast("B")
+                block = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+                assert block.buf is not None
+                block.buf[: len(data)] = data
+                blocks.append(block)
+                shared.append(_SharedArg(block.name, len(data)))
+            else:
+                shared.append(arg)
+        if blocks:
+            future.add_done_callback(lambda _: _free(blocks))
+        return tuple(shared)
+
+
+def _free(blocks: List[shared_memory.SharedMemory]):
+    """Close and delete shared memory blocks."""
+    for block in blocks:
+        block.close()
+        block.unlink()
@@ -3,30 +3,132 @@
 Classes
 -------
 ThreadPool
+
+WorkStealingThreadPool
+
+DeadlineExceeded
+
+RejectedError
+
+Functions
+---------
+as_completed(futures, timeout)
 """
+
+import asyncio
+import heapq
+import math
+import itertools
 import threading
-from typing import Callable, List, Tuple, Any
+import time
+import concurrent.futures
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Tuple, Any
+from project.threadpool.metrics import Histogram, WorkerStats
+
+SCALE_EVENTS_LIMIT = 1000
+OVERFLOW_POLICIES = ("block", "reject", "caller_runs", "drop_oldest")
+# seconds between checks for stealable tasks of worker waiting for future
+HELP_INTERVAL = 0.001
+
+# negated priority, deadline, sequence number, time of adding,
+# future, function, args, kwargs
+Task = Tuple[float, float, int, float, Future, Callable, Tuple, dict]
+
+
+class DeadlineExceeded(TimeoutError):
+    """Exception set to future of task that wasn't started before its deadline."""
+
+    pass
+
+
+class RejectedError(RuntimeError):
+    """Exception raised when task isn't accepted by thread pool
+    and set to future of task dropped from full queue.
+    """
+
+    pass
 
 
 class ThreadPool:
     """Class implements thread pool.
 
     Tasks given to thread pool are executed in parallel.
+    Idle workers sleep on condition variable; every added task
+    wakes up exactly one of them. Result of task or raised exception
+    is set to future returned by enqueue().
+
+    Tasks are kept in heap: task with higher priority is started first,
+    tasks with the same priority are started in order of deadlines and
+    then in order of adding. Task which deadline has passed before
+    it was started is dropped or only counted, depending on drop_expired.
+
+    Number of workers changes between min_workers and max_workers:
+    new worker is started when there are more tasks in queue than idle
+    workers, worker that has been idle for idle_timeout seconds is
+    stopped if there are more than min_workers workers.
+
+    If metrics are enabled then every worker measures time tasks waited
+    in queue and time of executing them; stats() merges measurements
+    of workers. Hooks before_task and after_task are called around every
+    task; when metrics and hooks aren't used, executing task costs
+    only checks of three attributes more.
+
+    If max_queue is given then queue holds at most max_queue tasks.
+    When it is full, adding task follows overflow policy: "block" waits
+    for free place (at most block_timeout seconds), "reject" raises
+    RejectedError, "caller_runs" executes task in adding thread,
+    "drop_oldest" removes task with lowest priority that was added first
+    and sets RejectedError to its future.
 
     Attributes
     ----------
-    num_thread : int
-        Number of threads to be created
+    min_workers : int
+        Number of workers that are always kept
+    max_workers : int
+        Maximum number of workers
+    idle_timeout : float
+        Number of seconds after which idle worker is stopped
     threads : List[threading.Thread]
-        List of threads
-    tasks : List[Tuple[Callable, Tuple, dict]]
-        List of functions with arguments to call in thread
+        List of running workers
+    tasks : List[Task]
+        Heap of futures and functions with arguments to call in thread;
+        with "drop_oldest" policy it may keep dropped tasks until they
+        are popped
+    drop_expired : bool
+        Flag that tasks which deadline has passed aren't executed
+    expired : int
+        Number of tasks that weren't started before deadline
     is_finished : bool
         Flag that is raised if tasks are no longer accepted
-    event : threading.Event
-        Event to communicate between threads
     lock : threading.Lock
         Lock for tasks
+    condition : threading.Condition
+        Condition to wait for new tasks, uses lock
+    scale_events : Deque[Tuple[float, str, int]]
+        Last starts and stops of workers: time, "spawn" or "retire"
+        and number of workers after event
+    shutdown_time : float, optional
+        Number of seconds spent in last dispose() call
+    metrics : bool
+        Flag that workers measure queue wait and run time of tasks
+    before_task : Callable, optional
+        Function called in worker with task, args and kwargs
+        before task is executed
+    after_task : Callable, optional
+        Function called in worker with task, args, kwargs and
+        run time in seconds after task is executed or has raised
+    max_queue : int, optional
+        Maximum number of tasks in queue
+    overflow : str
+        Policy used when queue is full, one of OVERFLOW_POLICIES
+    block_timeout : float, optional
+        Maximum number of seconds to wait for free place in queue
+    rejected : int
+        Number of tasks rejected or dropped because queue was full
+    not_full : threading.Condition
+        Condition to wait for free place in queue, uses lock
 
     Methods
     -------
@@ -34,83 +136,490 @@ class ThreadPool:
         Execute tasks
     enqueue(task, *args, **kwargs)
         Add new task
-    dispose()
+    schedule(task, args, kwargs, priority, deadline)
+        Add new task with priority and deadline
+    map(func, *iterables, timeout)
+        Execute function for every set of arguments
+    submit_async(task, *args, **kwargs)
+        Execute task and await its result in event loop
+    dispose(wait, cancel_pending, timeout)
         Shut down thread pool
+    stats()
+        Return snapshot of metrics
     """
 
-    def __init__(self, num_thread: int):
-        """Set attributes and starts given number of threads.
+    def __init__(
+        self,
+        num_thread: Optional[int] = None,
+        min_workers: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        idle_timeout: float = 60.0,
+        drop_expired: bool = True,
+        metrics: bool = False,
+        before_task: Optional[Callable] = None,
+        after_task: Optional[Callable] = None,
+        max_queue: Optional[int] = None,
+        overflow: str = "block",
+        block_timeout: Optional[float] = None,
+    ):
+        """Set attributes and starts min_workers threads.
 
         Parameters
         ----------
-        num_thread : int
-            Number of threads to create in pool
+        num_thread : int, optional
+            Number of threads in pool. It is default value
+            for both min_workers and max_workers.
+        min_workers : int, optional
+            Number of workers that are always kept; 0 by default
+            if num_thread isn't given
+        max_workers : int, optional
+            Maximum number of workers; num_thread by default
+        idle_timeout : float
+            Number of seconds after which idle worker is stopped
+        drop_expired : bool
+            If True then task which deadline has passed isn't executed
+            and DeadlineExceeded is set to its future, otherwise task
+            is executed and only counted in expired
+        metrics : bool
+            If True then queue wait and run time of tasks are measured
+        before_task : Callable, optional
+            Function called with task, args and kwargs before task
+        after_task : Callable, optional
+            Function called with task, args, kwargs and run time
+            in seconds after task. Exception raised by hook
+            is set to future of task.
+        max_queue : int, optional
+            Maximum number of tasks in queue; queue isn't limited
+            if not given
+        overflow : str
+            Policy used when queue is full: "block", "reject",
+            "caller_runs" or "drop_oldest"; "drop_oldest" drops task
+            with lowest priority that was added first
+        block_timeout : float, optional
+            Maximum number of seconds to wait for free place
+            with "block" policy; waits without limit if not given
 
         Raises
         ------
         ValueError
-            If num_thread isn't positive
+            If max_workers isn't positive or isn't given
+        ValueError
+            If min_workers is negative or greater than max_workers
+        ValueError
+            If idle_timeout isn't positive
+        ValueError
+            If max_queue isn't positive or overflow is unknown
         """
-
-        if num_thread <= 0:
+        if max_workers is None:
+            max_workers = num_thread
+        if min_workers is None:
+            min_workers = num_thread if num_thread is not None else 0
+        if max_workers is None or max_workers <= 0:
             raise ValueError("Inappropriate number of threads")
+        if min_workers < 0 or min_workers > max_workers:
+            raise ValueError("Inappropriate minimal number of threads")
+        if idle_timeout <= 0:
+            raise ValueError("Idle timeout should be positive")
+        if max_queue is not None and max_queue <= 0:
+            raise ValueError("Queue size should be positive")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow}")
 
-        self.max_number = num_thread
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.idle_timeout = idle_timeout
         self.threads: List[threading.Thread] = []
-        self.tasks: List[Tuple[Callable, Tuple, dict]] = []
+        self.tasks: List[Task] = []
+        self.drop_expired = drop_expired
+        self.expired = 0
+        self._counter = itertools.count()
         self.is_finished = False
-        self.event = threading.Event()
         self.lock = threading.Lock()
+        self.condition = threading.Condition(self.lock)
+        self.scale_events: Deque[Tuple[float, str, int]] = deque(
+            maxlen=SCALE_EVENTS_LIMIT
+        )
+        self.shutdown_time: Optional[float] = None
+        self._idle = 0
+        self.metrics = metrics
+        self.before_task = before_task
+        self.after_task = after_task
+        self._local = threading.local()
+        self._worker_stats: List[WorkerStats] = []
+        # metrics of stopped workers
+        self._stopped_stats = WorkerStats("stopped")
+        self._metrics_start = time.monotonic()
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.rejected = 0
+        self.not_full = threading.Condition(self.lock)
+        # sequence numbers of tasks in heap and heap of tasks ordered
+        # by priority and adding for "drop_oldest"; tasks dropped from
+        # one heap are removed from other one lazily
+        self._queued: Optional[set] = (
+            set() if max_queue is not None and overflow == "drop_oldest" else None
+        )
+        self._victims: List[Tuple[float, int, Task]] = []
+
+        with self.lock:
+            for _ in range(self.min_workers):
+                self._spawn()
+
+    @property
+    def num_workers(self) -> int:
+        """Number of running workers."""
+        return len(self.threads)
+
+    @property
+    def idle_workers(self) -> int:
+        """Number of workers waiting for tasks."""
+        return self._idle
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of tasks waiting for worker."""
+        return self._heap_size()
 
-        for _ in range(self.max_number):
-            thread = threading.Thread(target=self._worker)
-            thread.start()
-            self.threads.append(thread)
+    def _spawn(self):
+        """Start new worker. Must be called with lock held."""
+        thread = threading.Thread(target=self._worker)
+        self.threads.append(thread)
+        self.scale_events.append((time.monotonic(), "spawn", len(self.threads)))
+        thread.start()
 
     def _worker(self):
-        """Take first added task from tasks.
+        """Take task with highest priority from tasks.
         Taken task is deleted from tasks.
 
-        Execute task in separate thread.
+        Execute task in separate thread and set its result
+        or raised exception to future. Cancelled tasks are skipped.
+        Tasks left after dispose() is called are executed too;
+        worker stops when there are no tasks left or when it has been
+        idle for idle_timeout seconds and it isn't one of min_workers.
         """
-        while not self.is_finished:
-            # wait until task is added or dispose() is called
-            self.event.wait()
-            self.event.clear()
+        self._start_worker()
+        try:
+            while True:
+                with self.condition:
+                    entry = self._wait_task()
+                if entry is None:
+                    return
+                self._run(entry)
+        finally:
+            self._stop_worker()
 
-            # take first task from tasks
+    def _start_worker(self):
+        """Create metrics of current worker if metrics are enabled."""
+        if self.metrics:
+            stats = WorkerStats(threading.current_thread().name)
+            self._local.stats = stats
             with self.lock:
-                if len(self.tasks) > 0:
-                    first = self.tasks.pop(0)
-                else:
-                    first = ()
-
-            if len(first) != 0:
-                # execute task
-                task, args, kwargs = first
-                task(*args, **kwargs)
-
-        # executing tasks without waiting
-        # after dispose() is called
-        # if there are any left
-        num = 1
-        while num > 0:
-            is_left = False
+                self._worker_stats.append(stats)
+
+    def _stop_worker(self):
+        """Move metrics of current worker to metrics of stopped workers."""
+        stats = getattr(self._local, "stats", None)
+        if stats is None:
+            return
+        stats.stopped = time.monotonic()
+        with self.lock:
+            self._worker_stats.remove(stats)
+            total = self._stopped_stats
+            total.tasks += stats.tasks
+            total.busy_time += stats.busy_time
+            total.queue_wait.merge(stats.queue_wait)
+            total.run_time.merge(stats.run_time)
+
+    def _take(self) -> Optional[Task]:
+        """Take next task if there is any. Must be called with lock held."""
+        while self.tasks:
+            entry = heapq.heappop(self.tasks)
+            if self._queued is not None:
+                if entry[2] not in self._queued:
+                    # task was dropped from full queue
+                    continue
+                self._queued.remove(entry[2])
+            if self.max_queue is not None:
+                self.not_full.notify()
+            return entry
+        return None
+
+    def _push(self, entry: Task):
+        """Add task to heap. Must be called with lock held."""
+        heapq.heappush(self.tasks, entry)
+        if self._queued is None:
+            return
+        self._queued.add(entry[2])
+        heapq.heappush(self._victims, (-entry[0], entry[2], entry))
+        # heaps are rebuilt after max_queue tasks are removed from them,
+        # so lazy removal costs O(log n) amortized
+        assert self.max_queue is not None
+        queued = self._queued
+        if len(self.tasks) > 2 * self.max_queue:
+            self.tasks = [task for task in self.tasks if task[2] in queued]
+            heapq.heapify(self.tasks)
+        if len(self._victims) > 2 * self.max_queue:
+            self._victims = [item for item in self._victims if item[1] in queued]
+            heapq.heapify(self._victims)
+
+    def _heap_size(self) -> int:
+        """Number of tasks in heap. Must be called with lock held."""
+        return len(self.tasks) if self._queued is None else len(self._queued)
+
+    def _wait_task(self) -> Optional[Task]:
+        """Wait until task is added and take it.
+        Return None if worker should stop. Must be called with lock held.
+        """
+        # worker is counted as idle before it checks tasks,
+        # so task added after check always wakes it up
+        self._idle += 1
+        try:
+            while True:
+                entry = self._take()
+                if entry is not None:
+                    return entry
+                if self.is_finished:
+                    return None
+                can_retire = len(self.threads) > self.min_workers
+                notified = self.condition.wait(
+                    self.idle_timeout if can_retire else None
+                )
+                if (
+                    not notified
+                    and self.queue_depth == 0
+                    and not self.is_finished
+                    and len(self.threads) > self.min_workers
+                ):
+                    self._retire()
+                    return None
+        finally:
+            self._idle -= 1
+
+    def _run(self, entry: Task):
+        """Execute task and set its result to future."""
+        _, deadline, _, enqueued, future, task, args, kwargs = entry
+        if not future.set_running_or_notify_cancel():
+            return
+        if deadline < time.monotonic():
             with self.lock:
-                num = len(self.tasks)
-                if num > 0:
-                    is_left = True
-                    task, args, kwargs = self.tasks.pop(0)
+                self.expired += 1
+            if self.drop_expired:
+                future.set_exception(DeadlineExceeded("Task wasn't started in time"))
+                return
+        if self.metrics or self.before_task is not None or self.after_task is not None:
+            self._run_traced(enqueued, future, task, args, kwargs)
+            return
+        try:
+            result = task(*args, **kwargs)
+        except BaseException as exc:
+            # exception is kept in future, worker continues
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
 
-            # wake up threads if there are any left waiting
-            self.event.set()
+    def _run_traced(
+        self, enqueued: float, future: Future, task: Callable, args: Tuple, kwargs: dict
+    ):
+        """Execute task with hooks, measure it and set its result to future."""
+        stats = getattr(self._local, "stats", None) if self.metrics else None
+        try:
+            if self.before_task is not None:
+                self.before_task(task, args, kwargs)
+            start = time.monotonic()
+            try:
+                result = task(*args, **kwargs)
+            finally:
+                run_time = time.monotonic() - start
+                if stats is not None:
+                    stats.record(start - enqueued, run_time)
+                if self.after_task is not None:
+                    self.after_task(task, args, kwargs, run_time)
+        except BaseException as exc:
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
 
-            if is_left:
-                task(*args, **kwargs)
+    def _retire(self):
+        """Remove current worker from pool. Must be called with lock held."""
+        self.threads.remove(threading.current_thread())
+        self.scale_events.append((time.monotonic(), "retire", len(self.threads)))
 
-    def enqueue(self, task: Callable, *args: Any, **kwargs: Any):
+    def enqueue(self, task: Callable, *args: Any, **kwargs: Any) -> Future:
+        """Add new task with default priority and without deadline
+        to be executed if dispose() isn't called.
+
+        Parameters
+        ----------
+        task : Callable
+            Function to execute in thread
+        args : Any
+            Positional arguments of task function
+        kwargs : Any
+            Keyword arguments of task function
+
+        Returns
+        -------
+        Future
+            Future with result of task
+
+        Raises
+        ------
+        RejectedError
+            If dispose() is called or if queue is full and task
+            isn't accepted by overflow policy
+        """
+        return self.schedule(task, args, kwargs)
+
+    def schedule(
+        self,
+        task: Callable,
+        args: Tuple = (),
+        kwargs: Optional[dict] = None,
+        priority: float = 0,
+        deadline: Optional[float] = None,
+    ) -> Future:
         """Add new task to be executed if dispose() isn't called.
 
+        Parameters
+        ----------
+        task : Callable
+            Function to execute in thread
+        args : Tuple
+            Positional arguments of task function
+        kwargs : dict, optional
+            Keyword arguments of task function
+        priority : float
+            Tasks with higher priority are started first
+        deadline : float, optional
+            Number of seconds from now during which task should be started
+
+        Returns
+        -------
+        Future
+            Future with result of task. If deadline has passed before
+            task was started and drop_expired is set then DeadlineExceeded
+            is set to future.
+
+        Raises
+        ------
+        RejectedError
+            If dispose() is called or if queue is full and task
+            isn't accepted by overflow policy
+        """
+        future = self._new_future()
+        deadline = math.inf if deadline is None else time.monotonic() + deadline
+        dropped = None
+        with self.condition:
+            if self.is_finished:
+                raise RejectedError("Thread pool is disposed")
+            if self.max_queue is not None and self._heap_size() >= self.max_queue:
+                if self.overflow == "caller_runs":
+                    run_here = True
+                else:
+                    dropped = self._make_room()
+                    run_here = False
+            else:
+                run_here = False
+            entry = (
+                -priority,
+                deadline,
+                next(self._counter),
+                time.monotonic() if self.metrics else 0.0,
+                future,
+                task,
+                args,
+                {} if kwargs is None else kwargs,
+            )
+            if not run_here:
+                self._push(entry)
+                if (
+                    self._heap_size() > self._idle
+                    and len(self.threads) < self.max_workers
+                ):
+                    # all idle workers already have tasks to take
+                    self._spawn()
+                else:
+                    # wake up one idle worker
+                    self.condition.notify()
+
+        if run_here:
+            self._run(entry)
+        if dropped is not None and dropped[4].set_running_or_notify_cancel():
+            dropped[4].set_exception(RejectedError("Task was dropped from full queue"))
+        return future
+
+    def _new_future(self) -> Future:
+        """Return future for new task."""
+        return Future()
+
+    def _make_room(self) -> Optional[Task]:
+        """Free place in full queue according to overflow policy.
+        Return dropped task if there is one. Must be called with lock held.
+
+        Raises
+        ------
+        RejectedError
+            If task can't be added
+        """
+        if self.overflow == "drop_oldest":
+            assert self._queued is not None
+            self.rejected += 1
+            while True:
+                _, seq, dropped = heapq.heappop(self._victims)
+                if seq in self._queued:
+                    self._queued.remove(seq)
+                    return dropped
+
+        if self.overflow == "block":
+            assert self.max_queue is not None
+            end_time = (
+                None
+                if self.block_timeout is None
+                else time.monotonic() + self.block_timeout
+            )
+            while self._heap_size() >= self.max_queue and not self.is_finished:
+                timeout = None if end_time is None else end_time - time.monotonic()
+                if timeout is not None and timeout <= 0:
+                    break
+                self.not_full.wait(timeout)
+            if self.is_finished:
+                raise RejectedError("Thread pool is disposed")
+            if self._heap_size() < self.max_queue:
+                return None
+
+        self.rejected += 1
+        raise RejectedError("Task queue is full")
+
+    def map(
+        self, func: Callable, *iterables: Iterable, timeout: Optional[float] = None
+    ) -> Iterator:
+        """Execute func for every set of arguments taken from iterables
+        like built-in map(). All tasks are added at once.
+
+        Parameters
+        ----------
+        func : Callable
+            Function to execute in threads
+        iterables : Iterable
+            Iterables with positional arguments of func
+        timeout : float, optional
+            Number of seconds to wait for all results
+
+        Returns
+        -------
+        Iterator
+            Iterator over results in order of arguments. It raises
+            exception raised by task or TimeoutError if results
+            aren't ready in time.
+        """
+        end_time = None if timeout is None else time.monotonic() + timeout
+        futures = [self.enqueue(func, *args) for args in zip(*iterables)]
+        return _results(futures, end_time)
+
+    async def submit_async(self, task: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Add new task and wait for its result without blocking event loop.
+
         Parameters
         ----------
         task : Callable
@@ -119,19 +628,337 @@ class ThreadPool:
             Positional arguments of task function
         kwargs : Any
             Keyword arguments of task function
+
+        Returns
+        -------
+        Any
+            Result of task. Exception raised by task is raised here.
+            If awaiting is cancelled then task is cancelled too
+            unless it is already started.
+        """
+        return await asyncio.wrap_future(self.enqueue(task, *args, **kwargs))
+
+    def dispose(
+        self,
+        wait: bool = True,
+        cancel_pending: bool = False,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """Finish work of thread pool: new tasks aren't accepted,
+        workers stop after tasks left in queue are executed.
+
+        Parameters
+        ----------
+        wait : bool
+            Wait until all threads are joined
+        cancel_pending : bool
+            Cancel futures of tasks that aren't started instead of executing them
+        timeout : float, optional
+            Maximum number of seconds to wait for threads
+
+        Returns
+        -------
+        bool
+            True if all threads are stopped. Time spent in dispose()
+            is kept in shutdown_time.
+        """
+        start = time.monotonic()
+        with self.condition:
+            self.is_finished = True
+            pending = self._drain() if cancel_pending else []
+            self.condition.notify_all()
+            self.not_full.notify_all()
+            threads = list(self.threads)
+
+        for entry in pending:
+            entry[4].cancel()
+
+        if wait:
+            end_time = None if timeout is None else start + timeout
+            for thread in threads:
+                if thread is threading.current_thread():
+                    # dispose() is called from task
+                    continue
+                if end_time is None:
+                    thread.join()
+                else:
+                    thread.join(max(end_time - time.monotonic(), 0))
+
+        self.shutdown_time = time.monotonic() - start
+        return not any(thread.is_alive() for thread in threads)
+
+    def stats(self) -> dict:
+        """Return snapshot of state and metrics of thread pool.
+
+        Returns
+        -------
+        dict
+            Number of workers, idle workers and tasks in queue, number
+            of expired tasks. If metrics are enabled then also number of
+            executed tasks, throughput in tasks per second since creation
+            of pool, summaries of queue wait and run time histograms
+            (see Histogram.snapshot()) and list of running workers
+            with their number of tasks, busy time and busy ratio.
         """
-        if not self.is_finished:
+        now = time.monotonic()
+        with self.lock:
+            snapshot: dict = {
+                "workers": len(self.threads),
+                "idle_workers": self._idle,
+                "queue_depth": self.queue_depth,
+                "expired": self.expired,
+                "rejected": self.rejected,
+            }
+            workers = list(self._worker_stats)
+            stopped = self._stopped_stats
+            queue_wait = Histogram()
+            run_time = Histogram()
+            queue_wait.merge(stopped.queue_wait)
+            run_time.merge(stopped.run_time)
+            completed = stopped.tasks
+        if not self.metrics:
+            return snapshot
+
+        for stats in workers:
+            queue_wait.merge(stats.queue_wait)
+            run_time.merge(stats.run_time)
+            completed += stats.tasks
+        elapsed = now - self._metrics_start
+        snapshot.update(
+            completed=completed,
+            throughput=completed / elapsed if elapsed > 0 else 0.0,
+            queue_wait=queue_wait.snapshot(),
+            run_time=run_time.snapshot(),
+            worker_stats=[
+                {
+                    "name": stats.name,
+                    "tasks": stats.tasks,
+                    "busy_time": stats.busy_time,
+                    "busy_ratio": stats.busy_ratio(now),
+                }
+                for stats in workers
+            ],
+        )
+        return snapshot
+
+    def _drain(self) -> List[Task]:
+        """Remove and return all tasks that aren't started.
+        Must be called with lock held.
+        """
+        pending = self.tasks
+        self.tasks = []
+        if self._queued is not None:
+            queued = self._queued
+            pending = [entry for entry in pending if entry[2] in queued]
+            queued.clear()
+            self._victims = []
+        return pending
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.dispose()
+
+
+class WorkStealingThreadPool(ThreadPool):
+    """Class implements thread pool with work stealing.
+
+    Every worker owns deque of tasks. Tasks added from worker of this pool
+    are put to deque of that worker without taking shared lock;
+    worker takes tasks from its own deque in LIFO order. Idle worker
+    takes tasks added from other threads from shared heap or steals
+    oldest task from deque of other worker. It suits recursive
+    divide-and-conquer jobs that add subtasks from tasks.
+
+    Priority and deadline of tasks added from workers are only used
+    to drop expired tasks, order of such tasks isn't changed; such tasks
+    aren't limited by max_queue, so workers are never blocked by it.
+
+    Futures of tasks are _StealingFuture: worker of this pool waiting
+    for result of task executes other tasks of pool until task is done,
+    so tasks waiting for their subtasks don't block all workers.
+
+    Other attributes and methods are the same as in ThreadPool.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        """Set attributes and start workers.
+        Parameters are the same as in ThreadPool.
+        """
+        self._deques: List[Deque[Task]] = []
+        super().__init__(*args, **kwargs)
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of tasks waiting for worker."""
+        return self._heap_size() + sum(len(tasks) for tasks in self._deques)
+
+    def _worker(self):
+        """Execute tasks from own deque, shared heap and deques of other workers."""
+        own: Deque[Task] = deque()
+        self._local.tasks = own
+        self._start_worker()
+        with self.lock:
+            self._deques.append(own)
+        try:
+            while True:
+                entry = own.pop() if own else self._steal()
+                if entry is None:
+                    with self.condition:
+                        entry = self._wait_task()
+                    if entry is None:
+                        return
+                self._run(entry)
+        finally:
             with self.lock:
-                self.tasks.append((task, args, kwargs))
+                self._deques.remove(own)
+            self._stop_worker()
 
-            self.event.set()
+    def _take(self) -> Optional[Task]:
+        """Take task from shared heap or steal it.
+        Must be called with lock held.
+        """
+        entry = super()._take()
+        return entry if entry is not None else self._steal()
+
+    def _drain(self) -> List[Task]:
+        """Remove and return all tasks that aren't started.
+        Must be called with lock held.
+        """
+        pending = super()._drain()
+        for tasks in self._deques:
+            while True:
+                try:
+                    pending.append(tasks.popleft())
+                except IndexError:
+                    break
+        return pending
+
+    def _steal(self) -> Optional[Task]:
+        """Take oldest task from deque of some worker if there is any."""
+        for tasks in self._deques:
+            try:
+                return tasks.popleft()
+            except IndexError:
+                continue
+        return None
 
-    def dispose(self):
-        """Finish work of thread pool
-        and wait until all threads are joined.
+    def schedule(
+        self,
+        task: Callable,
+        args: Tuple = (),
+        kwargs: Optional[dict] = None,
+        priority: float = 0,
+        deadline: Optional[float] = None,
+    ) -> Future:
+        """Add new task to be executed if dispose() isn't called.
+        Task added from worker of this pool is put to its own deque.
+        Parameters are the same as in ThreadPool.schedule().
         """
-        self.event.set()
-        self.is_finished = True
+        own = getattr(self._local, "tasks", None)
+        if own is None or self.is_finished:
+            return super().schedule(task, args, kwargs, priority, deadline)
+
+        future = self._new_future()
+        entry = (
+            -priority,
+            math.inf if deadline is None else time.monotonic() + deadline,
+            next(self._counter),
+            time.monotonic() if self.metrics else 0.0,
+            future,
+            task,
+            args,
+            {} if kwargs is None else kwargs,
+        )
+        own.append(entry)
+        # idle workers are counted before they check deques,
+        # so wake-up isn't lost without taking lock here
+        if self._idle > 0:
+            with self.condition:
+                self.condition.notify()
+        elif len(self.threads) < self.max_workers:
+            with self.lock:
+                if len(self.threads) < self.max_workers and not self.is_finished:
+                    self._spawn()
+        return future
+
+    def _new_future(self) -> Future:
+        return _StealingFuture(self)
 
-        for thread in self.threads:
-            thread.join()
+    def _help(self, future: Future, timeout: Optional[float]) -> Optional[float]:
+        """Execute tasks of pool in current worker until future is done
+        or timeout expires. Return time left of timeout.
+        Nothing is executed if current thread isn't worker of pool.
+        """
+        own = getattr(self._local, "tasks", None)
+        if own is None:
+            return timeout
+        end_time = None if timeout is None else time.monotonic() + timeout
+        while not future.done():
+            left = None if end_time is None else end_time - time.monotonic()
+            if left is not None and left <= 0:
+                break
+            entry = own.pop() if own else self._steal()
+            if entry is None:
+                with self.lock:
+                    entry = ThreadPool._take(self)
+            if entry is None:
+                # task of future is running in other worker,
+                # it may add subtasks that can be stolen
+                wait_time = HELP_INTERVAL if left is None else min(left, HELP_INTERVAL)
+                concurrent.futures.wait([future], wait_time)
+                continue
+            self._run(entry)
+        return None if end_time is None else max(end_time - time.monotonic(), 0)
+
+
+class _StealingFuture(Future):
+    """Future of task of WorkStealingThreadPool. Worker of pool waiting
+    for result executes other tasks of pool meanwhile.
+    """
+
+    def __init__(self, pool: WorkStealingThreadPool):
+        super().__init__()
+        self._pool = pool
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        return super().result(self._pool._help(self, timeout))
+
+    def exception(self, timeout: Optional[float] = None) -> Optional[BaseException]:
+        return super().exception(self._pool._help(self, timeout))
+
+
+def _results(futures: List[Future], end_time: Optional[float]) -> Iterator:
+    """Yield results of futures in order until end_time.
+    Futures that are left are cancelled if iteration is stopped.
+    """
+    try:
+        for future in futures:
+            if end_time is None:
+                yield future.result()
+            else:
+                yield future.result(end_time - time.monotonic())
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def as_completed(
+    futures: Iterable[Future], timeout: Optional[float] = None
+) -> Iterator[Future]:
+    """Return iterator over futures that yields them as they complete.
+
+    Parameters
+    ----------
+    futures : Iterable[Future]
+        Futures returned by ThreadPool.enqueue()
+    timeout : float, optional
+        Number of seconds to wait for all futures
+
+    Raises
+    ------
+    TimeoutError
+        If not all futures are completed in time
+    """
+    return concurrent.futures.as_completed(futures, timeout)
@@ -0,0 +1,106 @@
+"""Benchmark for project.decorators.cache
+
+Measure latency of cache hit of cache_results and functools.lru_cache
+for different kinds of arguments.
+
+Measure hit rate of eviction policies on workload where skewed
+popular keys are mixed with long scans of one-time keys.
+
+Usage:
+    python ./scripts/benchmark_cache.py --number 1000000
+    python ./scripts/benchmark_cache.py --hit-rate --size 100
+"""
+
+import argparse
+import functools
+import random
+import sys
+import timeit
+
+import shared
+
+sys.path.insert(0, str(shared.ROOT))
+
+from project.decorators.cache import POLICIES, cache_results
+
+
+def add(x, y=0):
+    return x + y
+
+
+CASES = {
+    "int": ((1,), {}),
+    "two ints": ((1, 2), {}),
+    "float": ((1.5,), {}),
+    "keyword": ((1,), {"y": 2}),
+    "list": (([1, 2, 3], [4]), {}),
+}
+
+
+def hit_latency(func, args, kwargs, number: int) -> float:
+    """Return time of one call in nanoseconds after result is cached."""
+    func(*args, **kwargs)
+    return timeit.timeit(lambda: func(*args, **kwargs), number=number) / number * 1e9
+
+
+def workload(num_calls: int, num_keys: int):
+    """Yield keys: popular keys with Zipf-like distribution and scans."""
+    rng = random.Random(0)
+    weights = [1 / (rank + 1) for rank in range(num_keys)]
+    scan_key = num_keys
+    while num_calls > 0:
+        for key in rng.choices(range(num_keys), weights, k=1000):
+            yield key
+        for _ in range(200):
+            scan_key += 1
+            yield scan_key
+        num_calls -= 1200
+
+
+def hit_rates(size: int, num_calls: int):
+    """Print hit rate of every eviction policy."""
+    print(f"{'policy':<8}{'hit rate':>10}")
+    for policy in POLICIES:
+        misses = [0]
+
+        @cache_results(size, policy=policy)
+        def load(key):
+            misses[0] += 1
+            return key
+
+        calls = 0
+        for key in workload(num_calls, 10 * size):
+            load(key)
+            calls += 1
+        print(f"{policy:<8}{1 - misses[0] / calls:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark project.decorators.cache")
+    parser.add_argument("--number", type=int, default=1_000_000)
+    parser.add_argument(
+        "--hit-rate", action="store_true", help="compare hit rate of policies"
+    )
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--calls", type=int, default=200_000)
+    args = parser.parse_args()
+
+    if args.hit_rate:
+        hit_rates(args.size, args.calls)
+        return
+
+    cached = cache_results(128)(add)
+    lru = functools.lru_cache(128, typed=True)(add)
+    print(f"{'arguments':<12}{'cache_results, ns':>20}{'lru_cache, ns':>16}")
+    for name, (call_args, call_kwargs) in CASES.items():
+        ours = hit_latency(cached, call_args, call_kwargs, args.number)
+        try:
+            theirs = f"{hit_latency(lru, call_args, call_kwargs, args.number):.0f}"
+        except TypeError:
+            # lru_cache doesn't support unhashable arguments
+            theirs = "-"
+        print(f"{name:<12}{ours:>20.0f}{theirs:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark for project.decorators.curry
+
+Measure time of applying arguments one by one with curry_explicit
+and with nested functools.partial for different arities.
+
+Usage:
+    python ./scripts/benchmark_curry.py --number 1000000
+    python ./scripts/benchmark_curry.py --arity 2 3 5
+"""
+
+import argparse
+import functools
+import sys
+import timeit
+
+import shared
+
+sys.path.insert(0, str(shared.ROOT))
+
+from project.decorators.curry import curry_explicit
+
+
+def add(*args: int) -> int:
+    return sum(args)
+
+
+def apply_curried(func, arity: int):
+    for i in range(arity):
+        func = func(i)
+    return func
+
+
+def apply_partial(func, arity: int):
+    for i in range(arity - 1):
+        func = functools.partial(func, i)
+    return func(arity - 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark curry_explicit")
+    parser.add_argument("--number", type=int, default=200000)
+    parser.add_argument("--arity", type=int, nargs="+", default=[2, 3, 5, 10])
+    args = parser.parse_args()
+
+    print(f"{'arity':>6}{'curry, ns':>12}{'partial, ns':>14}{'ratio':>8}")
+    for arity in args.arity:
+        curried = curry_explicit(add, arity)
+        curry_time = timeit.timeit(
+            lambda: apply_curried(curried, arity), number=args.number
+        )
+        partial_time = timeit.timeit(
+            lambda: apply_partial(add, arity), number=args.number
+        )
+        curry_ns = curry_time / args.number * 1e9
+        partial_ns = partial_time / args.number * 1e9
+        print(
+            f"{arity:>6}{curry_ns:>12.0f}{partial_ns:>14.0f}"
+            f"{curry_ns / partial_ns:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
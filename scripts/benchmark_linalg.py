@@ -0,0 +1,188 @@
+"""Benchmarks for project.linalg
+
+Sweep sizes and shapes of matrices and vectors and measure operations
+per second, peak traced memory and number of memory blocks retained
+by every operation for every storage backend. Retained blocks are
+those still allocated after one call, i.e. blocks of its result;
+temporary allocations are reflected in peak memory only, Python
+doesn't count them. Inputs are created lazily, one case at a time.
+
+Results can be saved to JSON file and compared with previously saved
+baseline; script exits with code 1 if some operation became slower
+than baseline more than threshold times.
+
+Usage:
+    python ./scripts/benchmark_linalg.py --sizes 10 100 --save baseline.json
+    python ./scripts/benchmark_linalg.py --sizes 10 100 --baseline baseline.json
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+import shared
+
+sys.path.insert(0, str(shared.ROOT))
+
+from project.linalg.matrix import Matrix
+from project.linalg.mapped_matrix import MappedMatrix
+from project.linalg.vector import Vector
+
+SIZES = [10, 100, 500, 1000, 2000]
+SHAPES = ["square", "tall", "wide"]
+BACKENDS: Dict[str, Callable[[Matrix], Matrix]] = {
+    "list": lambda matrix: matrix,
+    "mapped": MappedMatrix.from_matrix,
+}
+
+
+def shape_of(size: int, shape: str) -> Tuple[int, int]:
+    """Return number of rows and columns of matrix with about size^2 elements."""
+    if shape == "tall":
+        return 4 * size, max(size // 4, 1)
+    if shape == "wide":
+        return max(size // 4, 1), 4 * size
+    return size, size
+
+
+def random_rows(rows: int, cols: int) -> List[List[float]]:
+    return [[random.uniform(-1, 1) for _ in range(cols)] for _ in range(rows)]
+
+
+def measure(operation: Callable, min_time: float) -> Dict[str, float]:
+    """Return operations per second, peak memory in bytes and
+    number of memory blocks retained by result of one operation.
+    """
+    gc.collect()
+    runs = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time or runs == 0:
+        operation()
+        runs += 1
+        elapsed = time.perf_counter() - start
+
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    # values written in place by earlier runs were allocated before tracing
+    # started and their release isn't subtracted from traced memory; they
+    # are replaced by traced values in two runs because of float free list
+    for _ in range(2):
+        operation()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    result = operation()
+    _, peak = tracemalloc.get_traced_memory()
+    peak -= base
+    tracemalloc.stop()
+    retained = sys.getallocatedblocks() - blocks
+    del result
+
+    return {"ops_per_sec": runs / elapsed, "peak_bytes": peak, "retained": retained}
+
+
+def matrix_cases(sizes: List[int], max_mul_size: int):
+    """Yield name and operation for matrix benchmarks."""
+    for backend, make in BACKENDS.items():
+        for shape in SHAPES:
+            for size in sizes:
+                rows, cols = shape_of(size, shape)
+                a = make(Matrix(random_rows(rows, cols)))
+                b = make(Matrix(random_rows(rows, cols)))
+                yield f"{backend}/add/{shape}/{size}", lambda a=a, b=b: a + b
+                out = make(Matrix(random_rows(rows, cols)))
+                yield (
+                    f"{backend}/add_out/{shape}/{size}",
+                    lambda a=a, b=b, out=out: a.add(b, out=out),
+                )
+                yield f"{backend}/transpose/{shape}/{size}", a.transpos
+                if size <= max_mul_size:
+                    c = make(Matrix(random_rows(cols, rows)))
+                    yield f"{backend}/mul/{shape}/{size}", lambda a=a, c=c: a * c
+
+
+def vector_cases(sizes: List[int]):
+    """Yield name and operation for vector benchmarks."""
+    for size in sizes:
+        length = size * size
+        u = Vector([random.uniform(-1, 1) for _ in range(length)])
+        v = Vector([random.uniform(-1, 1) for _ in range(length)])
+        yield f"list/dot/vector/{size}", lambda u=u, v=v: u.scalar_product(v)
+        yield f"list/angle/vector/{size}", lambda u=u, v=v: u.angle(v)
+        yield f"list/add/vector/{size}", lambda u=u, v=v: u + v
+        # u is changed in place; values stay bounded as v is added and subtracted
+        yield f"list/axpy/vector/{size}", lambda u=u, v=v: u.axpy(1.0, v).axpy(-1.0, v)
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> List[str]:
+    """Return names of operations that are slower than baseline
+    more than threshold times.
+    """
+    slow = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        slowdown = baseline[name]["ops_per_sec"] / result["ops_per_sec"]
+        if slowdown > threshold:
+            slow.append(f"{name}: {slowdown:.2f}x slower")
+    return slow
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark project.linalg")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument(
+        "--max-mul-size",
+        type=int,
+        default=200,
+        help="largest size for multiplication, it is cubic in size",
+    )
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--save", help="file to save results to")
+    parser.add_argument("--baseline", help="file with results to compare with")
+    parser.add_argument("--threshold", type=float, default=1.5)
+    args = parser.parse_args()
+
+    random.seed(0)
+    results = {}
+    # inputs of every case are created just before it is measured
+    cases = itertools.chain(
+        matrix_cases(args.sizes, args.max_mul_size), vector_cases(args.sizes)
+    )
+    print(f"{'operation':<32}{'ops/sec':>12}{'peak KiB':>12}{'retained':>10}")
+    for name, operation in cases:
+        result = measure(operation, args.min_time)
+        results[name] = result
+        print(
+            f"{name:<32}{result['ops_per_sec']:>12.2f}"
+            f"{result['peak_bytes'] / 1024:>12.1f}{result['retained']:>10}"
+        )
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        slow = compare(results, baseline, args.threshold)
+        if slow:
+            print("Performance regression:")
+            print("\n".join(slow))
+            sys.exit(1)
+        print("No performance regression")
+
+
+if __name__ == "__main__":
+    main()
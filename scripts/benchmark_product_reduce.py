@@ -0,0 +1,67 @@
+"""Benchmark for project.threadpool.cartesian_sum.parallel_product_reduce
+
+Reduce function over Cartesian product with process pools of different
+sizes and print time and speedup relative to one process. Chunks are
+regenerated in workers, so speedup should grow linearly with number
+of processes up to number of cores.
+
+Usage:
+    python ./scripts/benchmark_product_reduce.py --size 200 --repeat 3
+    python ./scripts/benchmark_product_reduce.py --processes 1 2 4 8
+"""
+
+import argparse
+import operator
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import shared
+
+sys.path.insert(0, str(shared.ROOT))
+
+from project.threadpool.cartesian_sum import parallel_product_reduce
+
+
+def work(*args: int) -> int:
+    return sum(x * x for x in args) % 7
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel_product_reduce")
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument(
+        "--processes",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+    )
+    args = parser.parse_args()
+
+    num = range(args.size)
+    print(f"product of {args.size}^{args.repeat} tuples")
+    print(f"{'processes':>10}{'time, s':>10}{'speedup':>10}")
+    base = None
+    for processes in args.processes:
+        with ProcessPoolExecutor(processes) as executor:
+            # start processes before measuring
+            list(executor.map(abs, range(processes)))
+            start = time.perf_counter()
+            parallel_product_reduce(
+                work,
+                operator.add,
+                num,
+                repeat=args.repeat,
+                chunk_size=args.chunk_size,
+                executor=executor,
+            )
+            elapsed = time.perf_counter() - start
+        base = elapsed if base is None else base
+        print(f"{processes:>10}{elapsed:>10.3f}{base / elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Benchmarks for project.threadpool
+
+Measure throughput of thread pool on large number of tiny tasks:
+time to enqueue all tasks and time until all of them are executed.
+
+With --metrics the same is measured for pool that collects metrics
+and their summary is printed.
+
+Measure time of recursive divide-and-conquer job, which tasks add
+subtasks, for thread pool with shared queue and with work stealing,
+and contention on shared lock of pool: number of acquisitions, number
+of acquisitions that had to wait and time of waiting summed over
+threads. In "join" run tasks of work-stealing pool wait for results
+of their subtasks; pool with shared queue can't run such job with
+fewer threads than depth of recursion.
+
+Usage:
+    python ./scripts/benchmark_threadpool.py --tasks 1000000 --threads 4
+    python ./scripts/benchmark_threadpool.py --tasks 100000 --metrics
+    python ./scripts/benchmark_threadpool.py --recursive --threads 8 16 32
+"""
+
+import argparse
+import sys
+import threading
+import time
+
+import shared
+
+sys.path.insert(0, str(shared.ROOT))
+
+from project.threadpool.threadpool import ThreadPool, WorkStealingThreadPool
+
+
+def tiny_task():
+    pass
+
+
+def throughput(num_tasks: int, num_threads: int, metrics: bool = False):
+    """Print time of enqueuing and executing num_tasks tiny tasks."""
+    pool = ThreadPool(num_threads, metrics=metrics)
+    start = time.perf_counter()
+    for _ in range(num_tasks):
+        pool.enqueue(tiny_task)
+    enqueued = time.perf_counter()
+    pool.dispose()
+    finished = time.perf_counter()
+
+    print(f"threads: {num_threads}, tasks: {num_tasks}")
+    print(f"enqueue: {enqueued - start:.3f} s")
+    print(f"total:   {finished - start:.3f} s")
+    print(f"throughput: {num_tasks / (finished - start):.0f} tasks/s")
+    if metrics:
+        stats = pool.stats()
+        for name in ("queue_wait", "run_time"):
+            summary = stats[name]
+            print(
+                f"{name}: mean {summary['mean'] * 1e6:.1f} us, "
+                f"p99 {summary['p99'] * 1e6:.0f} us, max {summary['max'] * 1e6:.0f} us"
+            )
+
+
+class CountingLock:
+    """Lock that counts acquisitions and time spent waiting for it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_time = 0.0
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if self._lock.acquire(False):
+            self.acquisitions += 1
+            return True
+        if not blocking:
+            return False
+        start = time.perf_counter()
+        if not self._lock.acquire(True, timeout):
+            return False
+        # counters are changed with lock held
+        self.acquisitions += 1
+        self.contended += 1
+        self.wait_time += time.perf_counter() - start
+        return True
+
+    def release(self):
+        self._lock.release()
+
+    def _is_owned(self) -> bool:
+        return self._lock.locked()
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def counting_pool(pool_class, num_threads: int):
+    """Return pool which shared lock is CountingLock.
+    Workers are started on demand after lock is replaced.
+    """
+    pool = pool_class(min_workers=0, max_workers=num_threads)
+    pool.lock = CountingLock()
+    pool.condition = threading.Condition(pool.lock)
+    pool.not_full = threading.Condition(pool.lock)
+    return pool
+
+
+def recursive_sum(pool_class, num_threads: int, size: int, leaf: int):
+    """Return time of summing range(size) by recursive splitting
+    into tasks until leaf numbers are left and lock of pool.
+    """
+    pool = counting_pool(pool_class, num_threads)
+    total = [0]
+    lock = threading.Lock()
+    done = threading.Event()
+    expected = size * (size - 1) // 2
+
+    def partial_sum(lo, hi):
+        if hi - lo <= leaf:
+            part = sum(range(lo, hi))
+            with lock:
+                total[0] += part
+                if total[0] == expected:
+                    done.set()
+            return
+        mid = (lo + hi) // 2
+        pool.enqueue(partial_sum, lo, mid)
+        pool.enqueue(partial_sum, mid, hi)
+
+    start = time.perf_counter()
+    pool.enqueue(partial_sum, 0, size)
+    done.wait()
+    elapsed = time.perf_counter() - start
+    pool.dispose()
+    return elapsed, pool.lock
+
+
+def recursive_join(num_threads: int, size: int, leaf: int):
+    """Return time of summing range(size) by work-stealing pool
+    where tasks return sums of results of their subtasks and lock of pool.
+    """
+    pool = counting_pool(WorkStealingThreadPool, num_threads)
+
+    def partial_sum(lo, hi):
+        if hi - lo <= leaf:
+            return sum(range(lo, hi))
+        mid = (lo + hi) // 2
+        left = pool.enqueue(partial_sum, lo, mid)
+        right = pool.enqueue(partial_sum, mid, hi)
+        return left.result() + right.result()
+
+    start = time.perf_counter()
+    assert pool.enqueue(partial_sum, 0, size).result() == size * (size - 1) // 2
+    elapsed = time.perf_counter() - start
+    pool.dispose()
+    return elapsed, pool.lock
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark project.threadpool")
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument(
+        "--recursive",
+        action="store_true",
+        help="compare shared queue and work stealing on recursive job",
+    )
+    parser.add_argument(
+        "--metrics", action="store_true", help="collect and print pool metrics"
+    )
+    parser.add_argument("--size", type=int, default=10_000_000)
+    parser.add_argument("--leaf", type=int, default=100)
+    args = parser.parse_args()
+
+    if not args.recursive:
+        for num_threads in args.threads:
+            throughput(args.tasks, num_threads, args.metrics)
+        return
+
+    print(
+        f"{'threads':>8}{'pool':>10}{'time, s':>10}{'locks':>10}"
+        f"{'contended':>11}{'wait, ms':>10}"
+    )
+    for num_threads in args.threads:
+        runs = [
+            ("shared", recursive_sum(ThreadPool, num_threads, args.size, args.leaf)),
+            (
+                "stealing",
+                recursive_sum(
+                    WorkStealingThreadPool, num_threads, args.size, args.leaf
+                ),
+            ),
+            ("join", recursive_join(num_threads, args.size, args.leaf)),
+        ]
+        for name, (elapsed, lock) in runs:
+            print(
+                f"{num_threads:>8}{name:>10}{elapsed:>10.3f}{lock.acquisitions:>10}"
+                f"{lock.contended:>11}{lock.wait_time * 1e3:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
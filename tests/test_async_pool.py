@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+import pytest
+from project.threadpool.threadpool import ThreadPool
+from project.threadpool.async_pool import PoolExecutor, AsyncSubmitter
+
+
+def slow_square(x: int) -> int:
+    time.sleep(0.1)
+    return x * x
+
+
+def test_submit_async():
+    pool = ThreadPool(2)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        result = await pool.submit_async(slow_square, 7)
+        task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(main())
+    # event loop isn't blocked while task is executed
+    assert result == 49
+    assert ticks > 3
+    pool.dispose()
+
+
+def test_submit_async_exception():
+    pool = ThreadPool(1)
+
+    async def main():
+        with pytest.raises(ZeroDivisionError):
+            await pool.submit_async(divmod, 1, 0)
+
+    asyncio.run(main())
+    pool.dispose()
+
+
+def test_pool_executor():
+    pool = ThreadPool(2)
+    executor = PoolExecutor(pool)
+    threads = set()
+
+    def task(x):
+        threads.add(threading.current_thread())
+        return x + 1
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(executor)
+        first = await loop.run_in_executor(None, task, 1)
+        second = await loop.run_in_executor(executor, task, 2)
+        return first, second
+
+    assert asyncio.run(main()) == (2, 3)
+    # tasks are executed by threads of pool
+    assert threads <= set(pool.threads)
+    assert pool.is_finished
+
+
+def test_async_submitter_backpressure():
+    pool = ThreadPool(4)
+    submitter = AsyncSubmitter(pool, max_pending=2)
+    event = threading.Event()
+
+    async def main():
+        first = await submitter.submit(event.wait, 5)
+        await submitter.submit(event.wait, 5)
+        assert submitter.pending == 2
+        # third task waits until one of pending tasks is done
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(submitter.submit(event.wait, 5), 0.1)
+        event.set()
+        await first
+        return await submitter.run(slow_square, 3)
+
+    assert asyncio.run(main()) == 9
+    assert submitter.pending == 0
+    pool.dispose()
+
+
+def test_async_submitter_invalid_size():
+    pool = ThreadPool(1)
+    with pytest.raises(ValueError):
+        AsyncSubmitter(pool, 0)
+    pool.dispose()
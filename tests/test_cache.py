@@ -1,4 +1,13 @@
-from project.decorators.cache import cache_results
+import asyncio
+import pytest
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from project.decorators.cache import cache_results, make_key
+from project.decorators.policies import LRUCache
+from project.decorators.shared_cache import SharedCache
+from project.threadpool.threadpool import ThreadPool
 from typing import List
 
 
@@ -68,3 +77,587 @@ def test_cache_non_hashable():
 
     assert f([6, 3, 1]) == 10
     assert count[0] == 4  # calculate
+
+
+def test_cache_keyword_arguments_order():
+    count = [0]
+
+    @cache_results(2)
+    def sub(x: int, y: int):
+        count[0] += 1
+        return x - y
+
+    assert sub(x=5, y=3) == 2
+    assert sub(y=3, x=5) == 2
+    assert count[0] == 1
+    assert sub(5, 3) == 2
+    assert count[0] == 2
+
+
+def test_cache_typed():
+    count = [0]
+
+    @cache_results(3)
+    def identity(x):
+        count[0] += 1
+        return x
+
+    assert identity(1) == 1
+    assert identity(1.0) == 1.0
+    assert isinstance(identity(1.0), float)
+    assert identity(True) is True
+    assert count[0] == 3
+
+    untyped = cache_results(3, typed=False)(lambda x: x)
+    assert untyped(1) == 1
+    assert isinstance(untyped(1.0), int)
+
+
+def test_cache_unhashable_arguments():
+    count = [0]
+
+    @cache_results(4)
+    def size(value):
+        count[0] += 1
+        return len(value)
+
+    assert size({"a": [1, 2], "b": {3}}) == 2
+    assert size({"b": {3}, "a": [1, 2]}) == 2
+    assert count[0] == 1
+    # list and tuple with same elements are different arguments
+    assert size([1, 2]) == 2
+    assert size((1, 2)) == 2
+    assert count[0] == 3
+    assert size(bytearray(b"abc")) == 3
+    assert size(bytearray(b"abc")) == 3
+    assert count[0] == 4
+
+
+def test_cache_unhashable_untyped():
+    echo = cache_results(8, typed=False)(lambda value: value)
+    # replacements of unhashable arguments don't collide with other ones
+    assert echo([1, 2]) == [1, 2]
+    assert echo((list, (1, 2))) == (list, (1, 2))
+    assert echo({"a": 1}) == {"a": 1}
+    assert echo((dict, frozenset({("a", 1)}))) == (dict, frozenset({("a", 1)}))
+    assert echo({1}) == {1}
+    assert echo((set, frozenset({1}))) == (set, frozenset({1}))
+    assert echo(bytearray(b"a")) == bytearray(b"a")
+    assert echo((bytearray, b"a")) == (bytearray, b"a")
+
+
+class Hashed:
+    def __init__(self):
+        self.count = 0
+
+    def __hash__(self):
+        self.count += 1
+        return 1
+
+
+def test_cache_hit_hashes_key_in_store_only():
+    arg = Hashed()
+    key = make_key((arg,), {})
+    store = LRUCache()
+    store.put(key, 0)
+    equal_key = make_key((arg,), {})
+    count = arg.count
+    store.get(equal_key)
+    store_hashes = arg.count - count
+
+    echo = cache_results(8)(lambda value: value)
+    echo(arg)
+    count = arg.count
+    assert echo(arg) is arg
+    # key is hashed only by lookup in store
+    assert arg.count - count == store_hashes
+
+
+class Unhashable:
+    __hash__ = None  # type: ignore[assignment]
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def test_cache_unhashable_object():
+    count = [0]
+
+    @cache_results(2)
+    def get(obj):
+        count[0] += 1
+        return obj.value
+
+    assert get(Unhashable(5)) == 5
+    assert get(Unhashable(5)) == 5
+    assert count[0] == 1
+
+
+def test_cache_disabled():
+    count = [0]
+
+    @cache_results()
+    def add(x, y):
+        count[0] += 1
+        return x + y
+
+    # unhashable arguments are fine, keys aren't computed
+    assert add([1], [2]) == [1, 2]
+    assert add([1], [2]) == [1, 2]
+    assert count[0] == 2
+    assert add.__name__ == "add"
+
+
+def test_cache_thread_safe_single_flight():
+    count = [0]
+    started = threading.Event()
+    release = threading.Event()
+
+    @cache_results(2, thread_safe=True)
+    def slow_square(x):
+        count[0] += 1
+        started.set()
+        release.wait(5)
+        return x * x
+
+    with ThreadPool(4) as pool:
+        first = pool.enqueue(slow_square, 3)
+        started.wait(5)
+        others = [pool.enqueue(slow_square, 3) for _ in range(3)]
+        time.sleep(0.1)
+        release.set()
+        results = [future.result() for future in [first] + others]
+
+    assert results == [9] * 4
+    assert count[0] == 1
+    assert slow_square(3) == 9
+    assert count[0] == 1
+
+
+def test_cache_thread_safe_exception_is_not_cached():
+    count = [0]
+    started = threading.Event()
+    release = threading.Event()
+
+    @cache_results(2, thread_safe=True)
+    def fail(x):
+        count[0] += 1
+        started.set()
+        release.wait(5)
+        raise ValueError(x)
+
+    with ThreadPool(2) as pool:
+        first = pool.enqueue(fail, 1)
+        started.wait(5)
+        second = pool.enqueue(fail, 1)
+        time.sleep(0.1)
+        release.set()
+        with pytest.raises(ValueError):
+            first.result()
+        # waiting caller gets exception of single call
+        with pytest.raises(ValueError):
+            second.result()
+
+    assert count[0] == 1
+    with pytest.raises(ValueError):
+        fail(1)
+    assert count[0] == 2
+
+
+def test_cache_thread_safe_many_keys():
+    @cache_results(8, thread_safe=True)
+    def double(x):
+        return 2 * x
+
+    with ThreadPool(8) as pool:
+        futures = [pool.enqueue(double, i % 20) for i in range(2000)]
+        assert [future.result() for future in futures] == [
+            2 * (i % 20) for i in range(2000)
+        ]
+
+
+def test_cache_ttl():
+    count = [0]
+
+    @cache_results(4, ttl=0.05)
+    def square(x):
+        count[0] += 1
+        return x * x
+
+    assert square(3) == 9
+    assert square(3) == 9
+    assert count[0] == 1
+    time.sleep(0.06)
+    assert square(3) == 9
+    assert count[0] == 2
+
+
+def test_cache_max_weight():
+    count = [0]
+
+    @cache_results(max_weight=12, weigh=len)
+    def repeat(s, n):
+        count[0] += 1
+        return s * n
+
+    repeat("a", 6)
+    repeat("b", 4)
+    repeat("a", 6)
+    assert count[0] == 2
+    # result of weight 5 evicts least recently used "bbbb"
+    repeat("c", 5)
+    assert count[0] == 3
+    repeat("a", 6)
+    assert count[0] == 3
+    repeat("b", 4)
+    assert count[0] == 4
+
+
+@pytest.mark.parametrize("policy", ["lru", "lfu", "arc"])
+def test_cache_policies(policy):
+    @cache_results(2, policy=policy)
+    def identity(x):
+        return x
+
+    for i in range(10):
+        assert identity(i % 3) == i % 3
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"policy": "fifo"}, {"ttl": 0}, {"max_weight": -1}],
+)
+def test_cache_invalid_options(kwargs):
+    with pytest.raises(ValueError):
+        cache_results(2, **kwargs)
+
+
+def test_cache_none_result():
+    count = [0]
+
+    @cache_results(2)
+    def nothing():
+        count[0] += 1
+
+    nothing()
+    nothing()
+    assert count[0] == 1
+
+
+def test_cache_info():
+    @cache_results(2)
+    def slow_identity(x):
+        time.sleep(0.01)
+        return x
+
+    for x in [1, 2, 1, 1, 3]:
+        slow_identity(x)
+
+    info = slow_identity.cache_info()
+    assert (info.hits, info.misses, info.evictions, info.size) == (2, 3, 1, 2)
+    assert info.time_saved >= 0.02
+
+
+def test_cache_clear():
+    count = [0]
+
+    @cache_results(2)
+    def identity(x):
+        count[0] += 1
+        return x
+
+    identity(1)
+    identity.cache_clear()
+    assert identity.cache_info() == (0, 0, 0, 0, 0, 0.0)
+    identity(1)
+    assert count[0] == 2
+
+
+def test_cache_peek():
+    @cache_results(2)
+    def identity(x, y=0):
+        return x
+
+    identity(1)
+    identity(2, y=3)
+    assert identity.cache_peek(1) == 1
+    assert identity.cache_peek(2, y=3) == 2
+    with pytest.raises(KeyError):
+        identity.cache_peek(3)
+    # peek doesn't make entry recently used
+    identity(4)
+    with pytest.raises(KeyError):
+        identity.cache_peek(1)
+    assert identity.cache_info().hits == 0
+
+
+def test_cache_on_evict():
+    evicted = []
+
+    @cache_results(1, ttl=0.05, on_evict=lambda key, result: evicted.append(result))
+    def identity(x):
+        return x
+
+    identity(1)
+    identity(2)
+    assert evicted == [1]
+    time.sleep(0.06)
+    identity(2)
+    assert evicted == [1, 2]
+    assert identity.cache_info().evictions == 2
+
+
+def test_cache_info_thread_safe():
+    @cache_results(4, thread_safe=True)
+    def identity(x):
+        return x
+
+    with ThreadPool(4) as pool:
+        list(pool.map(identity, [i % 4 for i in range(100)]))
+    info = identity.cache_info()
+    assert info.hits + info.misses == 100
+    assert info.misses == 4
+
+
+def test_cache_callbacks_use_cache():
+    infos = []
+
+    def on_evict(key, result):
+        # callbacks are called without lock of cache
+        infos.append(identity.cache_info())
+        with pytest.raises(KeyError):
+            identity.cache_peek(result)
+
+    @cache_results(1, ttl=0.05, thread_safe=True, on_evict=on_evict)
+    def identity(x):
+        return x
+
+    def calls():
+        identity(1)
+        identity(2)
+        time.sleep(0.06)
+        identity(2)
+
+    thread = threading.Thread(target=calls, daemon=True)
+    thread.start()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert [info.evictions for info in infos] == [1, 2]
+
+
+def test_cache_weigh_uses_cache():
+    def weigh(result):
+        return square.cache_info().size + 1
+
+    @cache_results(max_weight=10, thread_safe=True, weigh=weigh)
+    def square(x):
+        return x * x
+
+    thread = threading.Thread(
+        target=lambda: [square(i % 3) for i in range(6)], daemon=True
+    )
+    thread.start()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert square.cache_info().misses == 3
+
+
+def test_cache_info_disabled():
+    identity = cache_results()(lambda x: x)
+    identity(1)
+    identity(1)
+    assert identity.cache_info().misses == 2
+    with pytest.raises(KeyError):
+        identity.cache_peek(1)
+
+
+def test_cache_coroutine():
+    count = [0]
+
+    @cache_results(2)
+    async def square(x):
+        count[0] += 1
+        await asyncio.sleep(0.01)
+        return x * x
+
+    async def main():
+        # concurrent calls share one task
+        first = await asyncio.gather(*(square(3) for _ in range(5)))
+        second = await square(3)
+        return first, second
+
+    assert asyncio.run(main()) == ([9] * 5, 9)
+    assert count[0] == 1
+    # result is cached between event loops
+    assert asyncio.run(square(3)) == 9
+    assert count[0] == 1
+    assert square.cache_info().misses == 1
+
+
+def test_cache_coroutine_exception_is_not_cached():
+    count = [0]
+
+    @cache_results(2)
+    async def fail(x):
+        count[0] += 1
+        await asyncio.sleep(0.01)
+        raise ValueError(x)
+
+    async def main():
+        return await asyncio.gather(fail(1), fail(1), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert count[0] == 1
+    with pytest.raises(ValueError):
+        asyncio.run(fail(1))
+    assert count[0] == 2
+
+
+def test_cache_coroutine_cancelled_caller():
+    count = [0]
+
+    @cache_results(2)
+    async def square(x):
+        count[0] += 1
+        await asyncio.sleep(0.05)
+        return x * x
+
+    async def main():
+        first = asyncio.ensure_future(square(4))
+        second = asyncio.ensure_future(square(4))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        # other caller still gets result
+        return await second, first.cancelled()
+
+    assert asyncio.run(main()) == (16, True)
+    assert count[0] == 1
+    assert square.cache_peek(4) == 16
+
+
+def test_cache_coroutine_cancelled_task_is_not_cached():
+    count = [0]
+
+    @cache_results(2)
+    async def cancelled(x):
+        count[0] += 1
+        raise asyncio.CancelledError()
+
+    async def main():
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled(1)
+
+    asyncio.run(main())
+    asyncio.run(main())
+    assert count[0] == 2
+
+
+def test_cache_coroutine_ttl():
+    count = [0]
+
+    @cache_results(2, ttl=0.05)
+    async def square(x):
+        count[0] += 1
+        return x * x
+
+    asyncio.run(square(2))
+    asyncio.run(square(2))
+    assert count[0] == 1
+    time.sleep(0.06)
+    asyncio.run(square(2))
+    assert count[0] == 2
+
+
+def test_cache_coroutine_disabled():
+    @cache_results()
+    async def square(x):
+        return x * x
+
+    assert asyncio.iscoroutinefunction(square)
+    assert asyncio.run(square(5)) == 25
+
+
+def test_cache_disk(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    calls: List[int] = []
+
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    first = cache_results(2, disk=path)(square)
+    assert [first(i) for i in range(4)] == [0, 1, 4, 9]
+    # evicted from memory, found on disk
+    assert first(0) == 0
+    assert calls == [0, 1, 2, 3]
+
+    second = cache_results(2, disk=path)(square)
+    assert second(3) == 9
+    assert second.cache_peek(1) == 1
+    assert calls == [0, 1, 2, 3]
+    assert second.cache_info().hits == 1
+
+    second.cache_clear()
+    # memory of first function keeps 3 and 0
+    assert first(2) == 4
+    assert calls == [0, 1, 2, 3, 2]
+
+
+def test_cache_disk_thread_safe(tmp_path):
+    calls: List[int] = []
+
+    @cache_results(disk=str(tmp_path / "cache.bin"), thread_safe=True)
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    assert square(3) == 9
+    assert square(3) == 9
+    assert calls == [3]
+
+
+def test_cache_disk_coroutine(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    calls: List[int] = []
+
+    async def square(x):
+        calls.append(x)
+        return x * x
+
+    assert asyncio.run(cache_results(disk=path)(square)(4)) == 16
+    assert asyncio.run(cache_results(disk=path)(square)(4)) == 16
+    assert calls == [4]
+
+
+def square_shared(shared, x):
+    # each worker process has its own memory tier
+    return cache_results(shared=shared)(pow)(x, 2)
+
+
+def test_cache_shared():
+    with SharedCache(1 << 16) as shared:
+        calls: List[int] = []
+
+        @cache_results(1, shared=shared)
+        def square(x, y):
+            calls.append(x)
+            return x**y
+
+        with ProcessPoolExecutor(2, mp_context=get_context("fork")) as executor:
+            results = executor.map(square_shared, [shared] * 4, range(4))
+            assert list(results) == [0, 1, 4, 9]
+        # results of worker processes are found in shared memory
+        assert [square(i, 2) for i in range(4)] == [0, 1, 4, 9]
+        assert calls == []
+        square.cache_clear()
+        assert square(2, 2) == 4
+        assert calls == [2]
+
+
+def test_cache_shared_and_disk(tmp_path):
+    with SharedCache(1 << 16) as shared, pytest.raises(ValueError):
+        cache_results(disk=str(tmp_path / "cache.bin"), shared=shared)
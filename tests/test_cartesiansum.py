@@ -1,5 +1,16 @@
+import functools
+import itertools
+import operator
 import pytest
-from project.threadpool.cartesian_sum import cartesian_product_sum
+from concurrent.futures import ThreadPoolExecutor
+from project.threadpool.cartesian_sum import (
+    cartesian_product_sum,
+    parallel_product_reduce,
+)
+
+
+def max_plus_min(*args):
+    return max(args) + min(args)
 
 
 @pytest.mark.parametrize(
@@ -12,3 +23,58 @@ def test_cartesian_product_sum(num, total_sum):
 def test_cartesian_product_sum_empty_input():
     with pytest.raises(ValueError):
         cartesian_product_sum([])
+
+
+@pytest.mark.parametrize("num", [[1], [1, 2, 3], [-5, 0, 7, 2]])
+@pytest.mark.parametrize("repeat", [1, 2, 3, 4])
+def test_cartesian_product_sum_repeat(num, repeat):
+    expected = sum(map(sum, itertools.product(num, repeat=repeat)))
+    assert cartesian_product_sum(num, repeat) == expected
+
+
+def test_cartesian_product_sum_invalid_repeat():
+    with pytest.raises(ValueError):
+        cartesian_product_sum([1], 0)
+
+
+def brute_force(func, reducer, *iterables, repeat=1):
+    return functools.reduce(
+        reducer, itertools.starmap(func, itertools.product(*iterables, repeat=repeat))
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5, 7, 16, 100, None])
+def test_parallel_product_reduce_chunks(chunk_size):
+    iterables = [range(3), [5, -1], range(4)]
+    with ThreadPoolExecutor(2) as executor:
+        result = parallel_product_reduce(
+            max_plus_min,
+            operator.add,
+            *iterables,
+            chunk_size=chunk_size,
+            executor=executor
+        )
+    assert result == brute_force(max_plus_min, operator.add, *iterables)
+
+
+@pytest.mark.parametrize("repeat", [1, 2, 3])
+def test_parallel_product_reduce_repeat(repeat):
+    with ThreadPoolExecutor(2) as executor:
+        result = parallel_product_reduce(
+            max_plus_min, max, [1, -2, 3], [4, 5], repeat=repeat, executor=executor
+        )
+    assert result == brute_force(max_plus_min, max, [1, -2, 3], [4, 5], repeat=repeat)
+
+
+def test_parallel_product_reduce_process_pool():
+    result = parallel_product_reduce(operator.add, operator.add, range(30), repeat=2)
+    assert result == cartesian_product_sum(list(range(30)))
+
+
+@pytest.mark.parametrize(
+    "iterables, kwargs",
+    [([[]], {}), ([], {}), ([[1]], {"repeat": 0}), ([[1]], {"chunk_size": 0})],
+)
+def test_parallel_product_reduce_invalid(iterables, kwargs):
+    with pytest.raises(ValueError):
+        parallel_product_reduce(operator.add, operator.add, *iterables, **kwargs)
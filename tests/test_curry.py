@@ -1,4 +1,5 @@
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from project.decorators.curry import curry_explicit, uncurry_explicit
 
 
@@ -73,3 +74,27 @@ def test_uncurry_built_in_with_arbitrary_arity():
     # number of arguments of g is frozen and can't exceed 3
     with pytest.raises(TypeError):
         g(1, 2, 3, 9)
+
+
+def test_curry_reusable():
+    f = curry_explicit(lambda x, y, z: x * 100 + y * 10 + z, 3)
+    assert f(1)(2)(3) == 123
+    assert f(4)(5)(6) == 456
+    g = f(7)
+    h = g(8)
+    assert h(9) == 789
+    assert g(0)(1) == 701
+    assert h(0) == 780
+
+
+def test_curry_zero_arity_with_argument():
+    f = curry_explicit(lambda: 6, 0)
+    with pytest.raises(TypeError):
+        f(1)
+
+
+def test_curry_threads():
+    f = curry_explicit(lambda x, y: (x, y), 2)
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(lambda i: f(i)(-i), range(1000)))
+    assert results == [(i, -i) for i in range(1000)]
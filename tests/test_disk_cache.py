@@ -0,0 +1,201 @@
+import json
+import os
+import pytest
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from project.decorators.disk_cache import RECORD, DiskCache
+
+
+def test_disk_cache_put_get(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    with DiskCache(path) as cache:
+        cache.put("a", [1, 2])
+        cache.put(("b", 1), {"c": 3})
+        assert cache.get("a") == [1, 2]
+        assert cache.get(("b", 1)) == {"c": 3}
+        assert cache.get("missing", 0) == 0
+        assert len(cache) == 2
+
+
+def test_disk_cache_persistent(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    with DiskCache(path) as cache:
+        cache.put("a", 1)
+        cache.put("a", 2)
+    with DiskCache(path) as cache:
+        # latest record wins
+        assert cache.get("a") == 2
+
+
+def test_disk_cache_ttl(tmp_path):
+    with DiskCache(str(tmp_path / "cache.bin")) as cache:
+        cache.put("a", 1, ttl=0.05)
+        assert cache.get("a") == 1
+        time.sleep(0.06)
+        assert cache.get("a") is None
+
+
+def test_disk_cache_compaction(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    with DiskCache(path, max_bytes=4096) as cache:
+        for i in range(200):
+            cache.put(i, b"x" * 100)
+            assert os.path.getsize(path) <= 4096
+        # newest keys are kept
+        assert cache.get(199) == b"x" * 100
+        assert cache.get(0) is None
+
+
+def test_disk_cache_compact_drops_old_records(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    with DiskCache(path) as cache:
+        for i in range(10):
+            cache.put("a", i)
+        size = os.path.getsize(path)
+        cache.compact()
+        assert os.path.getsize(path) < size
+        assert cache.get("a") == 9
+
+
+def test_disk_cache_sees_other_instance(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    with DiskCache(path, max_bytes=2048) as first, DiskCache(path) as second:
+        first.put("a", 1)
+        assert second.get("a") == 1
+        # file replaced by compaction is reopened
+        for i in range(50):
+            first.put(i, b"y" * 50)
+        second.put("b", 2)
+        assert first.get("b") == 2
+        assert second.get(49) == b"y" * 50
+
+
+def test_disk_cache_clear(tmp_path):
+    with DiskCache(str(tmp_path / "cache.bin")) as cache:
+        cache.put("a", 1)
+        cache.clear()
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+
+def test_disk_cache_incomplete_record(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    with DiskCache(path) as cache:
+        cache.put("a", 1)
+    with open(path, "ab") as file:
+        file.write(b"\0" * 10)
+    with DiskCache(path) as cache:
+        assert cache.get("a") == 1
+        cache.put("b", 2)
+    with DiskCache(path) as cache:
+        # record written after garbage isn't lost for new readers
+        assert cache.get("a") == 1
+        assert cache.get("b") == 2
+
+
+def test_disk_cache_torn_record(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    with DiskCache(path, max_bytes=4096) as cache:
+        cache.put("a", 1)
+        # writer killed in the middle of record
+        with open(path, "ab") as file:
+            file.write(RECORD.pack(b"\0" * 16, 0.0, 100, 0)[:20])
+        for i in range(200):
+            cache.put(i, b"x" * 10)
+            assert os.path.getsize(path) <= 4096
+        assert cache.get(199) == b"x" * 10
+        assert cache.get(190) == b"x" * 10
+
+
+def test_disk_cache_short_write(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.bin")
+    write = os.write
+
+    def short_write(fd, data):
+        return write(fd, bytes(data[:7]))
+
+    with DiskCache(path) as cache:
+        monkeypatch.setattr(os, "write", short_write)
+        cache.put("a", b"z" * 100)
+        monkeypatch.undo()
+        cache.put("b", 2)
+    with DiskCache(path) as cache:
+        assert cache.get("a") == b"z" * 100
+        assert cache.get("b") == 2
+
+
+def test_disk_cache_codec(tmp_path):
+    class JsonCodec:
+        @staticmethod
+        def dumps(value):
+            return json.dumps(value).encode()
+
+        @staticmethod
+        def loads(data):
+            return json.loads(data)
+
+    with DiskCache(str(tmp_path / "cache.bin"), codec=JsonCodec) as cache:
+        cache.put("a", {"b": [1, 2]})
+        assert cache.get("a") == {"b": [1, 2]}
+
+
+def test_disk_cache_invalid(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a cache")
+    with pytest.raises(ValueError):
+        DiskCache(str(path))
+    with pytest.raises(ValueError):
+        DiskCache(str(tmp_path / "cache.bin"), max_bytes=10)
+
+
+def write_values(path, start):
+    with DiskCache(path) as cache:
+        for i in range(start, start + 50):
+            cache.put(i, i * i)
+
+
+def test_disk_cache_processes(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    with ProcessPoolExecutor(4, mp_context=get_context("fork")) as executor:
+        list(executor.map(write_values, [path] * 4, [0, 50, 100, 150]))
+    with DiskCache(path) as cache:
+        assert [cache.get(i) for i in range(200)] == [i * i for i in range(200)]
+
+
+COUNT_CALLS = """
+import sys
+from project.decorators.cache import cache_results
+
+calls = []
+
+@cache_results(disk=sys.argv[1])
+def size(*args, **kwargs):
+    calls.append(args)
+    return len(args)
+
+size({"a": 1, "b": {2, 3, 4}})
+size(frozenset(range(20)))
+size([{"x", "y", "z", "w"}], key={1.5, "s"})
+print(len(calls))
+"""
+
+
+def test_disk_cache_hash_seed(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    counts = []
+    for seed in ["1", "5", "7"]:
+        env = dict(os.environ, PYTHONHASHSEED=seed, PYTHONPATH=root)
+        process = subprocess.run(
+            [sys.executable, "-c", COUNT_CALLS, path],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        counts.append(int(process.stdout.split()[-1]))
+    # keys with dicts and sets are found after restart with other hash seed
+    assert counts == [3, 0, 0]
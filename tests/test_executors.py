@@ -0,0 +1,85 @@
+import os
+import subprocess
+import sys
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from project.threadpool.executors import (
+    configure_executor,
+    get_executor,
+    shutdown_executors,
+    warm_up,
+)
+from project.threadpool.async_pool import PoolExecutor
+
+
+@pytest.fixture(autouse=True)
+def reset_executors():
+    yield
+    configure_executor("process")
+    configure_executor("thread")
+    shutdown_executors()
+
+
+@pytest.mark.parametrize("kind", ["process", "thread"])
+def test_executor_is_shared(kind):
+    executor = get_executor(kind)
+    assert get_executor(kind) is executor
+    assert executor.submit(abs, -3).result() == 3
+
+
+def test_executor_kinds():
+    assert isinstance(get_executor("process"), ProcessPoolExecutor)
+    assert isinstance(get_executor("thread"), PoolExecutor)
+
+
+def test_configure_executor():
+    configure_executor("thread", max_workers=2)
+    executor = get_executor("thread")
+    assert executor.pool.max_workers == 2
+
+    configure_executor("thread", max_workers=3)
+    assert get_executor("thread") is not executor
+    assert get_executor("thread").pool.max_workers == 3
+
+
+def test_configure_start_method():
+    configure_executor("process", max_workers=1, start_method="spawn")
+    assert get_executor("process").submit(abs, -1).result() == 1
+
+
+@pytest.mark.parametrize(
+    "kind, kwargs",
+    [
+        ("coroutine", {}),
+        ("process", {"max_workers": 0}),
+        ("process", {"start_method": "unknown"}),
+        ("thread", {"start_method": "spawn"}),
+    ],
+)
+def test_configure_executor_invalid(kind, kwargs):
+    with pytest.raises(ValueError):
+        configure_executor(kind, **kwargs)
+
+
+def test_warm_up():
+    configure_executor("process", max_workers=2)
+    executor = warm_up("process")
+    pids = {executor.submit(os.getpid).result() for _ in range(10)}
+    assert 1 <= len(pids) <= 2
+    assert os.getpid() not in pids
+
+
+def test_shutdown_executors():
+    executor = get_executor("thread")
+    shutdown_executors()
+    assert get_executor("thread") is not executor
+
+
+def test_executors_shut_down_at_exit():
+    code = (
+        "from project.threadpool.executors import get_executor\n"
+        "get_executor('thread').submit(abs, 1).result()\n"
+        "get_executor('process').submit(abs, 1).result()\n"
+    )
+    # interpreter doesn't wait for idle workers forever
+    subprocess.run([sys.executable, "-c", code], check=True, timeout=30)
@@ -0,0 +1,138 @@
+"""This module provides test for matrices stored in memory-mapped files"""
+
+import os
+import pytest
+from project.linalg.matrix import Matrix
+from project.linalg.mapped_matrix import MappedMatrix
+
+
+def to_lists(m):
+    return [list(row) for row in m.elements]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "m.mat")
+
+
+def test_create(path):
+    m = MappedMatrix(path, 2, 3)
+    assert (m.rows, m.cols) == (2, 3)
+    assert to_lists(m) == [[0, 0, 0], [0, 0, 0]]
+    assert os.path.getsize(path) == 24 + 2 * 3 * 8
+    m.close()
+
+
+def test_create_wrong_size(path):
+    with pytest.raises(ValueError):
+        MappedMatrix(path, 0, 3)
+    with pytest.raises(ValueError):
+        MappedMatrix(path, 2)
+    with pytest.raises(ValueError):
+        MappedMatrix(rows=2, cols=2, block_size=0)
+
+
+def test_load_not_matrix(path):
+    with open(path, "wb") as file:
+        file.write(b"not a matrix at all, just some bytes")
+    with pytest.raises(ValueError):
+        MappedMatrix.load(path)
+
+
+def test_save_load(path, tmp_path):
+    m = MappedMatrix.from_matrix(Matrix([[1, 2], [3, 4.5]]), path)
+    m.elements[0][1] = 7
+    copy = str(tmp_path / "copy.mat")
+    m.save(copy)
+    m.close()
+
+    with MappedMatrix.load(path) as loaded:
+        assert to_lists(loaded) == [[1, 7], [3, 4.5]]
+    with MappedMatrix.load(copy) as loaded:
+        assert to_lists(loaded) == [[1, 7], [3, 4.5]]
+
+
+def test_temporary_file_is_deleted():
+    m = MappedMatrix(rows=2, cols=2)
+    path = m.path
+    assert os.path.exists(path)
+    m.close()
+    assert not os.path.exists(path)
+
+
+def test_rows_of_temporary_result():
+    m = MappedMatrix.from_matrix(Matrix([[1, 2], [3, 4]]))
+    a = Matrix([[1, 1], [1, 1]])
+    rows = (m + a).elements
+    assert list(rows[0]) == [2, 3]
+    rows = (m * m).elements
+    assert list(rows[1]) == [15, 22]
+    result = m.transpos()
+    path = result.path
+    rows = result.elements
+    del result
+    assert list(rows[0]) == [1, 3]
+    assert os.path.exists(path)
+    # file is deleted with the last row
+    del rows
+    assert not os.path.exists(path)
+    m.close()
+
+
+def test_add():
+    m1 = MappedMatrix.from_matrix(Matrix([[1, -1], [1, 0]]))
+    m2 = Matrix([[1, 1], [1, 0]])
+    m3 = m1 + m2
+    assert isinstance(m3, MappedMatrix)
+    assert to_lists(m3) == [[2, 0], [2, 0]]
+    with pytest.raises(IndexError):
+        m1 + Matrix([[1]])
+    with pytest.raises(TypeError):
+        m1 + 1
+
+
+def test_iadd_imul():
+    m = MappedMatrix.from_matrix(Matrix([[1, 2], [3, 4]]))
+    m += Matrix([[1, 1], [1, 1]])
+    m *= 2
+    assert to_lists(m) == [[4, 6], [8, 10]]
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 3, 256])
+def test_mul(block_size):
+    a = Matrix([[1, 2, 3], [4, 5, 6], [7, 8, 9], [1, 0, 1]])
+    b = Matrix([[1, 0, 2, 1, 1], [0, 1, 3, -1, 1], [2, 2, 2, 2, 0]])
+    m = MappedMatrix.from_matrix(a, block_size=block_size)
+    product = m * b
+    assert isinstance(product, MappedMatrix)
+    assert to_lists(product) == (a * b).elements
+
+
+def test_mul_out():
+    m = MappedMatrix.from_matrix(Matrix([[1, 2], [3, 4]]), block_size=1)
+    out = Matrix([[0, 0], [0, 0]])
+    assert m.matmul(m, out=out) is out
+    assert out.elements == [[7, 10], [15, 22]]
+    with pytest.raises(ValueError):
+        m.matmul(m, out=m)
+    a = Matrix([[1, 0], [0, 1]])
+    with pytest.raises(ValueError):
+        m.matmul(a, out=Matrix(a.elements))
+    with pytest.raises(IndexError):
+        m * Matrix([[1, 2]])
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 256])
+def test_transpos(block_size):
+    a = Matrix([[1, 2, 3], [4, 5, 6], [7, 8, 9], [10, 11, 12], [13, 14, 15]])
+    m = MappedMatrix.from_matrix(a, block_size=block_size)
+    t = m.transpos()
+    assert isinstance(t, MappedMatrix)
+    assert to_lists(t) == a.transpos().elements
+
+
+def test_matrix_operations_on_mapped():
+    m = MappedMatrix.from_matrix(Matrix([[4, 7], [2, 6]]))
+    assert m.det() == pytest.approx(10)
+    assert (Matrix([[1, 1], [1, 1]]) + m).elements == [[5, 8], [3, 7]]
+    assert (Matrix([[1, 0], [0, 1]]) * m).elements == [[4, 7], [2, 6]]
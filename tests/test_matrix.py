@@ -2,6 +2,7 @@
 
 import pytest
 from project.linalg.matrix import Matrix
+from project.linalg.vector import Vector
 
 
 def test_init():
@@ -115,3 +116,208 @@ def test_transpos():
 def test_transpos_small():
     m = Matrix([[3]])
     assert m.transpos().elements == [[3]]
+
+
+def assert_matrix_approx(m, expected):
+    assert len(m.elements) == len(expected)
+    for row, expected_row in zip(m.elements, expected):
+        assert row == pytest.approx(expected_row, abs=1e-9)
+
+
+def test_lu():
+    m = Matrix([[1, 2, 0], [3, 4, 4], [5, 6, 3]])
+    p, l, u = m.lu()
+    assert_matrix_approx(p * m, (l * u).elements)
+    for i in range(3):
+        assert l.elements[i][i] == 1
+        assert all(x == 0 for x in l.elements[i][i + 1 :])
+        assert all(x == 0 for x in u.elements[i][:i])
+    # partial pivoting chooses largest element of first column
+    assert p.elements[0] == [0, 0, 1]
+
+
+def test_lu_not_square():
+    with pytest.raises(IndexError):
+        Matrix([[1, 2, 3], [4, 5, 6]]).lu()
+
+
+@pytest.mark.parametrize(
+    "elements",
+    [[[12, -51, 4], [6, 167, -68], [-4, 24, -41]], [[1, 2], [3, 4], [5, 6]], [[3]]],
+)
+def test_qr(elements):
+    m = Matrix(elements)
+    q, r = m.qr()
+    assert_matrix_approx(q * r, elements)
+    size = len(elements)
+    identity = [[float(i == j) for j in range(size)] for i in range(size)]
+    assert_matrix_approx(q.transpos() * q, identity)
+    for i, row in enumerate(r.elements):
+        assert all(x == 0 for x in row[: min(i, len(row))])
+
+
+@pytest.mark.parametrize(
+    "elements, det",
+    [
+        ([[5]], 5),
+        ([[1, 2], [3, 4]], -2),
+        ([[2, 0, 1], [1, 3, 2], [1, 1, 2]], 6),
+        ([[1, 2], [2, 4]], 0),
+    ],
+)
+def test_det(elements, det):
+    assert Matrix(elements).det() == pytest.approx(det)
+
+
+def test_det_not_square():
+    with pytest.raises(IndexError):
+        Matrix([[1, 2]]).det()
+
+
+def test_inverse():
+    m = Matrix([[4, 7], [2, 6]])
+    assert_matrix_approx(m.inverse(), [[0.6, -0.7], [-0.2, 0.4]])
+    assert_matrix_approx(m * m.inverse(), [[1, 0], [0, 1]])
+
+
+def test_inverse_singular():
+    with pytest.raises(ValueError):
+        Matrix([[1, 2], [2, 4]]).inverse()
+
+
+def test_solve_vector():
+    m = Matrix([[2, 1, -1], [-3, -1, 2], [-2, 1, 2]])
+    x = m.solve(Vector([8, -11, -3]))
+    assert isinstance(x, Vector)
+    assert x.coord == pytest.approx([2, 3, -1])
+
+
+def test_solve_matrix():
+    m = Matrix([[1, 1], [1, -1]])
+    x = m.solve(Matrix([[3, 2], [1, 0]]))
+    assert isinstance(x, Matrix)
+    assert_matrix_approx(x, [[2, 1], [1, 1]])
+
+
+def test_solve_wrong_input():
+    m = Matrix([[1, 0], [0, 1]])
+    with pytest.raises(TypeError):
+        m.solve([1, 2])
+    with pytest.raises(IndexError):
+        m.solve(Vector([1, 2, 3]))
+    with pytest.raises(IndexError):
+        m.solve(Matrix([[1]]))
+    with pytest.raises(ValueError):
+        Matrix([[0, 0], [0, 0]]).solve(Vector([1, 1]))
+
+
+@pytest.mark.parametrize(
+    "n, expected",
+    [
+        (0, [[1, 0], [0, 1]]),
+        (1, [[1, 1], [1, 0]]),
+        (5, [[8, 5], [5, 3]]),
+        (10, [[89, 55], [55, 34]]),
+        (-1, [[0, 1], [1, -1]]),
+    ],
+)
+def test_power(n, expected):
+    m = Matrix([[1, 1], [1, 0]])
+    assert_matrix_approx(m.power(n), expected)
+    # matrix itself isn't changed
+    assert m.elements == [[1, 1], [1, 0]]
+
+
+def test_power_wrong_input():
+    with pytest.raises(TypeError):
+        Matrix([[1]]).power(1.5)
+    with pytest.raises(IndexError):
+        Matrix([[1, 2]]).power(2)
+
+
+def test_iadd():
+    m = Matrix([[1, 2], [3, 4]])
+    rows = m.elements[0], m.elements[1]
+    m += Matrix([[1, 1], [1, 1]])
+    assert m.elements == [[2, 3], [4, 5]]
+    # rows are reused
+    assert m.elements[0] is rows[0] and m.elements[1] is rows[1]
+    with pytest.raises(IndexError):
+        m += Matrix([[1]])
+
+
+def test_imul():
+    m = Matrix([[1, 2], [3, 4]])
+    row = m.elements[0]
+    m *= 0.5
+    assert m.elements == [[0.5, 1], [1.5, 2]]
+    assert m.elements[0] is row
+    with pytest.raises(TypeError):
+        m *= "2"
+
+
+def test_axpy():
+    y = Matrix([[1, 1], [1, 1]])
+    x = Matrix([[1, 2], [3, 4]])
+    assert y.axpy(2, x) is y
+    assert y.elements == [[3, 5], [7, 9]]
+
+    out = Matrix([[0, 0], [0, 0]])
+    y.axpy(-1, x, out=out)
+    assert out.elements == [[2, 3], [4, 5]]
+    with pytest.raises(TypeError):
+        y.axpy(x, x)
+
+
+def test_add_out():
+    m1 = Matrix([[1, 2]])
+    m2 = Matrix([[3, 4]])
+    out = Matrix([[0, 0]])
+    row = out.elements[0]
+    assert m1.add(m2, out=out) is out
+    assert out.elements == [[4, 6]]
+    assert out.elements[0] is row
+    with pytest.raises(IndexError):
+        m1.add(m2, out=Matrix([[0, 0], [0, 0]]))
+    with pytest.raises(TypeError):
+        m1.add(m2, out=[[0, 0]])
+
+
+def test_matmul_out():
+    m1 = Matrix([[1, 2], [3, 4], [5, 6]])
+    m2 = Matrix([[1, 0, 2], [0, 1, 3]])
+    out = Matrix([[0, 0, 0], [0, 0, 0], [0, 0, 0]])
+    rows = list(out.elements)
+    assert m1.matmul(m2, out=out) is out
+    assert out.elements == (m1 * m2).elements
+    assert all(a is b for a, b in zip(out.elements, rows))
+    with pytest.raises(IndexError):
+        m1.matmul(m2, out=Matrix([[0, 0], [0, 0]]))
+
+
+def test_matmul_out_is_operand():
+    m = Matrix([[1, 2], [3, 4]])
+    with pytest.raises(ValueError):
+        m.matmul(m, out=m)
+    # matrices created from the same rows share them
+    rows = [[1, 2], [3, 4]]
+    x = Matrix(rows)
+    with pytest.raises(ValueError):
+        x.matmul(x, out=Matrix(rows))
+    with pytest.raises(ValueError):
+        x.matmul(Matrix([[1, 0], [0, 1]]), out=Matrix([[0, 0], rows[1]]))
+    assert rows == [[1, 2], [3, 4]]
+
+
+def test_transpos_out():
+    m = Matrix([[1, 2, 3], [4, 5, 6]])
+    out = Matrix([[0, 0], [0, 0], [0, 0]])
+    assert m.transpos(out=out) is out
+    assert out.elements == [[1, 4], [2, 5], [3, 6]]
+    with pytest.raises(IndexError):
+        m.transpos(out=Matrix([[0, 0, 0], [0, 0, 0]]))
+    sq = Matrix([[1, 2], [3, 4]])
+    with pytest.raises(ValueError):
+        sq.transpos(out=sq)
+    with pytest.raises(ValueError):
+        sq.transpos(out=Matrix(sq.elements))
@@ -0,0 +1,110 @@
+import pytest
+from project.decorators.policies import ARCCache, LFUCache, LRUCache
+
+
+@pytest.mark.parametrize("cache_class", [LRUCache, LFUCache, ARCCache])
+def test_cache_get_put(cache_class):
+    cache = cache_class(2)
+    assert cache.put("a", 1) == []
+    assert cache.put("b", 2) == []
+    assert cache.get("a") == 1
+    assert cache.get("c", 0) == 0
+    assert len(cache) == 2
+    assert "a" in cache and "c" not in cache
+    assert cache.pop("a") == 1
+    assert cache.pop("a") is None
+    cache.clear()
+    assert len(cache) == 0 and cache.weight == 0
+
+
+@pytest.mark.parametrize("cache_class", [LRUCache, LFUCache, ARCCache])
+def test_cache_replace_value(cache_class):
+    cache = cache_class(2)
+    cache.put("a", 1)
+    cache.put("a", 2)
+    assert len(cache) == 1
+    assert cache.get("a") == 2
+
+
+@pytest.mark.parametrize("cache_class", [LRUCache, LFUCache, ARCCache])
+def test_cache_invalid_bounds(cache_class):
+    with pytest.raises(ValueError):
+        cache_class(0)
+    with pytest.raises(ValueError):
+        cache_class(1, 0)
+
+
+def test_lru_eviction():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    assert cache.put("c", 3) == [("b", 2)]
+    # peek doesn't change order
+    cache.peek("a")
+    assert cache.put("d", 4) == [("a", 1)]
+
+
+def test_lfu_eviction():
+    cache = LFUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    for _ in range(3):
+        cache.get("a")
+    assert cache.put("c", 3) == [("b", 2)]
+    assert cache.put("d", 4) == [("c", 3)]
+    assert cache.get("a") == 1
+
+
+def test_weight_eviction():
+    cache = LRUCache(max_weight=10)
+    cache.put("a", "a", 4)
+    cache.put("b", "b", 4)
+    assert cache.weight == 8
+    assert cache.put("c", "c", 5) == [("a", "a")]
+    assert cache.weight == 9
+    # entry heavier than cache isn't added
+    assert cache.put("d", "d", 11) == [("d", "d")]
+    assert "d" not in cache
+    assert cache.weight == 9
+
+
+def test_arc_needs_size():
+    with pytest.raises(ValueError):
+        ARCCache(max_weight=10)
+
+
+def test_arc_keeps_frequent_entries_during_scan():
+    cache = ARCCache(4)
+    for key in "ab":
+        cache.put(key, key)
+        cache.get(key)
+    # one-time keys don't push out entries used twice
+    for i in range(20):
+        cache.put(i, i)
+    assert cache.get("a") == "a"
+    assert cache.get("b") == "b"
+    assert len(cache) == 4
+
+
+def test_arc_adapts_to_recency():
+    cache = ARCCache(2)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.put("b", 2)
+    cache.put("c", 3)
+    assert "b" not in cache
+    # miss on recently evicted key increases target size of recency list
+    cache.put("b", 2)
+    assert cache.p > 0
+    assert cache.get("b") == 2
+    assert len(cache) == 2
+
+
+def test_lfu_arc_weight_consistency():
+    for cache in [LFUCache(5, 20), ARCCache(5, 20)]:
+        for i in range(100):
+            cache.put(i % 13, i, i % 7 + 1)
+            cache.get((i * 7) % 13)
+            assert len(cache) <= 5
+            assert 0 <= cache.weight <= 20
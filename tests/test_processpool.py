@@ -0,0 +1,164 @@
+import os
+import pytest
+import time
+from concurrent.futures.process import BrokenProcessPool
+from project.threadpool.processpool import ProcessPool
+from project.threadpool.threadpool import RejectedError
+
+
+def square(x: int) -> int:
+    return x * x
+
+
+def pid() -> int:
+    return os.getpid()
+
+
+def fail():
+    raise KeyError("fail")
+
+
+def describe(data: bytes, extra: int = 0):
+    return type(data).__name__, len(data), data[:3], extra
+
+
+def test_processpool_result():
+    pool = ProcessPool(2)
+    futures = [pool.enqueue(square, i) for i in range(100)]
+    assert [future.result(timeout=10) for future in futures] == [
+        i * i for i in range(100)
+    ]
+    pool.dispose()
+
+
+def test_processpool_invalid_number_of_processes():
+    with pytest.raises(ValueError):
+        ProcessPool(0)
+    with pytest.raises(ValueError):
+        ProcessPool(1, batch_size=0)
+
+
+def test_processpool_persistent_processes():
+    pool = ProcessPool(2)
+    pids = {pool.enqueue(pid).result(timeout=10) for _ in range(20)}
+    # tasks are executed by the same worker processes
+    assert pids <= {process.pid for process in pool.processes}
+    assert os.getpid() not in pids
+    pool.dispose()
+
+
+def test_processpool_exception():
+    pool = ProcessPool(1)
+    future = pool.enqueue(fail)
+    assert isinstance(future.exception(timeout=10), KeyError)
+    # worker survives exception in task
+    assert pool.enqueue(square, 3).result(timeout=10) == 9
+    pool.dispose()
+
+
+def test_processpool_unpicklable_task():
+    pool = ProcessPool(1)
+    future = pool.enqueue(lambda: 1)
+    assert future.exception(timeout=10) is not None
+    assert pool.enqueue(square, 2).result(timeout=10) == 4
+    pool.dispose()
+
+
+def test_processpool_dispose():
+    pool = ProcessPool(2)
+    futures = [pool.enqueue(square, i) for i in range(10)]
+    pool.dispose()
+
+    # added tasks are executed before dispose() returns
+    assert all(future.done() for future in futures)
+    assert all(not process.is_alive() for process in pool.processes)
+    with pytest.raises(RejectedError):
+        pool.enqueue(square, 1)
+
+
+def test_processpool_dispose_cancel_pending():
+    pool = ProcessPool(1, batch_size=1)
+    futures = [pool.enqueue(time.sleep, 0.2) for _ in range(10)]
+    while not futures[1].running():
+        time.sleep(0.01)
+    time.sleep(0.05)
+    assert pool.dispose(cancel_pending=True)
+
+    # two batches are sent ahead, other tasks are cancelled
+    assert [future.cancelled() for future in futures] == [False] * 2 + [True] * 8
+    assert all(future.done() for future in futures)
+    assert pool.shutdown_time < 1.5
+
+
+def test_processpool_dispose_timeout():
+    pool = ProcessPool(1)
+    future = pool.enqueue(time.sleep, 0.5)
+    start = time.time()
+    assert not pool.dispose(timeout=0.1)
+    assert time.time() - start < 0.4
+    # processes finish later
+    assert pool.dispose()
+    assert future.result() is None
+
+
+def test_processpool_dispose_no_wait():
+    pool = ProcessPool(2)
+    future = pool.enqueue(square, 3)
+    assert not pool.dispose(wait=False)
+    assert future.result(timeout=5) == 9
+    assert pool.dispose()
+
+
+def test_processpool_context_manager():
+    with ProcessPool(2) as pool:
+        future = pool.enqueue(square, 4)
+    assert pool.is_finished
+    assert future.result() == 16
+    assert all(not process.is_alive() for process in pool.processes)
+
+
+def test_processpool_many_tasks():
+    # more tasks than are sent ahead
+    with ProcessPool(2, batch_size=2) as pool:
+        futures = [pool.enqueue(square, i) for i in range(100)]
+    assert [future.result() for future in futures] == [i * i for i in range(100)]
+
+
+def test_processpool_map():
+    pool = ProcessPool(2, batch_size=4)
+    assert list(pool.map(square, range(20))) == [i * i for i in range(20)]
+    pool.dispose()
+
+
+def test_processpool_shared_memory():
+    pool = ProcessPool(1, share_threshold=1024)
+    data = b"abc" * 1000
+    result = pool.enqueue(describe, data, extra=1).result(timeout=10)
+    assert result == ("bytes", 3000, b"abc", 1)
+    # small arguments are sent as is
+    assert pool.enqueue(describe, b"xyz").result(timeout=10) == ("bytes", 3, b"xyz", 0)
+    pool.dispose()
+
+
+def test_processpool_worker_died():
+    pool = ProcessPool(2, batch_size=1)
+    slow = pool.enqueue(time.sleep, 30)
+    died = pool.enqueue(os._exit, 1)
+    with pytest.raises(BrokenProcessPool):
+        died.result(timeout=10)
+    # tasks of other processes are failed too
+    with pytest.raises(BrokenProcessPool):
+        slow.result(timeout=10)
+    assert pool.is_broken
+    with pytest.raises(BrokenProcessPool):
+        pool.enqueue(square, 2)
+    pool.dispose()
+    assert not any(process.is_alive() for process in pool.processes)
+
+
+def test_processpool_worker_exited_normally():
+    pool = ProcessPool(1)
+    future = pool.enqueue(os._exit, 0)
+    with pytest.raises(BrokenProcessPool):
+        future.result(timeout=10)
+    pool.dispose()
@@ -0,0 +1,120 @@
+import pickle
+import pytest
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from project.decorators.shared_cache import SharedCache
+
+
+@pytest.fixture
+def cache():
+    with SharedCache(1 << 16) as cache:
+        yield cache
+
+
+def test_shared_cache_put_get(cache):
+    cache.put("a", [1, 2])
+    cache.put(("b", 1), b"bytes")
+    assert cache.get("a") == [1, 2]
+    assert cache.get(("b", 1)) == b"bytes"
+    assert cache.get("missing", 0) == 0
+    cache.put("a", 3)
+    assert cache.get("a") == 3
+    assert len(cache) == 2
+
+
+def test_shared_cache_view(cache):
+    cache.put("a", b"value")
+    cache.put("b", "value")
+    with cache.view("a") as view:
+        assert view is not None and view.readonly
+        assert view == b"value"
+        assert cache.get("b") == "value"
+        with pytest.raises(ValueError):
+            cache.put("c", b"other")
+    with pytest.raises(ValueError):
+        view.tobytes()
+    with cache.view("b") as view:
+        assert view is None
+    with cache.view("c") as view:
+        assert view is None
+
+
+def test_shared_cache_view_blocks_writers(cache):
+    cache.put("a", b"A" * 1000)
+    with cache.view("a") as view:
+        writer = get_context("fork").Process(target=write_values, args=(cache, 0))
+        writer.start()
+        writer.join(0.3)
+        # writer would compact cache and move value
+        assert writer.is_alive()
+        assert view == b"A" * 1000
+    writer.join()
+    assert cache.get(19) == 19 * 19
+
+
+def test_shared_cache_ttl(cache):
+    cache.put("a", 1, ttl=0.05)
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+    assert cache.get("a") is None
+
+
+def test_shared_cache_memory_limit(cache):
+    for i in range(1000):
+        cache.put(i, b"x" * 200)
+    # newest values are kept
+    assert cache.get(999) == b"x" * 200
+    assert cache.get(0) is None
+    assert len(cache) <= 64 * 0.75
+    # too large value isn't stored
+    cache.put("large", b"x" * cache.size)
+    assert cache.get("large") is None
+
+
+def test_shared_cache_compact(cache):
+    cache.put("a", 1, ttl=0.01)
+    cache.put("b", 2)
+    time.sleep(0.02)
+    cache.compact()
+    assert len(cache) == 1
+    assert cache.get("b") == 2
+
+
+def test_shared_cache_clear(cache):
+    cache.put("a", 1)
+    cache.clear()
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_shared_cache_attach(cache):
+    other = pickle.loads(pickle.dumps(cache))
+    cache.put("a", 1)
+    assert other.get("a") == 1
+    other.put("b", 2)
+    assert cache.get("b") == 2
+    other.close()
+    # segment is removed only by creator
+    assert cache.get("a") == 1
+
+
+def test_shared_cache_invalid():
+    with pytest.raises(ValueError):
+        SharedCache(1024, slots=100)
+    with SharedCache(1024) as cache, pytest.raises(ValueError):
+        cache.put("a", 1)
+        cache.close()
+        cache.get("a")
+
+
+def write_values(cache, start):
+    for i in range(start, start + 20):
+        cache.put(i, i * i)
+
+
+@pytest.mark.parametrize("method", ["fork", "spawn"])
+def test_shared_cache_processes(cache, method):
+    with ProcessPoolExecutor(2, mp_context=get_context(method)) as executor:
+        list(executor.map(write_values, [cache] * 2, [0, 20]))
+    assert [cache.get(i) for i in range(40)] == [i * i for i in range(40)]
@@ -2,7 +2,14 @@ import pytest
 import time
 import threading
 from math import ceil
-from project.threadpool.threadpool import ThreadPool
+from concurrent.futures import CancelledError
+from project.threadpool.threadpool import (
+    ThreadPool,
+    WorkStealingThreadPool,
+    DeadlineExceeded,
+    RejectedError,
+    as_completed,
+)
 
 
 def some_func(sec: int):
@@ -31,7 +38,8 @@ def test_threadpool_dispose():
 
     # new tasks can't be added
     # after dispose() is called
-    pool.enqueue(some_func, 3)
+    with pytest.raises(RejectedError):
+        pool.enqueue(some_func, 3)
     assert len(pool.tasks) == 0
 
 
@@ -78,3 +86,508 @@ def test_threadpool_time():
     end = time.time()
 
     assert end - start == pytest.approx(ceil(10 / 3) * 3, 2)
+
+
+def test_threadpool_result():
+    pool = ThreadPool(2)
+    future = pool.enqueue(pow, 2, 10)
+    assert future.result(timeout=5) == 1024
+    assert future.exception() is None
+    pool.dispose()
+
+
+def test_threadpool_exception():
+    def fail():
+        raise KeyError("fail")
+
+    pool = ThreadPool(1)
+    future = pool.enqueue(fail)
+    assert isinstance(future.exception(timeout=5), KeyError)
+    with pytest.raises(KeyError):
+        future.result()
+
+    # worker survives exception in task
+    assert pool.enqueue(lambda: 5).result(timeout=5) == 5
+    assert all(thread.is_alive() for thread in pool.threads)
+    pool.dispose()
+
+
+def test_threadpool_done_callback():
+    pool = ThreadPool(1)
+    done = threading.Event()
+    results = []
+
+    def callback(future):
+        results.append(future.result())
+        done.set()
+
+    pool.enqueue(lambda x: x * 2, 21).add_done_callback(callback)
+    assert done.wait(5)
+    assert results == [42]
+    pool.dispose()
+
+
+def test_threadpool_map():
+    pool = ThreadPool(3)
+    assert list(pool.map(lambda x, y: x + y, range(10), range(10))) == list(
+        range(0, 20, 2)
+    )
+    pool.dispose()
+
+
+def test_threadpool_map_timeout():
+    pool = ThreadPool(1)
+    with pytest.raises(TimeoutError):
+        list(pool.map(some_func, [1, 1], timeout=0.1))
+    pool.dispose()
+
+
+def test_threadpool_as_completed():
+    pool = ThreadPool(2)
+    futures = [pool.enqueue(some_func, 0.3), pool.enqueue(lambda: "fast")]
+    completed = list(as_completed(futures, timeout=5))
+    assert completed[0] is futures[1]
+    assert completed[0].result() == "fast"
+    pool.dispose()
+
+
+def test_threadpool_cancelled_task_is_skipped():
+    pool = ThreadPool(1)
+    pool.enqueue(some_func, 0.2)
+    future = pool.enqueue(some_func, 3)
+    assert future.cancel()
+    pool.dispose()
+    with pytest.raises(CancelledError):
+        future.result()
+
+
+def test_threadpool_invalid_sizes():
+    with pytest.raises(ValueError):
+        ThreadPool()
+    with pytest.raises(ValueError):
+        ThreadPool(min_workers=3, max_workers=2)
+    with pytest.raises(ValueError):
+        ThreadPool(max_workers=2, idle_timeout=0)
+
+
+def test_threadpool_scaling():
+    pool = ThreadPool(min_workers=1, max_workers=3, idle_timeout=0.2)
+    assert pool.num_workers == 1
+
+    event = threading.Event()
+    futures = [pool.enqueue(event.wait, 5) for _ in range(5)]
+    # workers are spawned while backlog grows, but not more than max_workers
+    assert pool.num_workers == 3
+    assert pool.queue_depth >= 2
+
+    event.set()
+    for future in futures:
+        future.result(timeout=5)
+    time.sleep(0.6)
+    # idle workers are retired down to min_workers
+    assert pool.num_workers == 1
+    kinds = [kind for _, kind, _ in pool.scale_events]
+    assert kinds.count("spawn") == 3
+    assert kinds.count("retire") == 2
+    pool.dispose()
+
+
+def test_threadpool_idle_worker_is_reused():
+    pool = ThreadPool(max_workers=4)
+    assert pool.num_workers == 0
+    for _ in range(3):
+        pool.enqueue(lambda: None).result(timeout=5)
+        # wait for worker to become idle
+        while pool.idle_workers == 0:
+            time.sleep(0.01)
+    assert pool.num_workers == 1
+    pool.dispose()
+
+
+def blocked_pool(**kwargs):
+    # pool with single worker busy until returned event is set
+    pool = ThreadPool(1, **kwargs)
+    event = threading.Event()
+    pool.enqueue(event.wait, 5)
+    while pool.queue_depth > 0:
+        time.sleep(0.01)
+    return pool, event
+
+
+def test_threadpool_priority():
+    pool, event = blocked_pool()
+    order = []
+    for name, priority in [("low", -1), ("normal", 0), ("high", 10), ("normal2", 0)]:
+        pool.schedule(order.append, (name,), priority=priority)
+    event.set()
+    pool.dispose()
+
+    assert order == ["high", "normal", "normal2", "low"]
+
+
+def test_threadpool_earliest_deadline_first():
+    pool, event = blocked_pool()
+    order = []
+    pool.schedule(order.append, ("none",))
+    pool.schedule(order.append, ("late",), deadline=20)
+    pool.schedule(order.append, ("early",), deadline=10)
+    event.set()
+    pool.dispose()
+
+    assert order == ["early", "late", "none"]
+
+
+def test_threadpool_deadline_expired():
+    pool, event = blocked_pool()
+    future = pool.schedule(lambda: "done", deadline=0.05)
+    time.sleep(0.1)
+    event.set()
+    pool.dispose()
+
+    with pytest.raises(DeadlineExceeded):
+        future.result()
+    assert pool.expired == 1
+
+
+def test_threadpool_deadline_expired_flag_only():
+    pool, event = blocked_pool(drop_expired=False)
+    future = pool.schedule(lambda x: x, (1,), deadline=0.05)
+    time.sleep(0.1)
+    event.set()
+    pool.dispose()
+
+    assert future.result() == 1
+    assert pool.expired == 1
+
+
+def test_work_stealing_local_lifo():
+    pool = WorkStealingThreadPool(1)
+    order = []
+
+    def parent():
+        order.append("parent")
+        pool.enqueue(order.append, "first")
+        pool.enqueue(order.append, "second")
+        # subtasks are in deque of this worker, not in shared heap
+        assert len(pool.tasks) == 0
+        assert pool.queue_depth == 2
+
+    pool.enqueue(parent).result(timeout=5)
+    pool.dispose()
+    assert order == ["parent", "second", "first"]
+
+
+def test_work_stealing_steal():
+    pool = WorkStealingThreadPool(4)
+    names = set()
+    lock = threading.Lock()
+
+    def child():
+        time.sleep(0.05)
+        with lock:
+            names.add(threading.current_thread().name)
+
+    def parent():
+        return [pool.enqueue(child) for _ in range(8)]
+
+    children = pool.enqueue(parent).result(timeout=5)
+    for future in children:
+        future.result(timeout=5)
+    pool.dispose()
+    # subtasks of one worker are stolen by other workers
+    assert len(names) > 1
+
+
+def test_work_stealing_recursive_sum():
+    pool = WorkStealingThreadPool(4)
+    total = [0]
+    lock = threading.Lock()
+    done = threading.Event()
+    n = 10000
+
+    def partial_sum(lo, hi):
+        if hi - lo <= 100:
+            with lock:
+                total[0] += sum(range(lo, hi))
+                if total[0] == n * (n - 1) // 2:
+                    done.set()
+            return
+        mid = (lo + hi) // 2
+        pool.enqueue(partial_sum, lo, mid)
+        pool.enqueue(partial_sum, mid, hi)
+
+    pool.enqueue(partial_sum, 0, n)
+    assert done.wait(5)
+    pool.dispose()
+    assert total[0] == n * (n - 1) // 2
+
+
+def test_work_stealing_recursive_results():
+    pool = WorkStealingThreadPool(4)
+
+    def partial_sum(lo, hi):
+        if hi - lo <= 100:
+            return sum(range(lo, hi))
+        mid = (lo + hi) // 2
+        left = pool.enqueue(partial_sum, lo, mid)
+        right = pool.enqueue(partial_sum, mid, hi)
+        # waiting workers execute subtasks instead of blocking
+        return left.result() + right.result()
+
+    n = 100000
+    assert pool.enqueue(partial_sum, 0, n).result(timeout=10) == n * (n - 1) // 2
+    assert pool.queue_depth == 0
+    pool.dispose()
+
+
+def test_work_stealing_result_timeout():
+    pool = WorkStealingThreadPool(2)
+    started = threading.Event()
+    event = threading.Event()
+
+    def blocked():
+        started.set()
+        return event.wait(5)
+
+    future = pool.enqueue(blocked)
+    assert started.wait(5)
+
+    def parent():
+        # nothing to execute while task is running in other worker
+        with pytest.raises(TimeoutError):
+            future.result(timeout=0.05)
+        event.set()
+        return future.result(timeout=5)
+
+    assert pool.enqueue(parent).result(timeout=5)
+    pool.dispose()
+
+
+def test_threadpool_dispose_cancel_pending():
+    pool, event = blocked_pool()
+    futures = [pool.enqueue(some_func, 1) for _ in range(5)]
+    pool.dispose(wait=False, cancel_pending=True)
+    event.set()
+    assert pool.dispose()
+
+    assert all(future.cancelled() for future in futures)
+    # backlog isn't executed, so shutdown is fast
+    assert pool.shutdown_time < 0.5
+
+
+def test_threadpool_dispose_timeout():
+    pool = ThreadPool(1)
+    pool.enqueue(some_func, 0.5)
+    start = time.time()
+    assert not pool.dispose(timeout=0.1)
+    assert time.time() - start < 0.4
+    # threads finish later
+    assert pool.dispose()
+
+
+def test_threadpool_dispose_no_wait():
+    pool = ThreadPool(2)
+    future = pool.enqueue(some_func, 0.2)
+    assert not pool.dispose(wait=False)
+    assert future.result(timeout=5) is None
+    assert pool.dispose()
+
+
+def test_threadpool_context_manager():
+    with ThreadPool(2) as pool:
+        future = pool.enqueue(pow, 3, 2)
+    assert pool.is_finished
+    assert future.result() == 9
+    assert all(not thread.is_alive() for thread in pool.threads)
+
+
+def test_work_stealing_dispose_cancel_pending():
+    pool = WorkStealingThreadPool(1)
+    event = threading.Event()
+
+    def parent():
+        children = [pool.enqueue(some_func, 1) for _ in range(3)]
+        event.wait(5)
+        return children
+
+    future = pool.enqueue(parent)
+    while pool.queue_depth < 3:
+        time.sleep(0.01)
+    pool.dispose(wait=False, cancel_pending=True)
+    event.set()
+    pool.dispose()
+    assert all(child.cancelled() for child in future.result())
+
+
+def test_threadpool_stats_without_metrics():
+    pool = ThreadPool(2)
+    stats = pool.stats()
+    assert stats["workers"] == 2
+    assert stats["queue_depth"] == 0
+    assert "queue_wait" not in stats
+    pool.dispose()
+
+
+@pytest.mark.parametrize("pool_class", [ThreadPool, WorkStealingThreadPool])
+def test_threadpool_metrics(pool_class):
+    pool = pool_class(2, metrics=True)
+    for _ in range(10):
+        pool.enqueue(some_func, 0.01)
+    for future in [pool.enqueue(some_func, 0) for _ in range(10)]:
+        future.result()
+    time.sleep(0.05)
+    stats = pool.stats()
+    pool.dispose()
+
+    assert stats["completed"] == 20
+    assert stats["throughput"] > 0
+    assert stats["run_time"]["count"] == 20
+    assert 0.01 <= stats["run_time"]["max"] < 1
+    assert stats["queue_wait"]["count"] == 20
+    # tasks waited while earlier ones were executed
+    assert stats["queue_wait"]["max"] >= 0.01
+    assert sum(worker["tasks"] for worker in stats["worker_stats"]) == 20
+    assert all(0 < worker["busy_ratio"] <= 1 for worker in stats["worker_stats"])
+    # metrics of stopped workers are kept
+    assert pool.stats()["completed"] == 20
+
+
+def test_threadpool_hooks():
+    calls = []
+    pool = ThreadPool(
+        1,
+        before_task=lambda task, args, kwargs: calls.append(("before", args)),
+        after_task=lambda task, args, kwargs, run_time: calls.append(("after", args)),
+    )
+    pool.enqueue(some_func, 0).result()
+    future = pool.enqueue(some_func, "a")
+    pool.dispose()
+
+    # after_task is called for failed task too
+    assert calls == [
+        ("before", (0,)),
+        ("after", (0,)),
+        ("before", ("a",)),
+        ("after", ("a",)),
+    ]
+    assert isinstance(future.exception(), TypeError)
+
+
+def test_threadpool_hook_exception():
+    def fail(task, args, kwargs):
+        raise ValueError()
+
+    pool = ThreadPool(1, before_task=fail)
+    future = pool.enqueue(some_func, 0)
+    pool.dispose()
+
+    assert isinstance(future.exception(), ValueError)
+
+
+def test_threadpool_invalid_queue():
+    with pytest.raises(ValueError):
+        ThreadPool(1, max_queue=0)
+    with pytest.raises(ValueError):
+        ThreadPool(1, max_queue=1, overflow="ignore")
+
+
+def test_threadpool_queue_reject():
+    pool, event = blocked_pool(max_queue=2, overflow="reject")
+    futures = [pool.enqueue(int, i) for i in range(2)]
+    with pytest.raises(RejectedError):
+        pool.enqueue(int, 2)
+    assert pool.rejected == 1
+    event.set()
+    pool.dispose()
+    assert [future.result() for future in futures] == [0, 1]
+
+
+def test_threadpool_queue_block_timeout():
+    pool, event = blocked_pool(max_queue=1, block_timeout=0.1)
+    pool.enqueue(int)
+    start = time.monotonic()
+    with pytest.raises(RejectedError):
+        pool.enqueue(int)
+    assert time.monotonic() - start >= 0.1
+    event.set()
+    pool.dispose()
+
+
+def test_threadpool_queue_block():
+    pool, event = blocked_pool(max_queue=1)
+    pool.enqueue(int)
+    # producer waits until worker takes task from queue
+    threading.Timer(0.1, event.set).start()
+    future = pool.enqueue(int, 5)
+    assert event.is_set()
+    pool.dispose()
+    assert future.result() == 5
+
+
+def test_threadpool_queue_block_dispose():
+    pool, event = blocked_pool(max_queue=1)
+    pool.enqueue(int)
+    errors = []
+
+    def producer():
+        try:
+            pool.enqueue(int)
+        except RejectedError as exc:
+            errors.append(exc)
+
+    thread = threading.Thread(target=producer)
+    thread.start()
+    time.sleep(0.1)
+    pool.dispose(wait=False)
+    thread.join(1)
+    event.set()
+    pool.dispose()
+    assert len(errors) == 1
+
+
+def test_threadpool_queue_caller_runs():
+    pool, event = blocked_pool(max_queue=1, overflow="caller_runs")
+    pool.enqueue(int)
+    future = pool.enqueue(threading.current_thread)
+    # task is executed before enqueue() returns
+    assert future.result(0) is threading.current_thread()
+    event.set()
+    pool.dispose()
+
+
+def test_threadpool_queue_drop_oldest():
+    pool, event = blocked_pool(max_queue=2, overflow="drop_oldest")
+    futures = [pool.schedule(int, (i,), priority=-i) for i in range(3)]
+    futures.append(pool.schedule(int, (3,), priority=100))
+    event.set()
+    pool.dispose()
+    # task with lowest priority is dropped first
+    for future in futures[1:3]:
+        with pytest.raises(RejectedError):
+            future.result()
+    assert futures[0].result() == 0
+    assert futures[3].result() == 3
+    assert pool.rejected == 2
+
+
+def test_threadpool_queue_drop_oldest_order():
+    pool, event = blocked_pool(max_queue=5, overflow="drop_oldest")
+    order = []
+    priorities = [(i * 7) % 4 for i in range(200)]
+    futures = [
+        pool.schedule(order.append, (i,), priority=priority)
+        for i, priority in enumerate(priorities)
+    ]
+    assert pool.queue_depth == 5
+    # heaps keep bounded number of removed tasks
+    assert len(pool.tasks) <= 10
+    event.set()
+    pool.dispose()
+    # new task is always added, oldest task of lowest priority is dropped
+    kept: list = []
+    for i, priority in enumerate(priorities):
+        if len(kept) == 5:
+            kept.remove(min(kept, key=lambda j: (priorities[j], j)))
+        kept.append(i)
+    assert order == sorted(kept, key=lambda i: (-priorities[i], i))
+    assert sum(future.exception() is not None for future in futures) == 195
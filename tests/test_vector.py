@@ -84,3 +84,63 @@ def test_angle_wrong_input_type():
     v = Vector([1, 1, 1])
     with pytest.raises(TypeError):
         v.scalar_product(4.5)
+
+
+def test_add():
+    v1 = Vector([1, 2, 3])
+    v2 = Vector([0.5, -2, 1])
+    assert (v1 + v2).coord == [1.5, 0, 4]
+    assert v1.coord == [1, 2, 3]
+    with pytest.raises(TypeError):
+        v1 + 1
+    with pytest.raises(IndexError):
+        v1 + Vector([1, 2])
+
+
+def test_add_out():
+    v1 = Vector([1, 2])
+    v2 = Vector([3, 4])
+    out = Vector([0, 0])
+    coord = out.coord
+    assert v1.add(v2, out=out) is out
+    assert out.coord == [4, 6]
+    # result is written to the same list
+    assert out.coord is coord
+    with pytest.raises(IndexError):
+        v1.add(v2, out=Vector([0]))
+
+
+def test_iadd():
+    v1 = Vector([1, 2])
+    v = v1
+    coord = v1.coord
+    v1 += Vector([1, 1])
+    assert v1 is v
+    assert v1.coord is coord
+    assert v1.coord == [2, 3]
+
+
+def test_imul():
+    v = Vector([1, -2])
+    coord = v.coord
+    v *= 3
+    assert v.coord is coord
+    assert v.coord == [3, -6]
+    with pytest.raises(TypeError):
+        v *= "3"
+
+
+def test_axpy():
+    y = Vector([1, 1, 1])
+    x = Vector([1, 2, 3])
+    coord = y.coord
+    assert y.axpy(2, x) is y
+    assert y.coord is coord
+    assert y.coord == [3, 5, 7]
+
+    out = Vector([0, 0, 0])
+    y.axpy(-1, x, out=out)
+    assert out.coord == [2, 3, 4]
+    assert y.coord == [3, 5, 7]
+    with pytest.raises(TypeError):
+        y.axpy("2", x)